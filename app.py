@@ -1,17 +1,59 @@
 import streamlit as st
-import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
-import requests
+import os
+import io
+import csv
+import base64
+import hashlib
+import importlib
+import json
+import sqlite3
+import sys
 import time
+import random
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import types
+import functools
+import bisect
+import difflib
+import re
+import collections
+import itertools
+import threading
 import unicodedata # WICHTIG für den Christine Brand Fix
-from deep_translator import GoogleTranslator
+
+# --- SPÄTES LADEN SCHWERER MODULE (SCHNELLER KALTSTART) ---
+class _LazyModule(types.ModuleType):
+    """Platzhalter für ein Modul, das erst beim ersten Attributzugriff importiert wird."""
+    def __getattr__(self, attr):
+        if self.__name__ in sys.modules: # import_module wartet ggf. auf einen halb fertigen Import
+            return getattr(importlib.import_module(self.__name__), attr)
+        with measure("import", self.__name__): # einmal pro Prozess – im Diagnose-Panel sichtbar
+            module = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+def _lazy(name):
+    return _LazyModule(name)
+
+# pandas, gspread & Co. kosten zusammen ~0,5 s – erst laden, wenn ein Tab sie wirklich braucht
+pd = _lazy("pandas")
+np = _lazy("numpy")
+gspread = _lazy("gspread")
+requests = _lazy("requests")
+service_account = _lazy("google.oauth2.service_account")
+google_auth_exceptions = _lazy("google.auth.exceptions")
+google_auth_requests = _lazy("google.auth.transport.requests")
+deep_translator = _lazy("deep_translator")
+Image = _lazy("PIL.Image")
+
+RUN_STARTED = time.perf_counter() # Beginn dieses vollen Reruns (Messpunkt für "Navigation sichtbar")
 
 # --- KONFIGURATION ---
 st.set_page_config(page_title="Mamas Bibliothek", page_icon="📚", layout="centered")
 
 # --- KONSTANTEN ---
 NO_COVER_MARKER = "-" 
+PAGE_SIZES = [25, 50, 100] # Bücher pro Seite in der Sammlung
 
 # --- DESIGN ---
 st.markdown("""
@@ -69,66 +111,1053 @@ st.markdown("""
 
 # --- FUNKTIONEN ---
 
+# --- MESSUNGEN (API-AUFRUFE, LATENZ, KONTINGENT) ---
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # Sekunden (Obergrenzen der Histogramm-Fächer)
+
+class CallStats:
+    """Je Aufrufart: Anzahl, Fehlerklassen, Latenz-Histogramm – dazu der Kontingent-Verbrauch."""
+    def __init__(self):
+        self.started = time.time()
+        self.calls = {}
+        self.quota = collections.Counter()
+
+    def add(self, kind, name, seconds, error, quota):
+        c = self.calls.setdefault(f"{kind}:{name}", {"count": 0, "errors": {}, "total_s": 0.0, "max_s": 0.0,
+                                                     "hist": [0] * (len(LATENCY_BUCKETS) + 1)})
+        c["count"] += 1
+        if seconds is not None:
+            c["total_s"] += seconds
+            c["max_s"] = max(c["max_s"], seconds)
+            c["hist"][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        if error: c["errors"][error] = c["errors"].get(error, 0) + 1
+        if quota: self.quota[quota] += 1
+
+    def table(self):
+        rows = []
+        for name, c in sorted(self.calls.items()):
+            timed = sum(c["hist"])
+            p90 = "–"
+            if timed:
+                running = list(itertools.accumulate(c["hist"]))
+                idx = next(i for i, n in enumerate(running) if n >= 0.9 * timed)
+                p90 = f"≤ {LATENCY_BUCKETS[idx] * 1000:.0f}" if idx < len(LATENCY_BUCKETS) else f"> {LATENCY_BUCKETS[-1] * 1000:.0f}"
+            rows.append({"Aufruf": name, "Anzahl": c["count"], "Fehler": sum(c["errors"].values()),
+                         "Ø ms": round(c["total_s"] / timed * 1000, 1) if timed else None,
+                         "p90 ms": p90, "max ms": round(c["max_s"] * 1000, 1),
+                         "Fehlerklassen": ", ".join(f"{k} ×{v}" for k, v in c["errors"].items())})
+        return pd.DataFrame(rows)
+
+    def to_dict(self):
+        return {"started": self.started, "latency_buckets_s": LATENCY_BUCKETS,
+                "calls": self.calls, "quota": dict(self.quota)}
+
+class Telemetry:
+    """Prozessweite Messstelle; jeder Aufruf zählt zusätzlich für Sitzung und Rerun des Threads."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = CallStats()
+        # Zähler der laufenden Sitzung/des laufenden Reruns je Thread. Muss hier leben, nicht als
+        # Modul-Variable: app.py läuft bei jedem Rerun neu, gecachte Objekte aber weiter.
+        self.scope = threading.local()
+        self.operations = {} # Name -> Laufzeiten/Aufrufe je Benutzer-Aktion (siehe track_operation)
+
+    def record(self, kind, name, seconds=None, error=None, quota=None):
+        targets = [self.process, *getattr(self.scope, "stats", ())]
+        with self.lock:
+            for stats in targets: stats.add(kind, name, seconds, error, quota)
+
+@st.cache_resource(show_spinner=False)
+def get_telemetry():
+    return Telemetry()
+
+# Budget je Aktion: max. Google-Aufrufe (Sheets + Drive, synchron im Rerun) und Sekunden.
+# Wer mehr braucht, landet als Überschreitung im Diagnose-Panel – so fallen neue Round-Trips auf.
+OPERATION_BUDGETS = {
+    "Laden": {"api": 4, "seconds": 3.0}, # kalt: je Blatt Revision + Download
+    # Fragmente lesen nur den geteilten Cache; der erste Abruf eines Blatts zählt als "Laden"
+    "Navigation": {"api": 0, "seconds": 0.5},
+    "Suche": {"api": 0, "seconds": 0.2},
+    "Blättern": {"api": 0, "seconds": 0.2},
+    "Autoren-Sync": {"api": 3, "seconds": 2.0},
+    "Autor ergänzen": {"api": 0, "seconds": 0.05},
+    "Hintergrund-Check": {"api": 0, "seconds": 1.0},
+    "Speichern": {"api": 4, "seconds": 3.0},
+    "Massen-Import": {"api": 5, "seconds": 10.0},
+    "Löschen": {"api": 0, "seconds": 0.5},
+    "Aufräumen": {"api": 8, "seconds": 3.0}, # Löschen + Anhängen im Autoren-Blatt, je mit Revision davor und danach
+    "Coversuche": {"api": 2, "seconds": None}, # Dauer hängt an den externen Diensten
+}
+
+class track_operation:
+    """
+    with track_operation("Speichern"): ... – misst eine ganze Benutzer-Aktion:
+    Wandzeit und alle Aufrufe, die sie im eigenen Thread (bzw. über bind_scope) auslöst.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.stats = CallStats()
+
+    def __enter__(self):
+        scope = get_telemetry().scope
+        self.outer = getattr(scope, "stats", ())
+        scope.stats = (*self.outer, self.stats)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        get_telemetry().scope.stats = self.outer
+        calls = collections.Counter()
+        for key, c in self.stats.calls.items():
+            calls[key.split(":", 1)[0]] += sum(c["hist"]) # nur echte (gemessene) Aufrufe, keine reinen Fehlernotizen
+        api = calls["sheets"] + calls["drive"]
+        budget = OPERATION_BUDGETS.get(self.name, {})
+        over = []
+        if budget.get("api") is not None and api > budget["api"]: over.append(f"{api} Google-Aufrufe (max. {budget['api']})")
+        if budget.get("seconds") is not None and seconds > budget["seconds"]: over.append(f"{seconds:.2f} s (max. {budget['seconds']} s)")
+        telemetry = get_telemetry()
+        with telemetry.lock:
+            op = telemetry.operations.setdefault(self.name, {"runs": 0, "total_s": 0.0, "max_s": 0.0, "over_budget": 0})
+            op["runs"] += 1
+            op["total_s"] += seconds
+            op["max_s"] = max(op["max_s"], seconds)
+            op["last_s"] = seconds
+            op["last_calls"] = dict(calls)
+            if over:
+                op["over_budget"] += 1
+                op["last_warning"] = f"{time.strftime('%H:%M:%S')}: " + ", ".join(over)
+        return False
+
+def operations_table():
+    with get_telemetry().lock:
+        ops = {name: dict(op) for name, op in get_telemetry().operations.items()}
+    rows = []
+    for name, op in sorted(ops.items()):
+        budget = OPERATION_BUDGETS.get(name, {})
+        rows.append({"Aktion": name, "Läufe": op["runs"], "Ø ms": round(op["total_s"] / op["runs"] * 1000, 1),
+                     "max ms": round(op["max_s"] * 1000, 1), "letzte Aufrufe": ", ".join(f"{k} {v}" for k, v in sorted(op["last_calls"].items())),
+                     "Budget": f"{budget.get('api', '–')} / {budget.get('seconds') or '–'} s",
+                     "Überschreitungen": op["over_budget"], "zuletzt": op.get("last_warning", "")})
+    return pd.DataFrame(rows)
+
+def error_class(e):
+    code = getattr(e, "code", None) # gspread.APIError trägt den HTTP-Status
+    return f"{type(e).__name__} {code}" if code else type(e).__name__
+
+class measure:
+    """with measure("http", host) as m: ... – misst die Dauer; Fehler über Exception oder m.error."""
+    def __init__(self, kind, name, quota=None):
+        self.kind, self.name, self.quota, self.error = kind, name, quota, None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        error = self.error or (error_class(exc) if exc is not None else None)
+        get_telemetry().record(self.kind, self.name, time.perf_counter() - self.start, error, self.quota)
+        return False
+
+def note_error(kind, name, e):
+    """Abgefangener Fehler, der sonst spurlos verschwinden würde."""
+    get_telemetry().record(kind, name, error=error_class(e))
+
+def bind_scope(fn):
+    # Für Pool-Threads: Aufrufe weiter der Sitzung/dem Rerun zurechnen, die sie ausgelöst haben
+    scope = get_telemetry().scope
+    stats = getattr(scope, "stats", ())
+    def bound(*args, **kwargs):
+        scope.stats = stats
+        try: return fn(*args, **kwargs)
+        finally: scope.stats = ()
+    return bound
+
+_GSPREAD_ACTIONS = {"append", "batchUpdate", "batchGet", "batchClear", "clear", "copyTo"}
+
+def _endpoint_label(url):
+    # IDs und Bereiche aus dem Pfad nehmen: ".../spreadsheets/<id>/values/<bereich>" -> "spreadsheets/…/values/…"
+    parts = []
+    for seg in urllib.parse.unquote(urllib.parse.urlparse(url).path).strip("/").split("/"):
+        action = seg.rsplit(":", 1)[-1] if ":" in seg else ""
+        if re.fullmatch(r"v\d|[a-z]+", seg): parts.append(seg)
+        elif action in _GSPREAD_ACTIONS: parts.append(f"…:{action}")
+        else: parts.append("…")
+    return "/".join(p for p in parts if p not in ("v3", "v4", "drive"))
+
+def instrument_client(client):
+    """Jeder gspread-Aufruf läuft über http_client.request – dort messen und Kontingent zählen."""
+    http = client.http_client
+    original = http.request
+    def request(method, endpoint, *args, **kwargs):
+        api = "drive" if "/drive/" in endpoint else "sheets"
+        quota = f"{api}-{'read' if method.upper() == 'GET' else 'write'}"
+        with measure(api, f"{method.upper()} {_endpoint_label(endpoint)}", quota):
+            return original(method, endpoint, *args, **kwargs)
+    http.request = request
+    return client
+
+def start_rerun_telemetry():
+    """Ab hier zählt alles, was dieser Rerun auslöst, für ihn und für die Sitzung."""
+    if "diag_session" not in st.session_state: st.session_state.diag_session = CallStats()
+    st.session_state.diag_rerun = CallStats()
+    get_telemetry().scope.stats = (st.session_state.diag_session, st.session_state.diag_rerun)
+
+class rerun_scope:
+    """
+    with rerun_scope(): ... – Messrahmen für einen Rerun: das ganze Skript (main) oder ein
+    Fragment, das allein neu läuft. Innerhalb eines laufenden Reruns (Fragment in main) nichts Neues.
+    """
+    def __init__(self, started=None):
+        self.started = started
+
+    def __enter__(self):
+        scope = get_telemetry().scope
+        self.outermost = not getattr(scope, "active", False)
+        if self.outermost:
+            start_rerun_telemetry()
+            scope.active = True
+            scope.started = self.started or time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.outermost: get_telemetry().scope.active = False
+        return False
+
+def measured_fragment(fn=None, *, run_every=None):
+    """@st.fragment, dessen Alleingänge im Diagnose-Panel als eigener Rerun zählen."""
+    if fn is None: return functools.partial(measured_fragment, run_every=run_every)
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        with rerun_scope(): return fn(*args, **kwargs)
+    return st.fragment(run, run_every=run_every)
+
+def render_mark(name):
+    # Zeit seit Beginn des (Fragment-)Reruns, bis `name` gezeichnet ist
+    telemetry = get_telemetry()
+    telemetry.record("render", name, time.perf_counter() - getattr(telemetry.scope, "started", RUN_STARTED))
+
+def render_diagnostics():
+    """Verstecktes Diagnose-Panel – nur mit ?diag=1 in der Adresse."""
+    if st.query_params.get("diag") != "1": return
+    with st.expander("🩺 Diagnose", expanded=True):
+        scopes = {"Dieser Rerun": st.session_state.diag_rerun, "Sitzung": st.session_state.diag_session,
+                  "Prozess (alle Sitzungen)": get_telemetry().process}
+        ops = operations_table()
+        if not ops.empty:
+            st.markdown("**Aktionen** (Google-Aufrufe / Sekunden gegen Budget)")
+            if ops["Überschreitungen"].any(): st.warning("Budget überschritten: " + ", ".join(ops.loc[ops["Überschreitungen"] > 0, "Aktion"]))
+            st.dataframe(ops, hide_index=True, use_container_width=True)
+        hosts = get_http_client().host_table()
+        if not hosts.empty:
+            st.markdown("**Externe Dienste** (Verbindungen, bedingte Anfragen, Latenz je Host)")
+            st.dataframe(hosts, hide_index=True, use_container_width=True)
+        for label, stats in scopes.items():
+            st.markdown(f"**{label}** – Kontingent: " + (", ".join(f"{k} {v}" for k, v in sorted(stats.quota.items())) or "keins"))
+            table = stats.table()
+            if table.empty: st.caption("Keine Aufrufe.")
+            else: st.dataframe(table, hide_index=True, use_container_width=True)
+        export = {label: stats.to_dict() for label, stats in scopes.items()}
+        export["Hosts"] = hosts.to_dict("records")
+        with get_telemetry().lock: export["Aktionen"] = {"budgets": OPERATION_BUDGETS, "runs": dict(get_telemetry().operations)}
+        st.download_button("⬇️ Als JSON", json.dumps(export, indent=2, default=str),
+                           file_name="diagnose.json", mime="application/json")
+
+@st.cache_resource(show_spinner=False)
 def get_connection():
+    """Autorisierter gspread-Client – einmal pro Prozess, für alle Sitzungen und Reruns."""
     scopes = ["https://www.googleapis.com/auth/spreadsheets", "https://www.googleapis.com/auth/drive"]
     if "gcp_service_account" in st.secrets:
         creds_dict = st.secrets["gcp_service_account"]
-        creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
+        creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=scopes)
     else:
         try:
-            creds = Credentials.from_service_account_file("credentials.json", scopes=scopes)
+            creds = service_account.Credentials.from_service_account_file("credentials.json", scopes=scopes)
         except FileNotFoundError: return None
-    return gspread.authorize(creds)
+    return instrument_client(gspread.authorize(creds))
 
-def setup_sheets(client):
-    sh = client.open("Mamas Bücherliste")
+@st.cache_resource(show_spinner=False)
+def setup_sheets(_client):
+    """Öffnet Bücherliste und Autoren-Blatt einmal pro Prozess (Handles werden geteilt)."""
+    sh = _client.open("Mamas Bücherliste")
     ws_books = sh.sheet1
     try:
         ws_authors = sh.worksheet("Autoren")
-    except:
+    except gspread.exceptions.WorksheetNotFound:
         ws_authors = sh.add_worksheet(title="Autoren", rows=1000, cols=1)
         ws_authors.update_cell(1, 1, "Name")
+    ensure_id_columns(ws_books)
     return ws_books, ws_authors
 
-def fetch_data_from_sheet(worksheet):
+def ensure_id_columns(ws_books):
+    """Hängt fehlende ID-Spalten (ISBN, BuchID) an die Kopfzeile an – einmal pro Prozess."""
+    header = ws_books.row_values(1)
+    missing = [c for c in ID_COLUMNS if c not in resolve_schema(header)]
+    if not header or not missing: return
     try:
-        all_values = worksheet.get_all_values()
-        if len(all_values) < 2: return pd.DataFrame()
-        
-        headers = [str(h).strip().lower() for h in all_values[0]]
-        col_map = {}
-        for idx, h in enumerate(headers):
-            if "titel" in h: col_map["Titel"] = idx
-            elif "autor" in h: col_map["Autor"] = idx
-            elif h in ["cover", "bild", "image", "img"]: col_map["Cover"] = idx
-            elif h in ["sterne", "bewertung", "rating"]: col_map["Bewertung"] = idx
-            elif h in ["genre", "kategorie"]: col_map["Genre"] = idx
-            elif "name" in h: col_map["Name"] = idx
+        ws_books.update([missing], gspread.utils.rowcol_to_a1(1, len(header) + 1))
+    except Exception as e:
+        note_error("sheets", "header", e) # z.B. Blatt zu schmal – dann eben ohne IDs
 
-        rows = []
-        for raw_row in all_values[1:]:
-            entry = {"Titel": "", "Autor": "", "Cover": "", "Bewertung": "", "Genre": "", "Name": ""}
-            for key, idx in col_map.items():
-                if idx < len(raw_row):
-                    entry[key] = raw_row[idx]
-            if entry["Titel"] or entry["Name"]:
-                rows.append(entry)
-        return pd.DataFrame(rows)
+def reset_connection():
+    """Wirft Client und Blatt-Handles weg – der nächste Aufruf baut alles frisch auf."""
+    setup_sheets.clear()
+    get_connection.clear()
+
+def is_connection_error(e):
+    """Auth- oder Transportfehler, bei denen ein Neuaufbau der Verbindung hilft."""
+    if isinstance(e, (google_auth_exceptions.RefreshError, google_auth_exceptions.TransportError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(e, gspread.exceptions.APIError):
+        return getattr(e, "code", None) in (401, 403) and "PERMISSION_DENIED" not in str(e)
+    return False
+
+def refresh_token_if_expired(client):
+    # Abgelaufenes Token vorsorglich erneuern, statt erst am nächsten 401 zu scheitern
+    creds = getattr(client.http_client, "auth", None)
+    if creds is not None and not creds.valid:
+        creds.refresh(google_auth_requests.Request())
+
+def get_sheets():
+    """
+    Liefert (ws_books, ws_authors) aus dem prozessweiten Cache.
+    Bei Auth-/Transportfehlern wird die Verbindung einmal komplett neu aufgebaut.
+    """
+    for attempt in range(2):
+        client = get_connection()
+        if client is None: return None
+        try:
+            refresh_token_if_expired(client)
+            return setup_sheets(client)
+        except Exception as e:
+            if attempt or not is_connection_error(e): raise
+            reset_connection()
+
+# Spalten, die jeder geladene DataFrame hat (egal wie das Blatt aussieht)
+SCHEMA_COLUMNS = ["Titel", "Autor", "Cover", "Bewertung", "Genre", "ISBN", "BuchID", "Name"]
+ID_COLUMNS = ["ISBN", "BuchID"] # BuchID: "gb:<Google-Volume-ID>" oder "ol:/works/<Open-Library-Key>"
+
+@functools.lru_cache(maxsize=32)
+def _resolve_schema(header_row):
+    headers = [str(h).strip().lower() for h in header_row]
+    col_map = {}
+    for idx, h in enumerate(headers):
+        if "titel" in h: col_map["Titel"] = idx
+        elif "autor" in h: col_map["Autor"] = idx
+        elif h in ["cover", "bild", "image", "img"]: col_map["Cover"] = idx
+        elif h in ["sterne", "bewertung", "rating"]: col_map["Bewertung"] = idx
+        elif h in ["genre", "kategorie"]: col_map["Genre"] = idx
+        elif h == "isbn": col_map["ISBN"] = idx
+        elif h in ["buchid", "buch-id", "buch id"]: col_map["BuchID"] = idx
+        elif "name" in h: col_map["Name"] = idx
+    return types.MappingProxyType(col_map)
+
+def resolve_schema(header_row):
+    """
+    Die EINZIGE Stelle, die Kopfzeilen deutet: {"Titel": 0, "Autor": 1, ...} (0-basiert).
+    Wird pro Kopfzeile nur einmal berechnet und ist schreibgeschützt.
+    """
+    return _resolve_schema(tuple(header_row))
+
+def rows_to_frame(raw_rows, col_map, first_row):
+    """
+    Baut den DataFrame spaltenweise aus der Wertematrix.
+    Zu kurze Zeilen werden aufgefüllt, Zeilen ohne Titel/Name fliegen raus.
+    "_Zeile" = echte Zeilennummer im Blatt, damit wir den Cache gezielt flicken können.
+    """
+    n = len(raw_rows)
+    # Transponieren in C: ungleich lange Zeilen werden mit "" aufgefüllt
+    columns = list(itertools.zip_longest(*raw_rows, fillvalue=""))
+    data = {}
+    for key in SCHEMA_COLUMNS:
+        idx = col_map.get(key)
+        if idx is not None and idx < len(columns):
+            data[key] = np.array(columns[idx], dtype=object)
+        else:
+            data[key] = np.full(n, "", dtype=object)
+    data["_Zeile"] = np.arange(first_row, first_row + n)
+    df = pd.DataFrame(data)
+    keep = (df["Titel"] != "") | (df["Name"] != "")
+    return df[keep].reset_index(drop=True)
+
+def read_sheet_frame(worksheet):
+    """Lädt das ganze Blatt (wirft bei Fehlern). Liefert (DataFrame, col_map)."""
+    all_values = worksheet.get_all_values()
+    col_map = resolve_schema(all_values[0] if all_values else [])
+    if len(all_values) < 2: return pd.DataFrame(), col_map
+    return rows_to_frame(all_values[1:], col_map, 2), col_map
+
+# --- KOMPAKTE DATENHALTUNG (EIN FRAME FÜR ALLE SITZUNGEN) ---
+COMPACT_CATEGORY_COLUMNS = ("Autor", "Genre", "Cover", "Name") # als Kategorie, wenn sich Werte oft wiederholen
+
+@functools.cache
+def string_dtype():
+    """pandas 3 + pyarrow: kompakter "str"-Typ, sonst object (erst bei Bedarf ermittelt)."""
+    return pd.Series([""]).dtype
+
+def _intern_strings(col):
+    # Gleiche Texte teilen sich ein Objekt (object-Spalten unter pandas 2)
+    seen = {}
+    return pd.Series([seen.setdefault(v, v) for v in col.tolist()], index=col.index, dtype=object)
+
+def _compact_rating(col):
+    if isinstance(col.dtype, pd.Int8Dtype): return col
+    num = pd.to_numeric(col, errors="coerce")
+    free_text = num.isna() & (col.astype(str).str.strip() != "")
+    if free_text.any() or (num.dropna() % 1 != 0).any() or num.abs().max() > 127:
+        return col # Freitext in der Spalte -> lieber so lassen, als etwas zu verlieren
+    return num.astype("Int8")
+
+def _compact_column(column, col):
+    if column == "Bewertung": return _compact_rating(col)
+    if isinstance(col.dtype, pd.CategoricalDtype): return col.cat.remove_unused_categories()
+    if column in COMPACT_CATEGORY_COLUMNS and col.nunique() <= len(col) // 2: return col.astype("category")
+    if col.dtype == object: return _intern_strings(col) if string_dtype() == object else col.astype(string_dtype())
+    return col
+
+def compact_frame(df, columns=None):
+    """
+    Speichersparende Form des sichtbaren Frames, den sich alle Sitzungen teilen:
+    wiederkehrende Spalten als Kategorie, Bewertung als Int8 (leer = <NA>), übrige
+    Texte im kompakten String-Typ bzw. interniert. Vergleiche wie == "" und isin()
+    funktionieren unverändert. columns: nur diese Spalten (nach einem Zell-Patch),
+    der Rest ist schon kompakt und wird nicht angefasst.
+    """
+    if df.empty: return df
+    out = {column: _compact_column(column, df[column]) if columns is None or column in columns else df[column]
+           for column in df.columns}
+    return pd.DataFrame(out, index=df.index, copy=False)
+
+def append_compact(df, new_rows):
+    """
+    Hängt Zeilen an einen kompakten Frame an: nur die neuen Werte werden kodiert,
+    Kategorien wachsen um neue Werte (alte Codes bleiben), nichts wird neu gepackt.
+    """
+    if df.empty or new_rows.empty or list(df.columns) != list(new_rows.columns):
+        return compact_frame(pd.concat([df, new_rows], ignore_index=True))
+    out = {}
+    for column in df.columns:
+        old, new = df[column].reset_index(drop=True), new_rows[column].reset_index(drop=True)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            fresh = pd.Index(new.unique()).difference(old.cat.categories)
+            if len(fresh): old = old.cat.add_categories(fresh)
+            new = new.astype(old.dtype)
+        elif isinstance(old.dtype, pd.Int8Dtype):
+            new = _compact_rating(new)
+            # Freitext in den neuen Zeilen: dann eben die ganze Spalte als Text
+            if not isinstance(new.dtype, pd.Int8Dtype): old, new = old.astype(object), new.astype(object)
+        elif old.dtype == object:
+            new = _intern_strings(new) if column != "_Zeile" else new
+        else:
+            new = new.astype(old.dtype)
+        out[column] = pd.concat([old, new], ignore_index=True)
+    return pd.DataFrame(out, copy=False)
+
+def plain_frame(df):
+    """Zurück in reine Texte wie aus get_all_values() – für Replik und Blatt-Vergleiche."""
+    if df.empty: return df
+    return df.assign(**{column: df[column].astype(object).where(df[column].notna(), "").map(str)
+                        for column in df.columns if column != "_Zeile"})
+
+def assign_cells(df, cells):
+    """cells: [(position, spalte, wert)] – gebündelt je Spalte setzen (geht auch auf Kategorien)."""
+    columns = {}
+    for pos, column, value in cells: columns.setdefault(column, {})[pos] = value
+    if not columns: return df
+    df = df.copy()
+    for column, values in columns.items():
+        data = df[column].to_numpy(dtype=object, copy=True)
+        data[list(values)] = list(values.values())
+        df[column] = data
+    return df
+
+# --- GETEILTER DATEN-CACHE (REVISIONSBASIERT) ---
+SHEET_CACHE_TTL = 30 # Sekunden, in denen wir Google gar nicht erst fragen
+WRITE_ATTEMPTS = 3 # So oft wird neu aufgesetzt, wenn sich ein Blatt beim Schreiben fremd ändert
+
+@st.cache_resource(show_spinner=False)
+def get_sheet_cache():
+    """Prozessweit: {(spreadsheet_id, ws_id): {"df", "col_map", "revision", "checked"}}"""
+    return {"lock": threading.RLock(), "entries": {}}
+
+def _cache_key(worksheet):
+    return (worksheet.spreadsheet_id, worksheet.id)
+
+def sheet_revision(worksheet):
+    # Änderungszeit aus der Drive-API – viel billiger als get_all_values()
+    try:
+        return worksheet.spreadsheet.get_lastUpdateTime()
+    except Exception as e:
+        note_error("sheets", "revision", e)
+        return None
+
+def load_sheet(worksheet, force=False, revalidate=True):
+    """
+    Liefert das Blatt als DataFrame aus dem geteilten Cache.
+    Innerhalb der TTL ohne jeden API-Aufruf, danach nur mit Revisions-Check;
+    heruntergeladen wird nur, wenn sich das Blatt wirklich geändert hat.
+    force=True überspringt die TTL (Revisions-Check bleibt).
+    revalidate=False nimmt jeden vorhandenen Stand ohne Nachfrage (für Fragmente);
+    geprüft wird dann im vollen Rerun bzw. vom Revisionswächter.
+    """
+    cache = get_sheet_cache()
+    key = _cache_key(worksheet)
+    with cache["lock"]:
+        entry = cache["entries"].get(key)
+        if entry is None:
+            # Kaltstart: erst die lokale Replik, Google nur bei neuer Revision
+            entry = _entry_from_replica(worksheet)
+        if entry and not force and (not revalidate or time.time() - entry["checked"] < SHEET_CACHE_TTL):
+            return entry["df"]
+
+    revision = sheet_revision(worksheet)
+    if entry and revision is not None and revision == entry["revision"]:
+        with cache["lock"]: entry["checked"] = time.time()
+        return entry["df"]
+
+    try:
+        base, col_map = read_sheet_frame(worksheet)
     except Exception as e:
-        return pd.DataFrame()
+        # Offline o.ä.: lieber die lokale Kopie zeigen als ein leeres Regal
+        note_error("sheets", "load", e)
+        return entry["df"] if entry else pd.DataFrame()
+    return _install_base(worksheet, base, col_map, revision)["df"]
+
+def sheet_cached(worksheet):
+    """Liegt das Blatt schon im geteilten Cache (dann kostet Lesen ohne Revalidierung nichts)?"""
+    return _cache_key(worksheet) in get_sheet_cache()["entries"]
+
+def sheet_schema(worksheet):
+    """Spaltenzuordnung des Blatts – aus dem Cache, ohne extra API-Aufruf."""
+    load_sheet(worksheet)
+    entry = get_sheet_cache()["entries"].get(_cache_key(worksheet))
+    return entry["col_map"] if entry else resolve_schema(worksheet.row_values(1))
+
+def sheet_derived(worksheet, name, builder, revalidate=True):
+    """
+    Aus dem gecachten Frame abgeleitete Struktur (z.B. ein Suchindex).
+    Wird pro Datenstand nur einmal gebaut und von allen Sitzungen geteilt.
+    """
+    df = load_sheet(worksheet, revalidate=revalidate)
+    cache = get_sheet_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(_cache_key(worksheet))
+        if entry is None: return builder(df)
+        derived = entry.setdefault("derived", {})
+        if name not in derived: derived[name] = builder(entry["df"])
+        return derived[name]
+
+def _note_own_write(worksheet, before):
+    # Eigene Änderung ist schon im Cache eingepflegt -> neue Revision übernehmen,
+    # sonst würde der nächste Check unnötig alles neu herunterladen. Das gilt nur, wenn
+    # der Eintrag vor dem Schreiben aktuell war (before = Revision direkt vor dem Schreiben):
+    # sonst steckt eine fremde Änderung dazwischen und der Eintrag wird verworfen.
+    # Die Revision gilt fürs ganze Dokument – die anderen Blätter behalten trotzdem ihre
+    # alte und laden beim nächsten Check neu, wir wissen ja nicht, was sich dort getan hat.
+    revision = sheet_revision(worksheet)
+    cache = get_sheet_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(_cache_key(worksheet))
+        if entry is None: return
+        if before is None or revision is None or before != entry["revision"]:
+            cache["entries"].pop(_cache_key(worksheet), None)
+            return
+        entry["revision"] = revision
+        entry["checked"] = time.time()
+        # Direkt geschriebene Blätter haben keine Outbox -> Stand = Basis, lokal sichern
+        if not get_replica().pending(_replica_key(worksheet)):
+            entry["base"] = plain_frame(entry["df"])
+            get_replica().save(_replica_key(worksheet), entry["df"], entry["col_map"], revision)
+
+def _first_appended_row(response):
+    # append_rows liefert z.B. {"updates": {"updatedRange": "Autoren!A12:A14"}}
+    try:
+        rng = response["updates"]["updatedRange"].split("!")[-1].split(":")[0]
+        return int("".join(ch for ch in rng if ch.isdigit()))
+    except Exception:
+        return None
 
-def force_reload():
-    if "df_books" in st.session_state: del st.session_state.df_books
-    if "df_authors" in st.session_state: del st.session_state.df_authors
+def patch_cached_append(worksheet, raw_rows, response, before):
+    """Frisch angehängte Zeilen direkt in den Cache übernehmen (before: Revision vor dem Schreiben)."""
+    cache = get_sheet_cache()
+    first_row = _first_appended_row(response)
+    with cache["lock"]:
+        entry = cache["entries"].get(_cache_key(worksheet))
+        if entry is None: return
+        if first_row is None or not entry["col_map"]:
+            cache["entries"].pop(_cache_key(worksheet), None)
+            return
+        new_rows = rows_to_frame(raw_rows, entry["col_map"], first_row)
+        entry["df"] = append_compact(entry["df"], new_rows)
+        # Abgeleitete Indizes, die das können, wachsen mit – der Rest wird neu gebaut
+        _carry_derived(entry, "apply_append", new_rows, entry["df"])
+    _note_own_write(worksheet, before)
+
+def _carry_derived(entry, hook, *args):
+    derived = entry.get("derived", {})
+    entry["derived"] = {name: obj for name, obj in derived.items()
+                        if hasattr(obj, hook) and getattr(obj, hook)(*args)}
+
+def drop_sheet_rows(df, row_numbers):
+    """Zeilen aus dem Frame werfen und die Zeilennummern dahinter nachrücken (wie im Blatt)."""
+    df = df[~df["_Zeile"].isin(row_numbers)].copy()
+    deleted = np.sort(np.asarray(list(row_numbers), dtype=int))
+    df["_Zeile"] = df["_Zeile"] - np.searchsorted(deleted, df["_Zeile"])
+    return df.reset_index(drop=True)
+
+def patch_cached_delete(worksheet, row_numbers, before):
+    """Gelöschte Blattzeilen aus dem Cache werfen und die Zeilennummern nachrücken (before wie oben)."""
+    cache = get_sheet_cache()
+    with cache["lock"]:
+        entry = cache["entries"].get(_cache_key(worksheet))
+        if entry is None or entry["df"].empty: return
+        entry["df"] = drop_sheet_rows(entry["df"], row_numbers) # Auswahl behält die kompakten Typen
+        entry["derived"] = {}
+    _note_own_write(worksheet, before)
+
+# --- GEBÜNDELTES SCHREIBEN ---
+SHEET_WRITE_BATCH = 200 # Zellen pro batch_update-Aufruf
+
+class SheetWriteBuffer:
+    """
+    Sammelt Zell-Updates (Zeilennummer aus "_Zeile", Spalte per Schema) und legt sie
+    gebündelt als EINE Outbox-Änderung ab; die Sync-Engine überträgt sie mit einem
+    batch_update. Ab flush_at Zellen wird automatisch weitergereicht. Zellen, die nicht
+    geschrieben werden können, landen in .failed (mit dem Fehler in .errors).
+    """
+    def __init__(self, worksheet, col_map, flush_at=SHEET_WRITE_BATCH):
+        self.worksheet = worksheet
+        self.col_map = col_map
+        self.flush_at = flush_at
+        self.pending = {}
+        self.written = 0
+        self.failed = []
+        self.errors = []
+
+    def set(self, zeile, column, value):
+        if column not in self.col_map:
+            self.failed.append((zeile, column))
+            return
+        self.pending[(int(zeile), column)] = value
+        if len(self.pending) >= self.flush_at: self.flush()
+
+    def flush(self):
+        if not self.pending: return
+        batch, self.pending = self.pending, {}
+        try:
+            queue_cells(self.worksheet, batch)
+        except Exception as e:
+            self.failed.extend(batch.keys())
+            self.errors.append(e)
+            return
+        self.written += len(batch)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+# --- DIFF & PATCH: NUR GEÄNDERTE ZELLEN/ZEILEN SCHREIBEN ---
+def diff_ranges(old_matrix, new_matrix):
+    """
+    Vergleicht zwei Wertematrizen (Zeile 1 = Kopfzeile) und liefert die geänderten
+    Zellen als batch_update-Bereiche; zusammenhängende Zellen einer Zeile werden
+    zu einem Bereich zusammengefasst.
+    """
+    ranges = []
+    for r, (old_row, new_row) in enumerate(itertools.zip_longest(old_matrix, new_matrix, fillvalue=[]), start=1):
+        run_start, run_values = None, []
+        width = max(len(old_row), len(new_row))
+        for c in range(width + 1): # +1: schließt den letzten Lauf ab
+            old_val = old_row[c] if c < len(old_row) else ""
+            new_val = new_row[c] if c < len(new_row) else ""
+            if c < width and str(old_val) != str(new_val):
+                if run_start is None: run_start = c
+                run_values.append(new_val)
+            elif run_start is not None:
+                start = gspread.utils.rowcol_to_a1(r, run_start + 1)
+                end = gspread.utils.rowcol_to_a1(r, run_start + len(run_values))
+                ranges.append({"range": f"{start}:{end}", "values": [run_values]})
+                run_start, run_values = None, []
+    return ranges
+
+def _delete_rows_request(worksheet, rows):
+    """Löscht beliebige Blattzeilen in EINEM Request – von unten nach oben, damit sich nichts verschiebt."""
+    rows = sorted({int(r) for r in rows}, reverse=True)
+    if not rows: return
+    # Zusammenhängende Zeilen als ein Bereich: [(start, ende_exklusiv), ...] absteigend
+    spans = []
+    for r in rows:
+        if spans and spans[-1][0] == r + 1: spans[-1][0] = r
+        else: spans.append([r, r + 1])
+    requests_ = [{"deleteDimension": {"range": {"sheetId": worksheet.id, "dimension": "ROWS",
+                                                "startIndex": start - 1, "endIndex": end - 1}}}
+                 for start, end in spans]
+    worksheet.spreadsheet.batch_update({"requests": requests_})
+
+def delete_sheet_rows(worksheet, row_numbers):
+    """
+    Löscht Blattzeilen sofort (ein Request) und zieht den Cache nach. Liefert die Anzahl –
+    oder None, wenn sich das Blatt seit dem Laden geändert hat (die Nummern wären veraltet).
+    """
+    rows = {int(r) for r in row_numbers}
+    if not rows: return 0
+    before = sheet_revision(worksheet)
+    entry = get_sheet_cache()["entries"].get(_cache_key(worksheet))
+    if before is None or entry is None or before != entry["revision"]: return None
+    _delete_rows_request(worksheet, rows)
+    patch_cached_delete(worksheet, rows, before)
+    return len(rows)
+
+def sync_author_sheet(ws_authors, names):
+    """
+    Bringt das Autoren-Blatt auf genau diese Namen: fehlende anhängen, überzählige
+    (und doppelte) Zeilen gezielt löschen. Kein clear() – das Blatt ist nie leer.
+    Liefert (hinzugefügt, gelöscht).
+    """
+    wanted = list(dict.fromkeys(n.strip() for n in names if str(n).strip())) # Reihenfolge fürs Anhängen
+    wanted_set = set(wanted) # für den Abgleich je Blattzeile
+    for _ in range(WRITE_ATTEMPTS):
+        df_a = load_sheet(ws_authors, force=True)
+        existing = set()
+        to_delete = []
+        if not df_a.empty:
+            for name, zeile in zip(df_a["Name"], df_a["_Zeile"]):
+                name = name.strip()
+                if name in existing or name not in wanted_set: to_delete.append(zeile)
+                else: existing.add(name)
+        # Zwischendurch fremd geändert -> Zeilennummern veraltet, mit frischem Stand nochmal
+        if delete_sheet_rows(ws_authors, to_delete) is not None: break
+    else:
+        raise RuntimeError("Autoren-Blatt ändert sich laufend – bitte erneut versuchen")
+    to_add = [[n] for n in wanted if n not in existing]
+
+    if to_add:
+        before = sheet_revision(ws_authors)
+        response = ws_authors.append_rows(to_add)
+        patch_cached_append(ws_authors, to_add, response, before)
+    return len(to_add), len(to_delete)
+
+# --- LOKALE REPLIK & WRITE-BEHIND-SYNC ---
+# Jedes Blatt liegt zusätzlich in SQLite: die "Basis" (letzter bekannter Stand bei Google)
+# plus eine Outbox mit unseren noch nicht übertragenen Änderungen. Angezeigt wird immer
+# Basis + Outbox; die Sync-Engine überträgt die Outbox im Hintergrund gebündelt.
+SYNC_INTERVAL = 5 # Sekunden zwischen zwei Übertragungen
+
+class LibraryReplica:
+    """Basis-Stand und Outbox je Blatt in SQLite – App startet und arbeitet auch ohne Netz."""
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.flush_locks = {}
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS replica_sheets (sheet TEXT PRIMARY KEY, "
+                              "revision TEXT, col_map TEXT, rows TEXT)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                              "sheet TEXT, op TEXT, payload TEXT, created REAL)")
+
+    def load(self, sheet):
+        with self.lock:
+            row = self.conn.execute("SELECT revision, col_map, rows FROM replica_sheets WHERE sheet = ?",
+                                    (sheet,)).fetchone()
+        if row is None: return None
+        revision, col_map, rows = row
+        col_map = types.MappingProxyType(json.loads(col_map))
+        rows = json.loads(rows)
+        if rows and len(rows[0]) != len(SCHEMA_COLUMNS) + 1: return None # älteres Format -> neu laden
+        base = pd.DataFrame(rows, columns=SCHEMA_COLUMNS + ["_Zeile"])
+        return base, col_map, revision
+
+    def save(self, sheet, base, col_map, revision):
+        rows = base[SCHEMA_COLUMNS + ["_Zeile"]].to_numpy().tolist() if not base.empty else []
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO replica_sheets VALUES (?, ?, ?, ?)",
+                              (sheet, revision, json.dumps(dict(col_map)), json.dumps(rows, default=str)))
+
+    def add_op(self, sheet, op, payload):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT INTO outbox (sheet, op, payload, created) VALUES (?, ?, ?, ?)",
+                              (sheet, op, json.dumps(payload, default=str), time.time()))
+
+    def pending(self, sheet):
+        with self.lock:
+            rows = self.conn.execute("SELECT id, op, payload FROM outbox WHERE sheet = ? ORDER BY id",
+                                     (sheet,)).fetchall()
+        return [(op_id, op, json.loads(payload)) for op_id, op, payload in rows]
+
+    def drop(self, sheet, upto_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM outbox WHERE sheet = ? AND id <= ?", (sheet, upto_id))
+
+    def pending_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def flush_lock(self, sheet):
+        # Ein Sync pro Blatt gleichzeitig
+        with self.lock:
+            return self.flush_locks.setdefault(sheet, threading.Lock())
+
+@st.cache_resource(show_spinner=False)
+def get_replica():
+    return LibraryReplica(CACHE_DB)
+
+def _replica_key(worksheet):
+    return f"{worksheet.spreadsheet_id}/{worksheet.id}"
+
+def apply_op(df, col_map, op, payload):
+    """
+    Spielt eine Outbox-Änderung auf einen Frame (liefert einen neuen Frame).
+    Zeilen werden über Zeilennummer + Titel + Autor wiedergefunden, damit eine Änderung
+    auch nach fremden Einfügungen/Löschungen noch das richtige Buch trifft. Ist das Buch
+    nicht mehr da, verfällt die Änderung (statt ein gleichnamiges Buch zu treffen).
+    """
+    if op == "append":
+        first_row = int(df["_Zeile"].max()) + 1 if not df.empty else 2
+        return pd.concat([df, rows_to_frame(payload["rows"], col_map, first_row)], ignore_index=True)
+    if op == "delete":
+        locate = _row_locator(df)
+        rows = [locate(target) for target in payload["targets"]]
+        return drop_sheet_rows(df, [int(df["_Zeile"].iat[p]) for p in rows if p is not None])
+    if op == "cells":
+        locate = _row_locator(df)
+        # Von anderswo gelöschte Bücher: Löschung gewinnt, die Änderung verfällt
+        return assign_cells(df, [(pos, cell["column"], cell["value"]) for cell in payload["cells"]
+                                 if cell["column"] in col_map and (pos := locate(cell)) is not None])
+    return df
+
+def _row_locator(df):
+    # Wie _locate_row, aber für viele Ziele: Positionen einmal nachschlagen statt je Ziel filtern
+    if df.empty: return lambda target: None
+    books = list(zip(df["Titel"].astype(object), df["Autor"].astype(object)))
+    by_row = {int(z): i for i, z in enumerate(df["_Zeile"])}
+    first_by_book = {}
+    for i, book in enumerate(books): first_by_book.setdefault(book, i)
+    def locate(target):
+        pos = by_row.get(int(target["zeile"]))
+        if "autor" not in target: # Outbox-Einträge von vor den Autor-Angaben: nur die genaue Zeile
+            return pos if pos is not None and books[pos][0] == target["titel"] else None
+        book = (target["titel"], target["autor"])
+        if pos is not None and books[pos] == book: return pos
+        return first_by_book.get(book)
+    return locate
+
+def _install_base(worksheet, base, col_map, revision):
+    # Neue Basis übernehmen: noch offene Änderungen obendrauf spielen und lokal sichern
+    replica = get_replica()
+    df = base
+    for _, op, payload in replica.pending(_replica_key(worksheet)):
+        df = apply_op(df, col_map, op, payload)
+    entry = {"base": base, "col_map": col_map, "revision": revision, "checked": time.time()}
+    cache = get_sheet_cache()
+    with cache["lock"]:
+        _carry_frame(cache["entries"].get(_cache_key(worksheet)), entry, df)
+        cache["entries"][_cache_key(worksheet)] = entry
+    replica.save(_replica_key(worksheet), base, col_map, revision)
+    return entry
+
+def _carry_frame(old, entry, df):
+    """
+    Setzt entry["df"] (kompakt) und entry["derived"] für den neuen Stand df. Hat df genau die
+    Zeilen des bisherigen Eintrags (z.B. nach einem Sync, der nur Zellen geschrieben hat),
+    bleibt der alte Frame und wird nur an geänderten Zellen geflickt; abgeleitete Indizes
+    ziehen über apply_cells nach. Ein Neubau des Suchindex kostet bei 100k Zeilen Sekunden.
+    """
+    same_rows = old is not None and old["col_map"] == entry["col_map"] and len(old["df"]) == len(df) and \
+        not df.empty and np.array_equal(old["df"]["_Zeile"].to_numpy(dtype=int), df["_Zeile"].to_numpy(dtype=int))
+    if not same_rows:
+        entry["df"], entry["derived"] = compact_frame(df), {}
+        return
+    current = plain_frame(old["df"])
+    cells, updates = [], {}
+    for column in SCHEMA_COLUMNS:
+        new_values = df[column].to_numpy(dtype=object)
+        for pos in np.flatnonzero(current[column].to_numpy(dtype=object) != new_values):
+            cells.append((pos, column, new_values[pos]))
+            updates[(int(df["_Zeile"].iat[pos]), column)] = new_values[pos]
+    if not cells:
+        entry["df"], entry["derived"] = old["df"], old.get("derived", {})
+        return
+    entry["df"] = compact_frame(assign_cells(old["df"], cells), {column for _, column, _ in cells})
+    entry["derived"] = old.get("derived", {})
+    _carry_derived(entry, "apply_cells", updates, entry["df"])
+
+def _entry_from_replica(worksheet):
+    # Nur unter cache["lock"] aufrufen. checked=0 -> erster Zugriff prüft trotzdem die Revision.
+    stored = get_replica().load(_replica_key(worksheet))
+    if stored is None: return None
+    base, col_map, revision = stored
+    df = base
+    for _, op, payload in get_replica().pending(_replica_key(worksheet)):
+        df = apply_op(df, col_map, op, payload)
+    entry = {"df": compact_frame(df), "base": base, "col_map": col_map, "revision": revision, "checked": 0}
+    get_sheet_cache()["entries"][_cache_key(worksheet)] = entry
+    return entry
+
+def queue_change(worksheet, op, payload):
+    """Legt eine Änderung in die Outbox und zeigt sie sofort im lokalen Stand an."""
+    load_sheet(worksheet)
+    cache = get_sheet_cache()
+    with cache["lock"]:
+        get_replica().add_op(_replica_key(worksheet), op, payload)
+        entry = cache["entries"].get(_cache_key(worksheet))
+        if entry is None: return None
+        old = entry["df"]
+        if op == "append":
+            first_row = int(old["_Zeile"].max()) + 1 if not old.empty else 2
+            entry["df"] = append_compact(old, rows_to_frame(payload["rows"], entry["col_map"], first_row))
+        elif op == "cells":
+            # Nur die geänderten Spalten neu packen – der Rest ist schon kompakt
+            entry["df"] = compact_frame(apply_op(old, entry["col_map"], op, payload), {c["column"] for c in payload["cells"]})
+        else:
+            entry["df"] = apply_op(old, entry["col_map"], op, payload)
+        if op == "append":
+            _carry_derived(entry, "apply_append", entry["df"].iloc[len(old):], entry["df"])
+        elif op == "cells":
+            updates = {(int(c["zeile"]), c["column"]): c["value"] for c in payload["cells"]}
+            _carry_derived(entry, "apply_cells", updates, entry["df"])
+        else:
+            entry["derived"] = {}
+        return entry
+
+def queue_append(worksheet, raw_rows):
+    """Neue Zeilen vormerken. Liefert die (vorläufige) Zeilennummer der ersten."""
+    before = len(load_sheet(worksheet))
+    entry = queue_change(worksheet, "append", {"rows": [list(r) for r in raw_rows]})
+    if entry is None or len(entry["df"]) <= before: return None
+    return int(entry["df"]["_Zeile"].iloc[before])
+
+def queue_delete(worksheet, targets):
+    """targets: {zeile: (titel, autor)} – Bücher zum Löschen vormerken."""
+    if not targets: return
+    queue_change(worksheet, "delete", {"targets": [{"zeile": int(z), "titel": t, "autor": a}
+                                                   for z, (t, a) in targets.items()]})
+
+def queue_cells(worksheet, updates):
+    """updates: {(zeile, spalte): wert} – Zelländerungen vormerken (Titel + Autor sichern die Zeile ab)."""
+    if not updates: return
+    df = load_sheet(worksheet)
+    books = dict(zip(df["_Zeile"], zip(df["Titel"].astype(object), df["Autor"].astype(object)))) \
+        if "Titel" in df.columns else {}
+    cells = [{"zeile": int(zeile), "titel": books.get(zeile, ("", ""))[0], "autor": books.get(zeile, ("", ""))[1],
+              "column": column, "value": value}
+             for (zeile, column), value in updates.items()]
+    queue_change(worksheet, "cells", {"cells": cells})
+
+def flush_outbox(worksheet):
+    """
+    Überträgt alle offenen Änderungen eines Blatts: höchstens ein batch_update für Zellen,
+    ein Request für Löschungen und ein append_rows. Vorher wird immer der aktuelle Stand
+    bei Google geholt und unsere Outbox darauf neu angewendet (Rebase) – Zeilennummern
+    aus dem Cache können veraltet sein, und eine falsche Zeilennummer löscht das falsche
+    Buch. Ändert sich das Blatt zwischen Holen und Schreiben, wird neu aufgesetzt.
+    Konfliktregeln: fremde Löschung schlägt unsere Zelländerung, unsere Zelländerung
+    schlägt fremde Änderungen derselben Zelle, neue Bücher kommen immer an.
+    Liefert die Anzahl übertragener Änderungen; bei Fehlern bleibt die Outbox stehen.
+    """
+    replica = get_replica()
+    key = _replica_key(worksheet)
+    with replica.flush_lock(key):
+        ops = replica.pending(key)
+        if not ops: return 0
+
+        for _ in range(WRITE_ATTEMPTS):
+            revision = sheet_revision(worksheet)
+            base, col_map = read_sheet_frame(worksheet)
+            work = base.assign(_Remote=base["_Zeile"]) if not base.empty else \
+                pd.DataFrame(columns=SCHEMA_COLUMNS + ["_Zeile", "_Remote"])
+            for _, op, payload in ops:
+                work = apply_op(work, col_map, op, payload)
+
+            width = max(col_map.values()) + 1 if col_map else 0
+            def sheet_row(values):
+                row = [""] * width
+                for column, value in zip(col_map, values): row[col_map[column]] = value
+                return row
+
+            # 1) Zellen bestehender Zeilen: alt/neu an der echten Blattzeile gegenüberstellen
+            kept = work[work["_Remote"].notna()]
+            remote_rows = kept["_Remote"].astype(int).to_numpy()
+            height = int(remote_rows.max()) if len(remote_rows) else 0
+            old_matrix, new_matrix = [[] for _ in range(height)], [[] for _ in range(height)]
+            old_values = base.set_index("_Zeile").loc[remote_rows, list(col_map)].itertuples(index=False) if height else []
+            for r, old_vals, new_vals in zip(remote_rows, old_values, kept[list(col_map)].itertuples(index=False)):
+                if tuple(old_vals) != tuple(new_vals):
+                    old_matrix[r - 1], new_matrix[r - 1] = sheet_row(old_vals), sheet_row(new_vals)
+            ranges = diff_ranges(old_matrix, new_matrix)
+            # 2) Löschungen: was in der Basis war und jetzt fehlt
+            gone = sorted(set(base["_Zeile"].astype(int)) - set(remote_rows)) if not base.empty else []
+            # Noch derselbe Stand wie beim Holen? Sonst sind die Zeilennummern schon wieder alt
+            if sheet_revision(worksheet) == revision: break
+        else:
+            raise RuntimeError("Blatt ändert sich laufend – Sync im nächsten Takt")
+
+        # RAW: Titel wie "1984" oder "=Mord" bleiben Text, so wie wir sie lokal führen
+        if ranges: worksheet.batch_update(ranges, value_input_option=gspread.utils.ValueInputOption.raw)
+        if gone: _delete_rows_request(worksheet, gone)
+
+        # 3) Neue Bücher in einem append_rows
+        added = work[work["_Remote"].isna()]
+        first_row = None
+        if not added.empty:
+            response = worksheet.append_rows([sheet_row(v) for v in added[list(col_map)].itertuples(index=False)],
+                                             value_input_option=gspread.utils.ValueInputOption.raw)
+            first_row = _first_appended_row(response)
+
+        # Neue Basis mit echten Blatt-Zeilennummern
+        new_base = work.copy()
+        new_base.loc[kept.index, "_Zeile"] = remote_rows - np.searchsorted(np.asarray(gone, dtype=int), remote_rows)
+        if not added.empty:
+            start = first_row or (len(kept) + 2)
+            new_base.loc[added.index, "_Zeile"] = np.arange(start, start + len(added))
+        new_base = new_base.drop(columns="_Remote").astype({"_Zeile": int})
+        # Alle Werte als Text – so wie get_all_values() sie später auch liefert
+        new_base[list(col_map)] = new_base[list(col_map)].astype(str)
+
+        replica.drop(key, ops[-1][0])
+        _install_base(worksheet, new_base, col_map, sheet_revision(worksheet))
+        return len(ops)
+
+class SyncEngine:
+    """Hintergrund-Thread, der die Outbox regelmäßig zu Google überträgt (write-behind)."""
+    def __init__(self):
+        self.wakeup = threading.Event()
+        self.last_error = None
+        self.last_sync = None
+        self.thread = threading.Thread(target=self._run, name="sheet-sync", daemon=True)
+        self.thread.start()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(timeout=SYNC_INTERVAL)
+            self.wakeup.clear()
+            if not get_replica().pending_count(): continue
+            try:
+                sheets = get_sheets()
+                if sheets is None: raise ConnectionError("Keine Verbindung zu Google")
+                for worksheet in sheets: flush_outbox(worksheet)
+                self.last_error, self.last_sync = None, time.time()
+            except Exception as e:
+                self.last_error = e # Outbox bleibt liegen, nächster Versuch im nächsten Takt
+                note_error("sync", "flush", e)
+
+@st.cache_resource(show_spinner=False)
+def get_sync_engine():
+    return SyncEngine()
+
+def force_reload(ws_books, ws_authors):
+    load_sheet(ws_books, force=True)
+    load_sheet(ws_authors, force=True)
     st.rerun()
 
 def sync_authors(ws_books, ws_authors):
     if "sync_done" in st.session_state: return 0
-    if "df_books" not in st.session_state: st.session_state.df_books = fetch_data_from_sheet(ws_books)
-    if "df_authors" not in st.session_state: st.session_state.df_authors = fetch_data_from_sheet(ws_authors)
-        
-    df_b = st.session_state.df_books
-    df_a = st.session_state.df_authors
+    # Geteilter Frame aus dem Cache – keine Kopie pro Sitzung
+    df_b = load_sheet(ws_books)
+    df_a = load_sheet(ws_authors)
     if df_b.empty: return 0
     
     book_authors = set([a.strip() for a in df_b["Autor"].tolist() if a.strip()])
@@ -139,114 +1168,993 @@ def sync_authors(ws_books, ws_authors):
     
     if missing:
         rows_to_add = [[name] for name in missing]
-        ws_authors.append_rows(rows_to_add)
+        before = sheet_revision(ws_authors)
+        response = ws_authors.append_rows(rows_to_add)
+        patch_cached_append(ws_authors, rows_to_add, response, before)
         st.session_state.sync_done = True
-        del st.session_state.df_authors
         return len(missing)
     st.session_state.sync_done = True
     return 0
 
-def process_genre(raw_genre):
-    if not raw_genre: return "Roman"
-    if raw_genre in ["Roman", "Fiction", "Novel", "General", "Stories"]: return "Roman"
-    if "Fantasy" in raw_genre: return "Fantasy"
-    if "Thriller" in raw_genre or "Crime" in raw_genre: return "Krimi"
-    try:
-        translator = GoogleTranslator(source='auto', target='de')
-        translated = translator.translate(raw_genre)
-        if "römisch" in translated.lower(): return "Roman"
-        return translated
-    except: return "Roman"
+# --- LOKALER METADATEN-CACHE (SQLITE, ÜBERLEBT NEUSTARTS) ---
+CACHE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "buecher_cache.sqlite")
+META_TTL = 90 * 24 * 3600 # Gefundene Cover/Genres: 90 Tage
+META_NEGATIVE_TTL = 7 * 24 * 3600 # "Nichts gefunden": nach einer Woche neu versuchen
+GENRE_TTL = 365 * 24 * 3600 # Übersetzte Kategorien ändern sich praktisch nie
+META_MAX_ENTRIES = 20000 # Pro Tabelle; darüber fliegen die am längsten ungenutzten raus
+
+class MetadataCache:
+    """
+    Kleiner Schlüssel/Wert-Speicher auf SQLite mit Ablaufzeit und LRU-Verdrängung.
+    Threadsicher, damit der Enrichment-Pool ihn direkt benutzen kann.
+    """
+    TABLES = ("book_meta", "genre_map")
 
-def search_open_library_cover(titel, autor):
+    def __init__(self, path, max_entries=META_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            for table in self.TABLES:
+                self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                                  "(key TEXT PRIMARY KEY, value TEXT, expires REAL, used REAL)")
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_used ON {table}(used)")
+
+    def get(self, table, key):
+        """Gespeicherter Wert (JSON-dekodiert) oder None, wenn unbekannt/abgelaufen."""
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(f"SELECT value, expires FROM {table} WHERE key = ?", (key,)).fetchone()
+            if row is None: return None
+            if row[1] < now:
+                self.conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+                return None
+            self.conn.execute(f"UPDATE {table} SET used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, table, key, value, ttl):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(f"INSERT OR REPLACE INTO {table} (key, value, expires, used) VALUES (?, ?, ?, ?)",
+                              (key, json.dumps(value), now + ttl, now))
+            overflow = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self.conn.execute(f"DELETE FROM {table} WHERE key IN "
+                                  f"(SELECT key FROM {table} ORDER BY used ASC LIMIT ?)", (overflow,))
+
+@st.cache_resource(show_spinner=False)
+def get_meta_cache():
+    return MetadataCache(CACHE_DB)
+
+def normalize_key(*parts):
+    # "Anna  Enquist " und "anna enquist" sollen denselben Eintrag treffen
+    clean = [" ".join(unicodedata.normalize("NFKC", str(p)).casefold().split()) for p in parts]
+    return "|".join(clean)
+
+# --- GENRE-ZUORDNUNG (OFFLINE, REGELBASIERT) ---
+# Google-Books/BISAC-Kategorien ("Fiction / Mystery & Detective / General") und deutsche
+# Bezeichnungen -> Regal-Genre. Reihenfolge = Priorität: Spezielles vor Allgemeinem.
+# Mehrteilige Schlüssel müssen als Wortfolge vorkommen. Hier pflegen, nicht im Code verstreuen!
+GENRE_RULES = [
+    ("Sachbuch", ["true crime", "literary criticism", "language arts", "foreign language study", "study aids"]),
+    ("Kinderbuch", ["juvenile", "children", "kinderbuch", "kinderbücher", "bilderbuch"]),
+    ("Jugendbuch", ["young adult", "jugendbuch", "jugendbücher", "jugendliteratur"]),
+    ("Science-Fiction", ["science fiction", "dystopian", "dystopie", "space opera", "zukunftsroman"]),
+    ("Fantasy", ["fantasy", "fantastik", "märchen", "fairy tales"]),
+    ("Horror", ["horror", "ghost", "gruselgeschichten"]),
+    ("Krimi", ["mystery", "detective", "crime", "thriller", "thrillers", "suspense", "krimi", "krimis",
+               "kriminalroman", "kriminalromane", "kriminalliteratur", "noir"]),
+    ("Liebesroman", ["romance", "romantic", "love stories", "liebesroman", "liebesromane", "liebe"]),
+    ("Historischer Roman", ["fiction historical", "historical fiction", "historischer roman", "historische romane"]),
+    ("Humor", ["humor", "humour", "humorous", "comics", "satire", "humoristische"]),
+    ("Lyrik", ["poetry", "poems", "lyrik", "gedichte"]),
+    ("Klassiker", ["classics", "klassiker"]),
+    ("Biografie", ["biography", "autobiography", "memoir", "memoirs", "biografie", "biographie",
+                   "autobiografie", "biografien", "erinnerungen"]),
+    ("Kochbuch", ["cooking", "cookbook", "cookbooks", "kochbuch", "kochen", "backen", "rezepte"]),
+    ("Reise", ["travel", "reiseführer", "reisen", "reiseberichte"]),
+    ("Ratgeber", ["self help", "health fitness", "family relationships", "ratgeber", "lebenshilfe", "gesundheit"]),
+    ("Religion", ["religion", "bibles", "christian", "spirituality", "theologie", "glaube"]),
+    ("Philosophie", ["philosophy", "philosophie"]),
+    ("Psychologie", ["psychology", "psychologie"]),
+    ("Geschichte", ["history", "geschichte", "zeitgeschichte"]),
+    ("Natur", ["nature", "gardening", "pets", "natur", "garten", "tiere"]),
+    ("Kunst", ["art", "music", "photography", "kunst", "musik", "fotografie"]),
+    ("Sachbuch", ["nonfiction", "non fiction", "science", "political", "politics", "business", "economics",
+                  "social science", "technology", "medical", "reference", "education", "sachbuch", "sachbücher",
+                  "wissenschaft", "politik", "wirtschaft"]),
+    ("Roman", ["fiction", "novel", "novels", "roman", "romane", "belletristik", "literary", "literature",
+               "literatur", "stories", "short stories", "erzählungen", "erzählung", "general"]),
+]
+GENRE_VOCAB = sorted({tok for _, keys in GENRE_RULES for key in keys for tok in key.split()})
+GENRE_FALLBACK = "Roman"
+GENRE_OVERRIDE_TTL = 600 # Sekunden, so lange gilt das eingelesene "Genres"-Blatt
+
+def genre_tokens(text):
+    return re.findall(r"[^\W\d_]+", fold_text(text))
+
+@functools.lru_cache(maxsize=4096)
+def _canonical_token(token):
+    # Tippfehler, Plural, Komposita: "thrilers", "Kriminalromane" -> bekanntes Schlüsselwort
+    if token in GENRE_VOCAB or len(token) < 5: return token
+    for key in GENRE_VOCAB:
+        if len(key) >= 5 and token.startswith(key): return key
+    close = difflib.get_close_matches(token, GENRE_VOCAB, n=1, cutoff=0.85)
+    return close[0] if close else token
+
+def _contains_phrase(tokens_joined, phrase):
+    return f" {phrase} " in tokens_joined
+
+def classify_genre(raw_genre):
+    """Regel-Treffer für eine Kategorie oder None (dann weiß die Tabelle es nicht)."""
+    joined = " " + " ".join(_canonical_token(t) for t in genre_tokens(raw_genre)) + " "
+    for genre, keys in GENRE_RULES:
+        if any(_contains_phrase(joined, key) for key in keys): return genre
+    return None
+
+def parse_genre_overrides(rows):
+    """Blatt "Genres": Spalten Kategorie | Genre (Kopfzeile optional) -> {gefaltete Kategorie: Genre}."""
+    if not rows: return {}
+    header = [str(h).strip().lower() for h in rows[0]]
+    cat_idx = next((i for i, h in enumerate(header) if h in ("kategorie", "category")), None)
+    genre_idx = next((i for i, h in enumerate(header) if h == "genre"), None)
+    if cat_idx is None or genre_idx is None: cat_idx, genre_idx = 0, 1
+    else: rows = rows[1:]
+    overrides = {}
+    for row in rows:
+        if len(row) > max(cat_idx, genre_idx) and row[cat_idx].strip() and row[genre_idx].strip():
+            overrides[" ".join(genre_tokens(row[cat_idx]))] = row[genre_idx].strip()
+    return overrides
+
+@st.cache_resource(show_spinner=False)
+def get_genre_override_state():
+    return {"lock": threading.Lock(), "checked": 0.0, "map": {}}
+
+def genre_overrides():
+    """Von Mama pflegbare Korrekturen aus dem optionalen Blatt "Genres" (kurz gecacht)."""
+    state = get_genre_override_state()
+    with state["lock"]:
+        if time.time() - state["checked"] < GENRE_OVERRIDE_TTL: return state["map"]
+        state["checked"] = time.time()
+        try:
+            sheets = get_sheets()
+            if sheets is None: return state["map"]
+            rows = sheets[0].spreadsheet.worksheet("Genres").get_all_values()
+        except gspread.exceptions.WorksheetNotFound:
+            rows = []
+        except Exception as e:
+            note_error("sheets", "genres", e)
+            return state["map"]
+        state["map"] = parse_genre_overrides(rows)
+        return state["map"]
+
+def match_genre_override(raw_genre, overrides):
+    # Ganze Kategorie zuerst, sonst die längste Override-Wortfolge, die darin vorkommt
+    folded = " ".join(genre_tokens(raw_genre))
+    if folded in overrides: return overrides[folded]
+    hits = [key for key in overrides if key and _contains_phrase(f" {folded} ", key)]
+    return overrides[max(hits, key=len)] if hits else None
+
+@st.cache_resource(show_spinner=False)
+def get_translation_queue():
+    return {"pool": ThreadPoolExecutor(max_workers=1, thread_name_prefix="genre-translate"),
+            "pending": set(), "lock": threading.Lock(),
+            "waiting": {}} # Kategorie -> Aufträge, die bis zur Übersetzung das Standard-Genre bekommen haben
+
+def _translate_genre(raw_genre):
+    queue = get_translation_queue()
     try:
-        query = f"{titel} {autor}".replace(" ", "+")
-        url = f"https://openlibrary.org/search.json?q={query}&limit=1"
-        headers = {"User-Agent": "MamasBuecherweltApp/1.0"}
-        response = requests.get(url, headers=headers, timeout=5)
+        with measure("translate", "google"):
+            translated = deep_translator.GoogleTranslator(source='auto', target='de').translate(raw_genre)
+        genre = "Roman" if "römisch" in translated.lower() else classify_genre(translated) or translated
+        get_meta_cache().put("genre_map", raw_genre, genre, GENRE_TTL)
+    except Exception as e:
+        note_error("lookup", "genre", e)
+        # Sonst würde jeder Nachtrag die Übersetzung neu anstoßen – eine Woche das Standard-Genre
+        get_meta_cache().put("genre_map", raw_genre, GENRE_FALLBACK, META_NEGATIVE_TTL)
+    finally:
+        with queue["lock"]:
+            queue["pending"].discard(raw_genre)
+            waiting = queue["waiting"].pop(raw_genre, [])
+        # Bücher mit vorläufigem Genre: der Worker trägt jetzt das richtige nach
+        if waiting:
+            worker = get_enrichment_worker()
+            for payload in waiting: worker.submit(**payload)
+
+def wait_for_translation(raw_genre, payload):
+    """Merkt den Auftrag vor, falls raw_genre gerade übersetzt wird. False: keine Übersetzung offen."""
+    queue = get_translation_queue()
+    with queue["lock"]:
+        if raw_genre not in queue["pending"]: return False
+        queue["waiting"].setdefault(raw_genre, []).append(payload)
+        return True
+
+def process_genre(raw_genre):
+    """
+    Kategorie -> Regal-Genre, ohne Netz: Override-Blatt, dann Regeltabelle, dann früher
+    übersetzte Kategorien. Unbekanntes wird nur noch im Hintergrund übersetzt (fürs nächste
+    Mal gecacht) – bis dahin gibt's das Standard-Genre.
+    """
+    if not raw_genre: return GENRE_FALLBACK
+    genre = match_genre_override(raw_genre, genre_overrides()) or classify_genre(raw_genre)
+    if genre: return genre
+    cached = get_meta_cache().get("genre_map", raw_genre)
+    if cached is not None: return cached
+    queue = get_translation_queue()
+    with queue["lock"]:
+        if raw_genre not in queue["pending"]:
+            queue["pending"].add(raw_genre)
+            queue["pool"].submit(_translate_genre, raw_genre)
+    return GENRE_FALLBACK
+
+# --- EXTERNE ABFRAGEN (RATE-LIMIT, RETRY, PARALLEL) ---
+ENRICH_WORKERS = 4 # Max. gleichzeitige Buch-Suchen
+HOST_MIN_INTERVAL = {"www.googleapis.com": 0.2, "openlibrary.org": 0.5} # Sekunden zwischen zwei Anfragen
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5 # Sekunden, verdoppelt sich pro Versuch
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class HostRateLimiter:
+    """Hält pro Host einen Mindestabstand zwischen Anfragen ein (threadsicher)."""
+    def __init__(self, intervals, default=0.5):
+        self.intervals = intervals
+        self.default = default
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.intervals.get(host, self.default)
+        # Geschlafen wird außerhalb des Locks, andere Hosts laufen weiter
+        if slot > now: time.sleep(slot - now)
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter():
+    return HostRateLimiter(HOST_MIN_INTERVAL)
+
+HTTP_TIMEOUT = (3.05, 8) # Sekunden: (Verbindungsaufbau, Lesen)
+HTTP_POOL_HOSTS = 8 # so viele Hosts behalten ihren Verbindungs-Pool
+HTTP_POOL_SIZE = 2 * ENRICH_WORKERS # offene Keep-Alive-Verbindungen je Host
+HTTP_REVALIDATE_ENTRIES = 256 # Antworten mit ETag/Last-Modified, die bedingt neu angefragt werden
+HTTP_REVALIDATE_MAX_BYTES = 512 * 1024 # größere Antworten merken wir uns nicht (max. ENTRIES x MAX_BYTES im Speicher)
+
+class HttpClient:
+    """
+    Eine geteilte requests.Session für alle Buch-Dienste: je Host ein Pool aus Keep-Alive-
+    Verbindungen (kein neuer TCP/TLS-Handshake pro Suche), gzip, getrennte Timeouts.
+    Antworten mit ETag/Last-Modified werden gemerkt und beim nächsten Mal bedingt angefragt –
+    ein 304 liefert die gemerkte Antwort ohne erneuten Download. Bilder nicht: Cover landen
+    verkleinert im ThumbnailStore und werden danach gar nicht mehr angefragt.
+    """
+    def __init__(self):
+        self.session = requests.Session()
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE,
+                                                     max_retries=0) # Wiederholungen macht http_get
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.lock = threading.Lock()
+        self.validated = collections.OrderedDict() # Anfrage -> letzte 200-Antwort mit Validator
+        self.not_modified = collections.Counter() # Host -> 304-Antworten
+
+    @staticmethod
+    def _key(url, params):
+        return url + "?" + urllib.parse.urlencode(sorted((params or {}).items()))
+
+    def get(self, url, **kwargs):
+        key = self._key(url, kwargs.get("params"))
+        with self.lock: cached = self.validated.get(key)
+        if cached is not None:
+            headers = dict(kwargs.get("headers") or {})
+            if cached.headers.get("ETag"): headers["If-None-Match"] = cached.headers["ETag"]
+            if cached.headers.get("Last-Modified"): headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+            kwargs["headers"] = headers
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        response = self.session.get(url, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            with self.lock:
+                self.validated.move_to_end(key)
+                self.not_modified[urllib.parse.urlparse(url).netloc] += 1
+            return cached
+        if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")) \
+                and not response.headers.get("Content-Type", "").startswith("image/") \
+                and len(response.content) <= HTTP_REVALIDATE_MAX_BYTES:
+            with self.lock:
+                self.validated[key] = response
+                self.validated.move_to_end(key)
+                while len(self.validated) > HTTP_REVALIDATE_ENTRIES: self.validated.popitem(last=False)
+        return response
+
+    def host_table(self):
+        """Je Host: Anfragen, neu aufgebaute Verbindungen, 304-Treffer und Latenz (aus der Telemetrie)."""
+        pools = self.adapter.poolmanager.pools
+        rows = {}
+        for pool_key in pools.keys():
+            try: pool = pools[pool_key]
+            except KeyError: continue # gerade verdrängt
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            row = rows.setdefault(host, {"Host": host, "Anfragen": 0, "neue Verbindungen": 0})
+            row["Anfragen"] += pool.num_requests
+            row["neue Verbindungen"] += pool.num_connections
+        telemetry = get_telemetry()
+        with telemetry.lock, self.lock:
+            for host, row in rows.items():
+                c = telemetry.process.calls.get(f"http:{host}", {})
+                timed = sum(c.get("hist", ()))
+                row["304 (unverändert)"] = self.not_modified[host]
+                row["Ø ms"] = round(c["total_s"] / timed * 1000, 1) if timed else None
+                row["max ms"] = round(c.get("max_s", 0.0) * 1000, 1)
+        return pd.DataFrame(list(rows.values()))
+
+@st.cache_resource(show_spinner=False)
+def get_http_client():
+    return HttpClient()
+
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit(): return min(float(retry_after), 30)
+    return HTTP_BACKOFF * (2 ** attempt) * (1 + random.random() / 2)
+
+def http_get(url, **kwargs):
+    """GET über den geteilten HttpClient, mit Rate-Limit pro Host und Retry bei 429/5xx und Netzwerkfehlern."""
+    host = urllib.parse.urlparse(url).netloc
+    client = get_http_client()
+    for attempt in range(HTTP_RETRIES):
+        last_try = attempt == HTTP_RETRIES - 1
+        get_rate_limiter().wait(host)
+        response = None
+        try:
+            with measure("http", host) as m:
+                response = client.get(url, **kwargs)
+                if response.status_code >= 400: m.error = f"HTTP {response.status_code}"
+            if response.status_code not in RETRY_STATUS or last_try: return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_try: raise
+        time.sleep(_retry_delay(response, attempt))
+
+def _enrich_one(titel, autor, book_id="", isbn="", refresh=False):
+    result = fetch_book_data_background(titel, autor, book_id, isbn, refresh=refresh)
+    # Gefundenes Cover gleich als lokales Vorschaubild ablegen
+    if result[0]: get_thumbnail_store().fetch(result[0])
+    return result
+
+def enrich_books(books, on_progress=None, workers=ENRICH_WORKERS, refresh=False):
+    """
+    Sucht Cover & Genre für viele Bücher gleichzeitig (begrenzter Thread-Pool).
+    books: Liste von (schlüssel, titel, autor[, buch_id, isbn]).
+    Liefert {schlüssel: (cover, genre, isbn, buch_id)}.
+    on_progress(erledigt, gesamt, schlüssel, ergebnis) läuft im aufrufenden Thread,
+    darf also Streamlit-Elemente schreiben. refresh=True: gemerkte Ergebnisse ignorieren.
+    """
+    results = {}
+    if not books: return results
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        enrich_one = bind_scope(_enrich_one)
+        futures = {pool.submit(enrich_one, *book[1:], refresh=refresh): book[0] for book in books}
+        for done, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            try: results[key] = future.result()
+            except Exception as e:
+                note_error("lookup", "enrich", e)
+                results[key] = ("", GENRE_FALLBACK, "", "")
+            if on_progress: on_progress(done, len(futures), key, results[key])
+    return results
+
+# --- BUCH-SUCHE (BEIDE ANBIETER GLEICHZEITIG, MEHRERE KANDIDATEN) ---
+LOOKUP_CANDIDATES = 5 # Treffer je Anbieter, die wir vergleichen
+LOOKUP_MIN_SCORE = 0.6 # darunter ist es wohl ein anderes Buch -> lieber nichts speichern
+GOOGLE_BOOKS_API = "https://www.googleapis.com/books/v1/volumes"
+OPEN_LIBRARY = "https://openlibrary.org"
+OL_HEADERS = {"User-Agent": "MamasBuecherweltApp/1.0"}
+
+@st.cache_resource(show_spinner=False)
+def get_lookup_pool():
+    return ThreadPoolExecutor(max_workers=2 * ENRICH_WORKERS, thread_name_prefix="lookup")
+
+def _google_candidate(item):
+    info = item.get("volumeInfo", {})
+    isbns = {i.get("type"): i.get("identifier") for i in info.get("industryIdentifiers", [])}
+    return {"id": f"gb:{item['id']}" if item.get("id") else "", "title": info.get("title", ""),
+            "authors": info.get("authors", []), "cover": info.get("imageLinks", {}).get("thumbnail", ""),
+            "category": (info.get("categories") or [""])[0], "isbn": isbns.get("ISBN_13") or isbns.get("ISBN_10") or ""}
+
+def _open_library_candidate(doc):
+    cover_id = doc.get("cover_i")
+    return {"id": f"ol:{doc['key']}" if doc.get("key") else "", "title": doc.get("title", ""),
+            "authors": doc.get("author_name", []),
+            "cover": f"https://covers.openlibrary.org/b/id/{cover_id}-M.jpg" if cover_id else "",
+            "category": (doc.get("subject") or [""])[0], "isbn": (doc.get("isbn") or [""])[0]}
+
+def google_books_candidates(titel, autor):
+    """Bis zu LOOKUP_CANDIDATES Treffer – oder None, wenn Google nicht (sinnvoll) geantwortet hat."""
+    params = {"q": f"{titel} {autor}", "langRestrict": "de", "maxResults": LOOKUP_CANDIDATES}
+    response = http_get(GOOGLE_BOOKS_API, params=params)
+    if response.status_code != 200: return None
+    return [_google_candidate(item) for item in response.json().get("items", [])]
+
+def open_library_candidates(titel, autor):
+    params = {"q": f"{titel} {autor}", "limit": LOOKUP_CANDIDATES, "fields": "key,title,author_name,cover_i,isbn,subject"}
+    response = http_get(f"{OPEN_LIBRARY}/search.json", params=params, headers=OL_HEADERS)
+    if response.status_code != 200: return None
+    return [_open_library_candidate(doc) for doc in response.json().get("docs", [])]
+
+def _similarity(a, b):
+    return difflib.SequenceMatcher(None, normalize_key(a), normalize_key(b)).ratio()
+
+def score_candidate(candidate, titel, autor):
+    """0..1: wie gut passt der Treffer zu Titel (65 %) und Autor (35 %)?"""
+    title_score = _similarity(titel, candidate["title"])
+    # Untertitel stören nicht: "Der Trafikant: Roman" passt voll zu "Der Trafikant"
+    if normalize_key(candidate["title"]).startswith(normalize_key(titel)): title_score = max(title_score, 0.95)
+    author_score = max((_similarity(autor, a) for a in candidate["authors"]), default=0.0)
+    # Kurzform "Enquist" passt zu "Anna Enquist"
+    wanted = set(normalize_key(autor).split())
+    if wanted and any(wanted <= set(normalize_key(a).split()) for a in candidate["authors"]):
+        author_score = max(author_score, 0.9)
+    return 0.65 * title_score + 0.35 * author_score
+
+def pick_metadata(candidates):
+    # Der beste Treffer gibt die ID vor; Cover/ISBN/Kategorie notfalls vom nächstbesten, der sie hat
+    result = {"cover": "", "genre": GENRE_FALLBACK, "isbn": "", "id": "", "category": ""}
+    if not candidates: return result
+    result["id"] = candidates[0]["id"]
+    result["cover"] = next((c["cover"] for c in candidates if c["cover"]), "")
+    result["isbn"] = next((c["isbn"] for c in candidates if c["isbn"]), "")
+    # Google-Kategorien sind sauberer als Open-Library-Schlagworte
+    category = next((c["category"] for c in candidates if c["category"] and c["id"].startswith("gb:")), "") \
+        or next((c["category"] for c in candidates if c["category"]), "")
+    result["category"] = category
+    result["genre"] = process_genre(category)
+    return result
+
+def lookup_book(titel, autor):
+    """
+    Fragt Google Books und Open Library GLEICHZEITIG nach mehreren Kandidaten und nimmt
+    den am besten passenden (statt blind den ersten). None = kein Anbieter hat geantwortet.
+    """
+    pool = get_lookup_pool()
+    futures = [pool.submit(bind_scope(fn), titel, autor) for fn in (google_books_candidates, open_library_candidates)]
+    answers = []
+    for future in futures:
+        try: answers.append(future.result())
+        except Exception as e:
+            note_error("lookup", "candidates", e)
+            answers.append(None)
+    if all(a is None for a in answers): return None
+    candidates = [c for a in answers if a for c in a]
+    scored = sorted(candidates, key=lambda c: score_candidate(c, titel, autor), reverse=True) # stabil: Google zuerst
+    return pick_metadata([c for c in scored if score_candidate(c, titel, autor) >= LOOKUP_MIN_SCORE])
+
+def lookup_by_id(book_id, isbn=""):
+    """Direktabruf über die gespeicherte BuchID bzw. ISBN – ein Request, kein Suchen/Vergleichen."""
+    if book_id.startswith("gb:"):
+        response = http_get(f"{GOOGLE_BOOKS_API}/{book_id[3:]}")
+        if response.status_code == 200: return pick_metadata([_google_candidate(response.json())])
+    elif book_id.startswith("ol:"):
+        response = http_get(f"{OPEN_LIBRARY}{book_id[3:]}.json", headers=OL_HEADERS)
         if response.status_code == 200:
-            data = response.json()
-            if data.get("numFound", 0) > 0 and len(data.get("docs", [])) > 0:
-                item = data["docs"][0]
-                if item.get("cover_i"):
-                    return f"https://covers.openlibrary.org/b/id/{item.get('cover_i')}-M.jpg"
-    except: return ""
-    return ""
-
-def fetch_book_data_background(titel, autor):
-    cover = ""
-    genre = "Roman"
+            doc = response.json()
+            covers = [c for c in doc.get("covers", []) if c and c > 0]
+            return pick_metadata([{"id": book_id, "title": doc.get("title", ""), "authors": [], "isbn": isbn,
+                                   "cover": f"https://covers.openlibrary.org/b/id/{covers[0]}-M.jpg" if covers else "",
+                                   "category": (doc.get("subjects") or [""])[0]}])
+    elif isbn:
+        response = http_get(GOOGLE_BOOKS_API, params={"q": f"isbn:{isbn}"})
+        if response.status_code == 200 and response.json().get("items"):
+            return pick_metadata([_google_candidate(response.json()["items"][0])])
+    return None
+
+def fetch_book_data_background(titel, autor, book_id="", isbn="", refresh=False):
+    """
+    Cover, Genre, ISBN und BuchID für ein Buch. Mit bekannter ID/ISBN ein Direktabruf,
+    sonst die Kandidatensuche. Liefert (cover, genre, isbn, buch_id).
+    refresh=True fragt trotz gemerktem Ergebnis neu an (auch trotz "nichts gefunden").
+    """
+    cache = get_meta_cache()
+    key = book_id or normalize_key(titel, autor)
+    cached = None if refresh else cache.get("book_meta", key)
+    # Gemerkt wird die rohe Kategorie, das Genre entsteht jedes Mal neu daraus – so bleibt ein
+    # vorläufiges Genre (Übersetzung lief noch) nicht 90 Tage hängen. Ältere Einträge: neu suchen.
+    if cached is not None and len(cached) == 5:
+        cover, _, cached_isbn, cached_id, category = cached
+        return cover, process_genre(category), cached_isbn, cached_id
+
     try:
-        query = f"{titel} {autor}"
-        url = f"https://www.googleapis.com/books/v1/volumes?q={query}&langRestrict=de&maxResults=1"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if "items" in data:
-                info = data["items"][0]["volumeInfo"]
-                cover = info.get("imageLinks", {}).get("thumbnail", "")
-                raw_cat = info.get("categories", ["Roman"])[0]
-                genre = process_genre(raw_cat)
-    except: pass
-
-    if not cover:
+        result = lookup_by_id(book_id, isbn) if book_id or isbn else None
+        if result is None: result = lookup_book(titel, autor) # ID unbekannt/veraltet -> suchen
+    except Exception as e:
+        note_error("lookup", "book", e)
+        result = None
+    if result is None: return "", GENRE_FALLBACK, isbn, book_id # Nur echte Antworten cachen, keine Netzwerkfehler
+
+    values = (result["cover"], result["genre"], result["isbn"] or isbn, result["id"] or book_id)
+    cache.put("book_meta", key, [*values, result["category"]], META_TTL if values[0] else META_NEGATIVE_TTL)
+    return values
+
+def cached_category(titel, autor, book_id=""):
+    """Rohe Anbieter-Kategorie aus dem Such-Cache ("" wenn unbekannt)."""
+    cached = get_meta_cache().get("book_meta", book_id or normalize_key(titel, autor))
+    return cached[4] if cached is not None and len(cached) == 5 else ""
+
+# --- AUTOREN-INDEX ---
+def fold_text(text):
+    return unicodedata.normalize("NFKC", str(text)).lower()
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class AuthorIndex:
+    """
+    Vorberechneter Index über die Autorenliste für get_smart_author_name.
+    Trigramme finden Teilstring-Treffer ohne alle Namen durchzugehen, dazu
+    Wort-Tokens für die Nachname-/Präfix-Suche. Neue Autoren kommen per add() dazu.
+    """
+    def __init__(self, authors=()):
+        self.names = []
+        self.folded = []
+        self.grams = collections.defaultdict(set)
+        self.tokens = collections.defaultdict(set)
+        for name in authors: self.add(name)
+
+    def add(self, name):
+        name = str(name)
+        if not name.strip(): return
+        idx = len(self.names)
+        folded = fold_text(name)
+        self.names.append(name)
+        self.folded.append(folded)
+        for gram in trigrams(folded): self.grams[gram].add(idx)
+        for token in folded.split(): self.tokens[token].add(idx)
+
+    def apply_append(self, new_rows, df):
+        # Hook für den Daten-Cache: neue Zeilen im Autoren-Blatt
+        if "Name" not in new_rows: return False
+        for name in new_rows["Name"]: self.add(name)
+        return True
+
+    def _matches(self, query):
+        if len(query) < 3:
+            # Zu kurz für Trigramme – selten, also einfach durchgehen
+            return [i for i, folded in enumerate(self.folded) if query in folded]
+        postings = sorted((self.grams.get(g, set()) for g in trigrams(query)), key=len)
+        ids = set.intersection(*postings) if postings else set()
+        return [i for i in ids if query in self.folded[i]]
+
+    def longer_forms(self, name):
+        """Alle anderen Namen, die name enthalten (ohne Groß/Klein)."""
+        q = fold_text(name)
+        return [self.names[i] for i in self._matches(q) if self.folded[i] != q]
+
+    def _lastname_rank(self, i, query):
+        tokens = self.folded[i].split()
+        if tokens and tokens[-1] == query: return 0
+        if tokens and tokens[-1].startswith(query): return 1
+        if any(t.startswith(query) for t in tokens): return 2
+        return 3
+
+    def candidates(self, query, policy="longest", limit=None):
+        """
+        Alle Autoren, die query (case-insensitive) enthalten, bestes zuerst.
+        policy="longest": längster Name gewinnt (wie bisher), bei Gleichstand die Listenreihenfolge.
+        policy="lastname": Nachname-Treffer vor Präfix- vor sonstigen Treffern, dann längster Name.
+        """
+        q = fold_text(query).strip()
+        if not q: return []
+        ids = self._matches(q)
+        if policy == "lastname":
+            ids.sort(key=lambda i: (self._lastname_rank(i, q), -len(self.names[i]), i))
+        else:
+            ids.sort(key=lambda i: (-len(self.names[i]), i))
+        return [self.names[i] for i in ids[:limit]]
+
+def find_short_form_targets(names):
+    """
+    Ordnet jeden Namen, der in einem anderen steckt (ohne Groß/Klein), seiner Langform zu:
+    {"Enquist": "Anna Enquist"}. Passen mehrere Langformen, gewinnt die kürzeste,
+    bei Gleichstand die alphabetisch erste – unabhängig von der Reihenfolge im Blatt.
+    """
+    index = AuthorIndex(names)
+    targets = {}
+    for name in index.names:
+        longer = index.longer_forms(name)
+        if longer: targets[name] = min(longer, key=lambda n: (len(n), n))
+    return targets
+
+def build_author_index(df_authors):
+    if df_authors.empty or "Name" not in df_authors: return AuthorIndex()
+    return AuthorIndex(df_authors["Name"].tolist())
+
+# --- LOKALE VORSCHAUBILDER (COVER-PROXY) ---
+THUMB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cover_cache")
+THUMB_SIZE = (80, 120) # Maximale Breite x Höhe in Pixeln
+THUMB_MAX_BYTES = 50 * 1024 * 1024 # Darüber fliegen die am längsten nicht gezeigten Bilder raus
+
+class ThumbnailStore:
+    """
+    Lädt Cover einmal herunter, verkleinert sie auf THUMB_SIZE und legt sie unter ihrem
+    Inhalts-Hash ab (gleiche Bilder unter verschiedenen URLs nur einmal). Die Liste zeigt
+    sie als data-URI – unabhängig davon, wie schnell Google/Open Library gerade sind.
+    """
+    def __init__(self, path, folder, max_bytes=THUMB_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.pool = ThreadPoolExecutor(max_workers=2)
+        os.makedirs(folder, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS thumb_urls (url TEXT PRIMARY KEY, sha TEXT)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS thumbs (sha TEXT PRIMARY KEY, size INTEGER, used REAL)")
+
+    def _file(self, sha):
+        return os.path.join(self.folder, f"{sha}.jpg")
+
+    def fetch(self, url):
+        """Lädt und speichert das Vorschaubild (blockierend). Liefert den Hash oder None."""
+        if not url or not url.startswith("http"): return None
+        with self.lock:
+            row = self.conn.execute("SELECT sha FROM thumb_urls WHERE url = ?", (url,)).fetchone()
+        if row and os.path.exists(self._file(row[0])): return row[0]
+        try:
+            response = http_get(url)
+            if response.status_code != 200: return None
+            image = Image.open(io.BytesIO(response.content)).convert("RGB")
+            image.thumbnail(THUMB_SIZE)
+            out = io.BytesIO()
+            image.save(out, format="JPEG", quality=80, optimize=True)
+        except Exception as e:
+            note_error("lookup", "thumbnail", e)
+            return None
+        data = out.getvalue()
+        sha = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self._file(sha)):
+            with open(self._file(sha), "wb") as f: f.write(data)
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO thumb_urls (url, sha) VALUES (?, ?)", (url, sha))
+            self.conn.execute("INSERT OR REPLACE INTO thumbs (sha, size, used) VALUES (?, ?, ?)", (sha, len(data), time.time()))
+            self._evict()
+        return sha
+
+    def _evict(self):
+        # LRU nach Gesamtgröße (Aufrufer hält den Lock)
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbs").fetchone()[0]
+        if total <= self.max_bytes: return
+        for sha, size in self.conn.execute("SELECT sha, size FROM thumbs ORDER BY used ASC").fetchall():
+            if total <= self.max_bytes: break
+            self.conn.execute("DELETE FROM thumbs WHERE sha = ?", (sha,))
+            self.conn.execute("DELETE FROM thumb_urls WHERE sha = ?", (sha,))
+            try: os.remove(self._file(sha))
+            except OSError: pass
+            total -= size
+
+    def data_uri(self, url):
+        """
+        Lokales Vorschaubild als data-URI. Fehlt es noch, wird es im Hintergrund geholt
+        und bis dahin die Original-URL geliefert – die Anzeige wartet nie auf den Download.
+        """
+        if not isinstance(url, str) or not url.startswith("http"): return url
+        with self.lock:
+            row = self.conn.execute("SELECT sha FROM thumb_urls WHERE url = ?", (url,)).fetchone()
+            if row: self.conn.execute("UPDATE thumbs SET used = ? WHERE sha = ?", (time.time(), row[0]))
+        if row:
+            try:
+                with open(self._file(row[0]), "rb") as f:
+                    return "data:image/jpeg;base64," + base64.b64encode(f.read()).decode("ascii")
+            except OSError: pass
+        self._prefetch(url)
+        return url
+
+    def _prefetch(self, url):
+        with self.lock:
+            if url in self.pending: return
+            self.pending.add(url)
+        def job():
+            try: self.fetch(url)
+            finally:
+                with self.lock: self.pending.discard(url)
+        self.pool.submit(job)
+
+@st.cache_resource(show_spinner=False)
+def get_thumbnail_store():
+    return ThumbnailStore(CACHE_DB, THUMB_DIR)
+
+def get_smart_author_name(short_name, all_authors, index=None):
+    if not short_name.strip(): return short_name
+    if index is None: index = AuthorIndex(all_authors)
+    best = index.candidates(short_name, limit=1)
+    return best[0] if best else short_name
+
+def per_category(series, fn):
+    # Spaltenweise Textfunktion; bei Kategorien nur einmal je Wert statt je Zeile
+    if isinstance(series.dtype, pd.CategoricalDtype) and not series.isna().any():
+        values = fn(pd.Series(series.cat.categories, dtype=object)).to_numpy(dtype=object)
+        return pd.Series(values[series.cat.codes], index=series.index)
+    return fn(series)
+
+def lastname_keys(names):
+    """Nachname (letztes Wort, klein) für eine ganze Spalte auf einmal – leer bei leeren Namen."""
+    return per_category(names, lambda s: s.fillna("").astype(str).str.strip().str.split(" ").str[-1].str.lower())
+
+def fold_series(series):
+    return per_category(series, lambda s: s.astype(str).str.normalize("NFKC").str.lower())
+
+# --- SUCH- UND SORTIERINDEX FÜR DIE SAMMLUNG ---
+class LibraryIndex:
+    """
+    Einmal pro Datenstand gebaut und von allen Sitzungen geteilt:
+    normalisierte Titel/Autoren (NFKC, klein), Nachname-Sortierung, Bücher pro Autor
+    und ein Trigramm-Index für die Suche. search() liefert nur Zeilenpositionen in .df.
+    """
+    SEARCH_COLUMNS = ("Titel", "Autor")
+
+    def __init__(self, df):
+        self.grams = collections.defaultdict(list)
+        self._load(df, start=0)
+
+    def _load(self, df, start):
+        self.df = df
+        if df.empty:
+            self.title = self.author = pd.Series(dtype=object)
+            self.rank = self.order = np.array([], dtype=int)
+            self.author_counts = {}
+            return
+        self.title = fold_series(df["Titel"])
+        self.author = fold_series(df["Autor"])
+        self.order = np.argsort(lastname_keys(df["Autor"]).to_numpy(dtype=object), kind="stable")
+        self.rank = np.empty(len(df), dtype=int)
+        self.rank[self.order] = np.arange(len(df))
+        self.author_counts = df["Autor"].value_counts().to_dict()
+        grams = self.grams
+        texts = zip(self.title.iloc[start:].tolist(), self.author.iloc[start:].tolist())
+        for pos, (title, author) in enumerate(texts, start=start):
+            for gram in {t[i:i + 3] for t in (title, author) for i in range(len(t) - 2)}:
+                grams[gram].append(pos)
+
+    def apply_append(self, new_rows, df):
+        # Neue Zeilen hängen hinten an – bestehende Positionen bleiben gültig
+        self._load(df, start=len(self.df))
+        return True
+
+    def apply_cells(self, updates, df):
+        # Cover/Genre-Updates ändern weder Suche noch Sortierung
+        if any(column in self.SEARCH_COLUMNS for zeile, column in updates): return False
+        self.df = df
+        return True
+
+    def search(self, query):
+        """Positionen aller Treffer (Titel oder Autor enthält query), nach Nachname sortiert."""
+        q = fold_text(query).strip()
+        if not q: return self.order
+        if len(q) >= 3:
+            postings = sorted((self.grams.get(g, []) for g in trigrams(q)), key=len)
+            candidates = set(postings[0])
+            for p in postings[1:]: candidates.intersection_update(p)
+            hits = np.array([pos for pos in candidates if q in self.title.iat[pos] or q in self.author.iat[pos]], dtype=int)
+        else:
+            mask = self.title.str.contains(q, regex=False) | self.author.str.contains(q, regex=False)
+            hits = np.flatnonzero(mask.to_numpy())
+        return hits[np.argsort(self.rank[hits], kind="stable")]
+
+def build_author_table(df_authors):
+    """Autorenliste mit vorberechnetem Nachnamen, fertig sortiert."""
+    if df_authors.empty: return pd.DataFrame({"Name": [""]})
+    table = pd.DataFrame({"Name": df_authors["Name"].astype(object)})
+    table["_Nachname"] = lastname_keys(table["Name"])
+    return table.sort_values(by="_Nachname", kind="stable")
+
+# --- HINTERGRUND-AUFTRÄGE (PERSISTENTE WARTESCHLANGE + WORKER) ---
+JOB_MAX_ATTEMPTS = 3
+JOB_BATCH = 8 # Aufträge, die der Worker auf einmal abholt
+JOB_KEEP_DONE = 7 * 24 * 3600 # Erledigte Aufträge eine Woche für die Statusanzeige behalten
+
+class JobQueue:
+    """
+    Warteschlange für Cover/Genre-Suchen in SQLite – überlebt Neustarts.
+    Gleiche Bücher (normalisierter Titel+Autor) stehen nur einmal offen in der Schlange.
+    """
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                              "key TEXT, payload TEXT, status TEXT, attempts INTEGER DEFAULT 0, "
+                              "error TEXT, created REAL, finished REAL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id)")
+            # Was beim letzten Absturz/Neustart mitten in Arbeit war, kommt zurück in die Schlange
+            self.conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+            self.conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?",
+                              (time.time() - JOB_KEEP_DONE,))
+
+    def enqueue(self, key, payload):
+        """Legt einen Auftrag an; False, wenn derselbe schon offen ist."""
+        with self.lock, self.conn:
+            open_job = self.conn.execute("SELECT 1 FROM jobs WHERE key = ? AND status IN ('pending', 'running')",
+                                         (key,)).fetchone()
+            if open_job: return False
+            self.conn.execute("INSERT INTO jobs (key, payload, status, created) VALUES (?, ?, 'pending', ?)",
+                              (key, json.dumps(payload), time.time()))
+        return True
+
+    def claim(self, limit):
+        with self.lock, self.conn:
+            rows = self.conn.execute("SELECT id, payload FROM jobs WHERE status = 'pending' ORDER BY id LIMIT ?",
+                                     (limit,)).fetchall()
+            self.conn.executemany("UPDATE jobs SET status = 'running' WHERE id = ?", [(r[0],) for r in rows])
+        return [(job_id, json.loads(payload)) for job_id, payload in rows]
+
+    def finish(self, job_id):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE jobs SET status = 'done', finished = ? WHERE id = ?", (time.time(), job_id))
+
+    def release(self, job_ids):
+        """Gibt abgeholte Aufträge unverändert zurück (kein Fehlversuch, z.B. ohne Verbindung)."""
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE jobs SET status = 'pending' WHERE id = ? AND status = 'running'",
+                                  [(job_id,) for job_id in job_ids])
+
+    def fail(self, job_id, error):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE jobs SET attempts = attempts + 1, error = ?, finished = ?, "
+                              "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END "
+                              "WHERE id = ? AND status = 'running'",
+                              (str(error)[:500], time.time(), JOB_MAX_ATTEMPTS, job_id))
+
+    def counts(self):
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+class EnrichmentWorker:
+    """
+    Eigener Thread, der die Warteschlange abarbeitet: Cover/Genre suchen (parallel über
+    enrich_books), Ergebnisse gebündelt ins Blatt schreiben und den Daten-Cache flicken.
+    Die Oberfläche legt nur Aufträge an und wartet nie auf das Ergebnis.
+    """
+    def __init__(self, queue):
+        self.queue = queue
+        self.wakeup = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="enrichment-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, titel, autor, zeile, with_genre=False, book_id="", isbn=""):
+        payload = {"titel": titel, "autor": autor, "zeile": int(zeile), "with_genre": with_genre,
+                   "book_id": book_id, "isbn": isbn}
+        added = self.queue.enqueue(normalize_key(titel, autor), payload)
+        if added: self.wakeup.set()
+        return added
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(timeout=30)
+            self.wakeup.clear()
+            try:
+                while self._process_batch(): pass
+            except Exception as e:
+                note_error("worker", "enrichment", e)
+                time.sleep(5) # z.B. Verbindung weg – später nochmal
+
+    def _process_batch(self):
+        jobs = self.queue.claim(JOB_BATCH)
+        if not jobs: return False
         try:
-            ol_cover = search_open_library_cover(titel, autor)
-            if ol_cover: cover = ol_cover
-        except: pass
+            return self._write_batch(jobs)
+        except Exception as e:
+            # Abgeholte Aufträge nie auf "running" liegen lassen – sonst sperren sie ihr Buch bis
+            # zum Neustart. Ohne Verbindung zählt das nicht als Fehlversuch, alles andere schon.
+            if isinstance(e, ConnectionError) or is_connection_error(e):
+                self.queue.release([job_id for job_id, payload in jobs])
+            else:
+                for job_id, payload in jobs: self.queue.fail(job_id, e)
+            raise
 
-    return cover, genre
+    def _write_batch(self, jobs):
+        sheets = get_sheets()
+        if sheets is None:
+            # Ohne Zugangsdaten kann kein Auftrag etwas dafür – nicht als Fehlversuch zählen
+            self.queue.release([job_id for job_id, payload in jobs])
+            return False
+        ws_books = sheets[0]
+        found = enrich_books([(job_id, p["titel"], p["autor"], p.get("book_id", ""), p.get("isbn", "")) for job_id, p in jobs])
 
-def get_smart_author_name(short_name, all_authors):
-    short_clean = short_name.strip().lower()
-    if not short_clean: return short_name
-    sorted_authors = sorted(all_authors, key=len, reverse=True)
-    for full_name in sorted_authors:
-        if short_clean in str(full_name).lower():
-            return full_name 
-    return short_name 
+        df = load_sheet(ws_books)
+        col_map = sheet_schema(ws_books)
+        targets = {}
+        with SheetWriteBuffer(ws_books, col_map) as buffer:
+            for job_id, payload in jobs:
+                zeile = _locate_row(df, payload)
+                if zeile is None: continue # Buch inzwischen gelöscht
+                targets[job_id] = zeile
+                cover, genre, isbn, book_id = found[job_id]
+                buffer.set(zeile, "Cover", cover or NO_COVER_MARKER)
+                if payload.get("with_genre"): buffer.set(zeile, "Genre", genre)
+                store_ids(buffer, zeile, isbn, book_id)
+        failed_rows = {zeile for zeile, column in buffer.failed}
+        for job_id, payload in jobs:
+            if targets.get(job_id) in failed_rows: self.queue.fail(job_id, buffer.errors[-1] if buffer.errors else "Spalte fehlt")
+            else: self.queue.finish(job_id)
+        # Erst nach finish(): ein Nachtrag für dasselbe Buch darf wieder in die Schlange
+        for job_id, payload in jobs:
+            if payload.get("with_genre") and job_id in targets: self._follow_up_genre(payload, found[job_id][1])
+        return True
 
-def get_lastname(full_name):
-    if not isinstance(full_name, str) or not full_name.strip(): return ""
-    return full_name.strip().split(" ")[-1].lower()
+    def _follow_up_genre(self, payload, genre):
+        # Geschriebenes Genre war vorläufig? Dann nach der Übersetzung nochmal (siehe _translate_genre)
+        category = cached_category(payload["titel"], payload["autor"], payload.get("book_id", ""))
+        if not category or wait_for_translation(category, payload): return
+        if process_genre(category) != genre: self.submit(**payload) # Übersetzung war schneller als wir
+
+def store_ids(buffer, zeile, isbn, book_id):
+    # IDs nur, wenn das Blatt die Spalten hat – fehlende Spalten sind kein Fehler
+    for column, value in zip(ID_COLUMNS, (isbn, book_id)):
+        if value and column in buffer.col_map: buffer.set(zeile, column, value)
+
+def _locate_row(df, payload):
+    # Zeilen können sich seit dem Einreihen verschoben haben -> über Titel UND Autor absichern
+    if df.empty: return None
+    same_book = df[(df["Titel"] == payload["titel"]) & (df["Autor"] == payload["autor"])]
+    if same_book.empty: return None # gelöscht (oder umbenannt) – lieber nichts schreiben
+    if (same_book["_Zeile"] == payload["zeile"]).any(): return payload["zeile"]
+    return int(same_book["_Zeile"].iloc[0])
+
+@st.cache_resource(show_spinner=False)
+def get_enrichment_worker():
+    return EnrichmentWorker(JobQueue(CACHE_DB))
 
 def silent_background_check(ws_books, df_books):
+    """Reiht alle Bücher ohne Cover in die Hintergrund-Suche ein. Liefert die Anzahl neuer Aufträge."""
     if df_books.empty: return 0
     if "Cover" not in df_books.columns: return 0
     missing = df_books[ (df_books["Cover"] == "") | (df_books["Cover"].isnull()) ]
     missing = missing[ missing["Cover"] != NO_COVER_MARKER ]
-    if not missing.empty:
-        to_check = missing.head(3)
-        updates = 0
-        all_vals = ws_books.get_all_values()
-        headers = [str(h).lower() for h in all_vals[0]]
-        idx_t = -1; idx_a = -1; idx_c = -1; idx_g = -1
-        for i, h in enumerate(headers):
-            if "titel" in h: idx_t = i
-            if "autor" in h: idx_a = i
-            if h in ["cover", "bild", "image", "img"]: idx_c = i
-        if idx_c == -1 or idx_t == -1: return 0
-        for idx, row in to_check.iterrows():
-            tit = row["Titel"]
-            aut = row["Autor"]
-            nc, ng = fetch_book_data_background(tit, aut)
-            try:
-                cell = ws_books.find(tit)
-                if nc:
-                    ws_books.update_cell(cell.row, idx_c + 1, nc)
-                    updates += 1
-                else:
-                    ws_books.update_cell(cell.row, idx_c + 1, NO_COVER_MARKER)
-                time.sleep(1)
-            except: pass
-        return updates
-    return 0
+    if missing.empty: return 0
+    worker = get_enrichment_worker()
+    return sum(worker.submit(tit, aut, zeile, book_id=book_id, isbn=isbn)
+               for tit, aut, zeile, book_id, isbn in zip(missing["Titel"], missing["Autor"], missing["_Zeile"],
+                                                         missing["BuchID"], missing["ISBN"]))
+
+def tab_operation(*worksheets):
+    # Tab-Daten aus dem Cache zählen als "Navigation" (Budget: 0 Aufrufe), der erste Abruf als "Laden"
+    return track_operation("Navigation" if all(sheet_cached(ws) for ws in worksheets) else "Laden")
+
+def load_tab_authors(ws_authors):
+    """Autorennamen für Neu/Autoren – die Bücher lädt dort erst eine Aktion (oder der Sync danach)."""
+    with st.spinner("Lade Autoren..."), tab_operation(ws_authors):
+        df_authors = load_sheet(ws_authors, revalidate=False)
+    if df_authors.empty: return []
+    return [a for a in df_authors["Name"].tolist() if str(a).strip()]
+
+def run_deferred_checks(ws_books, ws_authors):
+    """Autoren-Sync und Cover-Check – laufen erst, nachdem der gewählte Tab gezeichnet ist."""
+    with track_operation("Autoren-Sync"):
+        added = sync_authors(ws_books, ws_authors)
+    if added > 0: st.toast(f"✅ {added} Autoren synchronisiert!")
+
+    if not st.session_state.background_check_done:
+        with track_operation("Hintergrund-Check"):
+            queued = silent_background_check(ws_books, load_sheet(ws_books))
+        st.session_state.background_check_done = True
+        if queued > 0:
+            st.toast(f"✨ Suche im Hintergrund {queued} fehlende Bilder!", icon="🕵️‍♂️")
+
+def render_job_status():
+    counts = get_enrichment_worker().queue.counts()
+    pending = counts.get("pending", 0) + counts.get("running", 0)
+    if pending or counts.get("failed"):
+        st.caption(f"🕵️ Hintergrundsuche: {pending} offen · {counts.get('done', 0)} erledigt"
+                   + (f" · {counts['failed']} fehlgeschlagen" if counts.get("failed") else ""))
+    engine = get_sync_engine()
+    unsynced = get_replica().pending_count()
+    if unsynced:
+        st.caption(f"🔄 {unsynced} Änderungen warten auf Übertragung zu Google"
+                   + (f" (offline: {engine.last_error})" if engine.last_error else ""))
 
 # --- DUBLETTEN KILLER 5.0 (LIVE DATA & UNICODE FIX) ---
 def cleanup_author_duplicates_batch(ws_books, ws_authors):
     """
-    Liest die Namen direkt aus den BÜCHERN (Live-Daten), normalisiert sie aggressiv
-    und schreibt alles bereinigt zurück.
+    Liest die Namen direkt aus den BÜCHERN (geprüfter lokaler Stand), normalisiert sie
+    aggressiv und schreibt alles bereinigt zurück.
     """
     
     # Hilfsfunktion: Killt alle unsichtbaren Geister-Zeichen
@@ -260,22 +2168,13 @@ def cleanup_author_duplicates_batch(ws_books, ws_authors):
         return text.strip()
 
     # 1. LADE ALLE BÜCHER (Das ist unsere einzige Wahrheit!)
-    books_vals = ws_books.get_all_values()
-    if not books_vals: return 0
-    
-    headers = [str(h).lower() for h in books_vals[0]]
-    idx_a = -1
-    for i, h in enumerate(headers):
-        if "autor" in h: idx_a = i
-    
-    if idx_a == -1: return 0
+    # Lokaler Stand inkl. noch nicht übertragener Bücher, vorher gegen Google geprüft
+    df = load_sheet(ws_books, force=True)
+    if df.empty or "Autor" not in sheet_schema(ws_books): return 0
 
     # 2. LISTE ALLER AUTOREN IM REGAL SAMMELN
-    # Wir schauen uns an, wer alles im Regal steht (live!)
-    raw_authors_from_books = []
-    for row in books_vals[1:]: # Header überspringen
-        if len(row) > idx_a:
-            raw_authors_from_books.append(deep_clean(row[idx_a]))
+    # Wir schauen uns an, wer alles im Regal steht
+    raw_authors_from_books = [deep_clean(a) for a in df["Autor"]]
 
     # Nur die, die nicht leer sind
     raw_authors_from_books = [a for a in raw_authors_from_books if a]
@@ -299,316 +2198,439 @@ def cleanup_author_duplicates_batch(ws_books, ws_authors):
                 replacements[v] = target
 
     # B) Kurzform-Check (Enquist -> Anna Enquist)
-    unique_keys = list(clean_map.keys())
-    # Sortieren: Längste zuerst! Damit Anna Enquist vor Enquist kommt.
-    unique_keys.sort(key=len, reverse=True)
-
-    for i, long_key in enumerate(unique_keys):
-        for short_key in unique_keys[i+1:]:
-            # Check: Ist "Enquist" teil von "Anna Enquist"?
-            # Wichtig: Case-Insensitive check
-            if short_key.lower() in long_key.lower() and short_key.lower() != long_key.lower():
-                
-                # TREFFER! Wir wollen short_key durch long_key ersetzen.
-                target_display = long_key # Das ist die Langform (z.B. Anna Enquist)
-                
-                # Wir müssen ALLE Varianten des kurzen Namens erwischen
-                # (z.B. "Enquist" und "Enquist ")
-                if short_key in clean_map:
-                    for bad_version in clean_map[short_key]:
-                        replacements[bad_version] = target_display
+    # Über den Trigramm-Index statt jeder-gegen-jeden (bleibt auch bei 10.000 Autoren flott)
+    for short_key, target_display in find_short_form_targets(clean_map.keys()).items():
+        # Wir müssen ALLE Varianten des kurzen Namens erwischen
+        # (z.B. "Enquist" und "Enquist ")
+        for bad_version in clean_map[short_key]:
+            replacements[bad_version] = target_display
 
     # Wenn es nichts zu tun gibt, brechen wir ab (spart Schreibzugriff)
     if not replacements:
         return 0
 
     # 4. BÜCHERLISTE UPDATE (IM SPEICHER)
-    changes_made = False
-    new_books_data = [books_vals[0]] # Header
-    
-    for row in books_vals[1:]:
-        new_row = list(row)
-        if len(new_row) > idx_a:
-            original_auth = deep_clean(new_row[idx_a]) # Sauber machen vor Vergleich
-            
-            if original_auth in replacements:
-                new_auth = replacements[original_auth]
-                if new_auth != new_row[idx_a]: # Nur wenn sich wirklich was ändert
-                    new_row[idx_a] = new_auth
-                    changes_made = True
-            
-            # Auch wichtig: Wenn wir den Namen nur gesäubert haben (Unicode), schreiben wir ihn auch zurück
-            elif original_auth != new_row[idx_a]:
-                 new_row[idx_a] = original_auth
-                 changes_made = True
-
-        new_books_data.append(new_row)
-
-    # 5. ZURÜCKSCHREIBEN (NUR WENN NÖTIG)
+    updates = {} # {(zeile, "Autor"): neuer Name}
+    for zeile, auth in zip(df["_Zeile"], df["Autor"]):
+        original_auth = deep_clean(auth) # Sauber machen vor Vergleich
+
+        if original_auth in replacements:
+            new_auth = replacements[original_auth]
+            if new_auth != auth: # Nur wenn sich wirklich was ändert
+                updates[(zeile, "Autor")] = new_auth
+
+        # Auch wichtig: Wenn wir den Namen nur gesäubert haben (Unicode), schreiben wir ihn auch zurück
+        elif original_auth != auth:
+            updates[(zeile, "Autor")] = original_auth
+    changes_made = bool(updates)
+
+    # 5. ZURÜCKSCHREIBEN (NUR WENN NÖTIG – nur die geänderten Zellen, über die Outbox)
     if changes_made:
-        ws_books.update(new_books_data)
+        queue_cells(ws_books, updates)
 
     # 6. AUTORENLISTE NEU GENERIEREN
     # Wir nehmen jetzt einfach alle Autoren aus den (korrigierten) Büchern
     final_authors = set()
-    for row in new_books_data[1:]:
-        if len(row) > idx_a:
-            auth = row[idx_a].strip()
-            if auth: final_authors.add(auth)
-            
+    for zeile, auth in zip(df["_Zeile"], df["Autor"]):
+        auth = updates.get((zeile, "Autor"), auth).strip()
+        if auth: final_authors.add(auth)
+
     sorted_authors = sorted(list(final_authors))
-    
-    ws_authors.clear()
-    ws_authors.update_cell(1, 1, "Name")
-    if sorted_authors:
-        ws_authors.update(values=[["Name"]] + [[a] for a in sorted_authors])
+    added, removed = sync_author_sheet(ws_authors, sorted_authors)
+
+    return 1 if changes_made or added or removed else 0
+
+# --- MASSEN-IMPORT ---
+def parse_import_lines(text):
+    """ "Titel, Autor" je Zeile -> ([(titel, autor, None)], [unlesbare Zeilen]) """
+    entries, skipped = [], []
+    for line in text.splitlines():
+        if not line.strip(): continue
+        titel, _, autor = line.partition(",")
+        if titel.strip() and autor.strip(): entries.append((titel.strip(), autor.strip(), None))
+        else: skipped.append(line.strip())
+    return entries, skipped
+
+def parse_import_csv(raw_bytes):
+    """
+    CSV mit Kopfzeile (Titel/Autor/Bewertung – gedeutet wie im Blatt) oder ohne
+    (dann Titel, Autor in den ersten beiden Spalten). Trenner wird erraten (, ; Tab).
+    """
+    text = raw_bytes.decode("utf-8-sig", errors="replace")
+    try: dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+    except csv.Error: dialect = csv.excel
+    rows = [r for r in csv.reader(io.StringIO(text), dialect) if any(c.strip() for c in r)]
+    if not rows: return [], []
+    col_map = resolve_schema(rows[0])
+    if "Titel" in col_map and "Autor" in col_map: rows = rows[1:]
+    else: col_map = {"Titel": 0, "Autor": 1}
+    entries, skipped = [], []
+    for row in rows:
+        cell = lambda key: row[col_map[key]].strip() if key in col_map and col_map[key] < len(row) else ""
+        if cell("Titel") and cell("Autor"):
+            rating = cell("Bewertung")
+            entries.append((cell("Titel"), cell("Autor"), int(rating) if rating.isdigit() and 1 <= int(rating) <= 5 else None))
+        else: skipped.append(", ".join(row))
+    return entries, skipped
+
+def bulk_import(ws_books, ws_authors, entries, default_rating=5):
+    """
+    Trägt viele Bücher auf einmal ein: Autoren in einem Durchgang über den Index
+    vervollständigen, alles als EINE Anfügung in die Outbox, Cover/Genre für alle
+    in die Hintergrund-Suche, Dubletten-Aufräumen genau einmal am Ende.
+    Bücher, die schon im Regal stehen (gleicher Titel + Autor), werden übersprungen.
+    Liefert (importiert, übersprungen, vervollständigte Autoren).
+    """
+    author_index = sheet_derived(ws_authors, "author_index", build_author_index)
+    df = load_sheet(ws_books)
+    known = set(map(normalize_key, df["Titel"], df["Autor"])) if not df.empty else set()
+
+    new_rows, completed, duplicates = [], 0, 0
+    for titel, autor_frag, rating in entries:
+        final_author = get_smart_author_name(autor_frag, None, author_index)
+        key = normalize_key(titel, final_author)
+        if key in known:
+            duplicates += 1
+            continue
+        known.add(key)
+        if final_author != autor_frag: completed += 1
+        new_rows.append([titel, final_author, "", rating or default_rating, ""])
+    if not new_rows: return 0, duplicates, completed
 
-    return 1
+    first_zeile = queue_append(ws_books, new_rows)
+    if first_zeile:
+        worker = get_enrichment_worker()
+        for offset, row in enumerate(new_rows):
+            worker.submit(row[0], row[1], first_zeile + offset, with_genre=True)
+    cleanup_author_duplicates_batch(ws_books, ws_authors)
+    get_sync_engine().wake()
+    return len(new_rows), duplicates, completed
 
 # --- HAUPTPROGRAMM ---
-def main():
-    st.title("📚 Mamas Bücherwelt")
+# Jedes Fragment läuft bei eigenen Eingaben allein neu (ohne main): Navigation, Suche,
+# Büchertabelle und Autoren-Editor lesen dabei nur den geteilten Cache – kein Google-Aufruf.
+# Frisch gehalten wird der Cache vom Revisionswächter bzw. im vollen Rerun.
+NAV_OPTIONS = ["✍️ Neu", "👥 Autoren", "🔍 Liste"]
 
-    if "input_key" not in st.session_state: st.session_state.input_key = 0
-    if "background_check_done" not in st.session_state: st.session_state.background_check_done = False
+def show_app_error(e, where):
+    # Kaputte Verbindung nicht im Prozess-Cache liegen lassen
+    if is_connection_error(e): reset_connection()
+    st.error(f"Fehler: {e}")
+    if st.button("Notfall-Reset", key=f"reset_{where}"): # Fragment und main können beide scheitern
+        st.session_state.clear()
+        st.rerun()
 
-    try:
-        client = get_connection()
-        if client is None: st.stop()
-        ws_books, ws_authors = setup_sheets(client)
+@measured_fragment
+def navigation():
+    """Navigation und aktiver Tab – ein Tab-Wechsel zeichnet nur dieses Fragment neu."""
+    selected_nav = st.radio(
+        "Navigation", 
+        NAV_OPTIONS, 
+        horizontal=True,
+        label_visibility="collapsed"
+    )
+    render_mark("Navigation")
 
-        if "df_books" not in st.session_state:
-            with st.spinner("Lade Bücherregal..."):
-                st.session_state.df_books = fetch_data_from_sheet(ws_books)
-        
-        if "df_authors" not in st.session_state:
-            st.session_state.df_authors = fetch_data_from_sheet(ws_authors)
+    try:
+        sheets = get_sheets()
+        if sheets is None: st.stop()
+        ws_books, ws_authors = sheets
 
-        added = sync_authors(ws_books, ws_authors)
-        if added > 0: st.toast(f"✅ {added} Autoren synchronisiert!")
-
-        if not st.session_state.background_check_done:
-            updates = silent_background_check(ws_books, st.session_state.df_books)
-            st.session_state.background_check_done = True
-            if updates > 0:
-                st.toast(f"✨ Habe {updates} fehlende Bilder nachgeladen!", icon="🕵️‍♂️")
-
-        known_authors_list = []
-        if not st.session_state.df_authors.empty:
-            known_authors_list = [a for a in st.session_state.df_authors["Name"].tolist() if str(a).strip()]
-
-        selected_nav = st.radio(
-            "Navigation", 
-            ["✍️ Neu", "👥 Autoren", "🔍 Liste"], 
-            horizontal=True,
-            label_visibility="collapsed"
-        )
-        
         # --- TAB 1: EINGABE ---
-        if selected_nav == "✍️ Neu":
-            st.header("Buch eintragen")
-            st.markdown('<div class="small-hint">Eingeben: Titel, Autor<br>(das Komma ist wichtig!!!)</div>', unsafe_allow_html=True)
-            
-            with st.form("new_book_form", clear_on_submit=False):
-                raw_input = st.text_input("Eingabe:", placeholder="Titel, Autor", key=f"inp_{st.session_state.input_key}")
-                rating = st.slider("Sterne:", 1, 5, 5)
-                submitted = st.form_submit_button("💾 Speichern")
-            
-            if submitted:
-                if "," in raw_input:
-                    parts = raw_input.split(",", 1)
-                    titel = parts[0].strip()
-                    autor_frag = parts[1].strip()
-                    if titel and autor_frag:
-                        with st.spinner("Speichere, suche Cover & räume Autoren auf..."):
-                            # 1. Smart Author (Versuch)
-                            final_author = get_smart_author_name(autor_frag, known_authors_list)
-                            
-                            # 2. Cover & Save
-                            c, g = fetch_book_data_background(titel, final_author)
-                            final_cover = c if c else NO_COVER_MARKER
-                            ws_books.append_row([titel, final_author, g, rating, final_cover])
-                            
-                            # 3. CLEANUP BATCH (Live auf den neuen Daten!)
-                            cleanup_author_duplicates_batch(ws_books, ws_authors)
-                            
-                            # Cache leeren
-                            del st.session_state.df_books
-                            del st.session_state.df_authors
-
-                        st.success(f"Gespeichert: {titel}")
-                        if final_author != autor_frag: st.info(f"Autor vervollständigt: {final_author}")
-                        st.balloons() 
-                        time.sleep(1.5) 
-                        st.session_state.input_key += 1
-                        st.rerun()
-                    else: st.error("Text fehlt.")
-                else: st.error("⚠️ Komma vergessen!")
-
+        if selected_nav == "✍️ Neu": new_book_tab(ws_books, ws_authors)
         # --- TAB 2: AUTOREN ---
-        elif selected_nav == "👥 Autoren":
-            st.header("Autoren")
-            
-            st.caption("Einen neuen Autorennamen vorbereiten:")
-            with st.form("add_auth_form"):
-                col_inp, col_btn = st.columns([3, 1])
-                with col_inp:
-                    new_auth_name = st.text_input("Name:", label_visibility="collapsed", placeholder="Name eingeben...")
-                with col_btn:
-                    add_btn = st.form_submit_button("Hinzufügen")
-                
-                if add_btn and new_auth_name:
-                    if new_auth_name not in known_authors_list:
-                        ws_authors.append_row([new_auth_name])
-                        del st.session_state.df_authors
-                        st.success(f"'{new_auth_name}' dabei!")
-                        time.sleep(0.5)
-                        st.rerun()
-                    else:
-                        st.warning("Gibt's schon.")
-
-            st.markdown("---")
-
-            df_b = st.session_state.df_books
-            df_a = st.session_state.df_authors.copy()
-            counts = {}
-            if not df_b.empty: counts = df_b["Autor"].value_counts().to_dict()
-            if df_a.empty: df_a = pd.DataFrame({"Name": [""]})
-            
-            df_a["Anzahl d. Bücher"] = df_a["Name"].map(counts).fillna(0).astype(int)
-
-            total_books = len(df_b)
-            st.metric("Bücher insgesamt:", total_books)
-
-            df_a["_Nachname"] = df_a["Name"].apply(get_lastname)
-            df_a = df_a.sort_values(by="_Nachname")
-
-            df_display = df_a[["Name", "Anzahl d. Bücher"]].reset_index(drop=True)
-
-            edited_authors = st.data_editor(
-                df_display,
-                num_rows="dynamic",
-                use_container_width=True,
-                column_config={
-                    "Name": st.column_config.TextColumn("Name", required=True),
-                    "Anzahl d. Bücher": st.column_config.NumberColumn("Anzahl d. Bücher", disabled=True)
-                },
-                hide_index=True
-            )
-            
-            if st.button("💾 Liste speichern"):
-                clean = edited_authors[edited_authors["Name"].astype(str).str.strip() != ""]
-                df_save = clean[["Name"]]
-                ws_authors.clear()
-                ws_authors.update_cell(1, 1, "Name")
-                if not df_save.empty: ws_authors.update([df_save.columns.values.tolist()] + df_save.values.tolist())
-                del st.session_state.df_authors
-                st.success("Gespeichert!")
+        elif selected_nav == "👥 Autoren": authors_tab(ws_books, ws_authors)
+        # --- TAB 3: LISTE ---
+        elif selected_nav == "🔍 Liste": list_tab(ws_books, ws_authors)
+        render_mark(selected_nav)
+    except Exception as e:
+        show_app_error(e, "navigation")
+
+def save_book(ws_books, ws_authors, titel, autor_frag, rating, known_authors):
+    """
+    "💾 Speichern": Autor vervollständigen, Buch vormerken, Cover & Genre an die
+    Hintergrund-Suche, danach Autoren aufräumen. Liefert den verwendeten Autornamen.
+    """
+    with track_operation("Speichern"):
+        # 1. Smart Author (Versuch)
+        author_index = sheet_derived(ws_authors, "author_index", build_author_index)
+        with track_operation("Autor ergänzen"):
+            final_author = get_smart_author_name(autor_frag, known_authors, author_index)
+
+        # 2. Save – Cover & Genre sucht der Hintergrund-Worker
+        new_zeile = queue_append(ws_books, [[titel, final_author, "", rating, ""]])
+        if new_zeile: get_enrichment_worker().submit(titel, final_author, new_zeile, with_genre=True)
+
+        # 3. CLEANUP BATCH (Live auf den neuen Daten!)
+        cleanup_author_duplicates_batch(ws_books, ws_authors)
+    return final_author
+
+def new_book_tab(ws_books, ws_authors):
+    st.header("Buch eintragen")
+    # Das Formular braucht nur die Autorenliste; die Bücher lädt erst das Speichern
+    known_authors_list = load_tab_authors(ws_authors)
+    st.markdown('<div class="small-hint">Eingeben: Titel, Autor<br>(das Komma ist wichtig!!!)</div>', unsafe_allow_html=True)
+
+    with st.form("new_book_form", clear_on_submit=False):
+        raw_input = st.text_input("Eingabe:", placeholder="Titel, Autor", key=f"inp_{st.session_state.input_key}")
+        rating = st.slider("Sterne:", 1, 5, 5)
+        submitted = st.form_submit_button("💾 Speichern")
+
+    if submitted:
+        if "," in raw_input:
+            parts = raw_input.split(",", 1)
+            titel = parts[0].strip()
+            autor_frag = parts[1].strip()
+            if titel and autor_frag:
+                with st.spinner("Speichere & räume Autoren auf..."):
+                    final_author = save_book(ws_books, ws_authors, titel, autor_frag, rating, known_authors_list)
+                st.success(f"Gespeichert: {titel}")
+                if final_author != autor_frag: st.info(f"Autor vervollständigt: {final_author}")
+                st.balloons() 
+                time.sleep(1.5) 
+                st.session_state.input_key += 1
                 st.rerun()
+            else: st.error("Text fehlt.")
+        else: st.error("⚠️ Komma vergessen!")
 
-        # --- TAB 3: LISTE ---
-        elif selected_nav == "🔍 Liste":
-            c_head, c_btn = st.columns([2,1])
-            with c_head: st.header("Sammlung")
-            with c_btn: 
-                if st.button("🔄 Tabelle neu laden"): force_reload()
-
-            df_books = st.session_state.df_books.copy()
-            if not df_books.empty:
-                df_books["Löschen"] = False
-                df_books["Cover"] = df_books["Cover"].replace(NO_COVER_MARKER, None)
-                
-                search = st.text_input("🔍 Suchen:", placeholder="Titel...", key="search_box_fixed")
-                
-                df_books["_Nachname"] = df_books["Autor"].apply(get_lastname)
-                df_view = df_books.sort_values(by="_Nachname")
-                
-                if search:
-                    clean_search = search.strip()
-                    df_view = df_view[
-                        df_view["Titel"].astype(str).str.contains(clean_search, case=False) |
-                        df_view["Autor"].astype(str).str.contains(clean_search, case=False)
-                    ]
-                
-                with st.form("list_view"):
-                    edited_df = st.data_editor(
-                        df_view,
-                        column_order=["Titel", "Autor", "Bewertung", "Cover", "Löschen"],
-                        column_config={
-                            "Löschen": st.column_config.CheckboxColumn("Weg?", width="small", default=False),
-                            "Cover": st.column_config.ImageColumn("Img", width="small"),
-                            "Titel": st.column_config.TextColumn("Titel", disabled=True),
-                            "Autor": st.column_config.TextColumn("Autor", disabled=True),
-                            "Bewertung": st.column_config.NumberColumn("⭐", disabled=True)
-                        },
-                        hide_index=True,
-                        use_container_width=True
-                    )
-                    if st.form_submit_button("🗑️ Löschen"):
-                        to_delete = edited_df[edited_df["Löschen"]==True]
-                        if not to_delete.empty:
-                            for index, row in to_delete.iterrows():
-                                try:
-                                    cell = ws_books.find(row["Titel"])
-                                    ws_books.delete_rows(cell.row)
-                                except: pass
-                            del st.session_state.df_books
-                            st.success("Gelöscht!")
-                            time.sleep(1)
-                            st.rerun()
-
-                st.markdown("---")
-                with st.expander("🔧 Wartung"):
-                    if st.button("🔄 Fehlende Bilder suchen (Manuell)"):
-                        with st.status("Suche...", expanded=True):
-                            all_vals = ws_books.get_all_values()
-                            headers = [str(h).lower() for h in all_vals[0]]
-                            idx_t = -1; idx_a = -1; idx_c = -1; idx_g = -1
-                            for i, h in enumerate(headers):
-                                if "titel" in h: idx_t = i
-                                if "autor" in h: idx_a = i
-                                if h in ["cover", "bild"]: idx_c = i
-                                if "genre" in h: idx_g = i
-                            
-                            updates = 0
-                            if idx_t >= 0 and idx_c >= 0:
-                                for i, row in enumerate(all_vals[1:], start=2):
-                                    cov = row[idx_c] if len(row) > idx_c else ""
-                                    if not cov or cov == NO_COVER_MARKER:
-                                        tit = row[idx_t] if len(row) > idx_t else ""
-                                        aut = row[idx_a] if len(row) > idx_a else ""
-                                        if tit:
-                                            st.write(f"Suche für: {tit}")
-                                            nc, ng = fetch_book_data_background(tit, aut)
-                                            if nc:
-                                                ws_books.update_cell(i, idx_c+1, nc)
-                                                updates += 1
-                                            else:
-                                                ws_books.update_cell(i, idx_c+1, NO_COVER_MARKER)
-                                            time.sleep(1.5)
-                            if updates > 0:
-                                del st.session_state.df_books
-                                st.success(f"{updates} Bilder gefunden!")
-                                st.rerun()
-                            else: st.info("Nichts gefunden.")
-                    
-                    st.write("---")
-                    if st.button("🧹 Autorenliste aufräumen (Notfall)"):
-                         with st.spinner("Räume auf..."):
-                             cleanup_author_duplicates_batch(ws_books, ws_authors)
-                             del st.session_state.df_books
-                             del st.session_state.df_authors
-                             st.success("Erledigt.")
-                             time.sleep(1)
-                             st.rerun()
-
-            else: st.info("Liste leer.")
+    with st.expander("📦 Viele Bücher auf einmal"):
+        st.markdown('<div class="small-hint">Eine Zeile pro Buch: Titel, Autor<br>oder eine CSV-Datei (Titel, Autor, Bewertung)</div>', unsafe_allow_html=True)
+        with st.form("bulk_import_form"):
+            bulk_text = st.text_area("Bücher:", placeholder="Titel, Autor\nTitel, Autor", height=200)
+            bulk_file = st.file_uploader("oder CSV-Datei:", type=["csv", "txt"])
+            bulk_rating = st.slider("Sterne (wenn keine angegeben):", 1, 5, 5)
+            bulk_submitted = st.form_submit_button("📦 Alle eintragen")
 
-    except Exception as e:
-        st.error(f"Fehler: {e}")
-        if st.button("Notfall-Reset"):
-            st.session_state.clear()
-            st.rerun()
+        if bulk_submitted:
+            entries, skipped = parse_import_lines(bulk_text)
+            if bulk_file is not None:
+                csv_entries, csv_skipped = parse_import_csv(bulk_file.getvalue())
+                entries += csv_entries
+                skipped += csv_skipped
+            if entries:
+                with st.spinner(f"Trage {len(entries)} Bücher ein..."), track_operation("Massen-Import"):
+                    imported, duplicates, completed = bulk_import(ws_books, ws_authors, entries, bulk_rating)
+                st.success(f"{imported} Bücher eingetragen – Cover & Genres kommen im Hintergrund.")
+                if duplicates: st.info(f"{duplicates} standen schon im Regal.")
+                if completed: st.info(f"{completed} Autoren vervollständigt.")
+            else: st.error("Keine Bücher erkannt (Titel, Autor – mit Komma!).")
+            if skipped:
+                st.warning(f"{len(skipped)} Zeilen ohne Titel/Autor übersprungen: " + "; ".join(skipped[:5]))
+
+def authors_tab(ws_books, ws_authors):
+    st.header("Autoren")
+    known_authors_list = load_tab_authors(ws_authors)
+
+    st.caption("Einen neuen Autorennamen vorbereiten:")
+    with st.form("add_auth_form"):
+        col_inp, col_btn = st.columns([3, 1])
+        with col_inp:
+            new_auth_name = st.text_input("Name:", label_visibility="collapsed", placeholder="Name eingeben...")
+        with col_btn:
+            add_btn = st.form_submit_button("Hinzufügen")
+
+        if add_btn and new_auth_name:
+            if new_auth_name not in known_authors_list:
+                before = sheet_revision(ws_authors)
+                response = ws_authors.append_row([new_auth_name])
+                patch_cached_append(ws_authors, [[new_auth_name]], response, before)
+                st.success(f"'{new_auth_name}' dabei!")
+                time.sleep(0.5)
+                st.rerun()
+            else:
+                st.warning("Gibt's schon.")
+
+    st.markdown("---")
+    author_editor(ws_books, ws_authors)
+
+@measured_fragment
+def author_editor(ws_books, ws_authors):
+    """Autorentabelle – Bearbeiten zeichnet nur sie neu; erst "Speichern" schreibt zu Google."""
+    with st.spinner("Lade Autoren..."), tab_operation(ws_books, ws_authors):
+        library = sheet_derived(ws_books, "library_index", LibraryIndex, revalidate=False)
+        author_table = sheet_derived(ws_authors, "author_table", build_author_table, revalidate=False)
+
+    total_books = len(library.df)
+    st.metric("Bücher insgesamt:", total_books)
+
+    # Nur die zwei angezeigten Spalten neu bauen – die geteilte Tabelle bleibt unangetastet
+    df_display = pd.DataFrame({
+        "Name": author_table["Name"].to_numpy(),
+        "Anzahl d. Bücher": author_table["Name"].map(library.author_counts).fillna(0).astype(int).to_numpy(),
+    })
+
+    edited_authors = st.data_editor(
+        df_display,
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "Name": st.column_config.TextColumn("Name", required=True),
+            "Anzahl d. Bücher": st.column_config.NumberColumn("Anzahl d. Bücher", disabled=True)
+        },
+        hide_index=True
+    )
+
+    if st.button("💾 Liste speichern"):
+        clean = edited_authors[edited_authors["Name"].astype(str).str.strip() != ""]
+        sync_author_sheet(ws_authors, clean["Name"].astype(str).tolist())
+        st.success("Gespeichert!")
+        st.rerun()
+
+def list_tab(ws_books, ws_authors):
+    c_head, c_btn = st.columns([2,1])
+    with c_head: st.header("Sammlung")
+    with c_btn: 
+        if st.button("🔄 Tabelle neu laden"): force_reload(ws_books, ws_authors)
+
+    with st.spinner("Lade Bücherregal..."), tab_operation(ws_books):
+        library = sheet_derived(ws_books, "library_index", LibraryIndex, revalidate=False)
+    if not library.df.empty:
+        search_panel(ws_books)
+
+        st.markdown("---")
+        with st.expander("🔧 Wartung"):
+            if st.button("🔄 Fehlende Bilder suchen (Manuell)"):
+                with st.status("Suche...", expanded=True) as status, track_operation("Coversuche"):
+                    df_fresh = load_sheet(ws_books, force=True)
+                    col_map = sheet_schema(ws_books)
+
+                    todo = []
+                    if "Titel" in col_map and "Cover" in col_map and not df_fresh.empty:
+                        no_cover = df_fresh[df_fresh["Cover"].isin(["", NO_COVER_MARKER]) & (df_fresh["Titel"] != "")]
+                        # Mit gespeicherter BuchID/ISBN ein Direktabruf statt Volltextsuche
+                        todo = list(zip(no_cover["_Zeile"], no_cover["Titel"], no_cover["Autor"], no_cover["BuchID"], no_cover["ISBN"]))
+
+                    updates = 0
+                    buffer = SheetWriteBuffer(ws_books, col_map)
+                    def on_found(done, total, zeile, result):
+                        nonlocal updates
+                        nc, ng, isbn, book_id = result
+                        buffer.set(zeile, "Cover", nc or NO_COVER_MARKER)
+                        store_ids(buffer, zeile, isbn, book_id)
+                        if nc: updates += 1
+                        status.update(label=f"Suche... {done}/{total}")
+                        st.write(f"{'✅' if nc else '❌'} {titles[zeile]}")
+
+                    titles = {book[0]: book[1] for book in todo}
+                    # Manuell angestoßen: auch Bücher, bei denen wir neulich nichts gefunden haben
+                    enrich_books(todo, on_progress=on_found, refresh=True)
+                    buffer.flush()
+                    if buffer.failed:
+                        st.warning(f"{len(buffer.failed)} Zellen konnten nicht gespeichert werden: {buffer.errors[-1]}")
+                    if updates > 0:
+                        st.success(f"{updates} Bilder gefunden!")
+                        st.rerun()
+                    else: st.info("Nichts gefunden.")
+
+            st.write("---")
+            if st.button("🧹 Autorenliste aufräumen (Notfall)"):
+                 with st.spinner("Räume auf..."), track_operation("Aufräumen"):
+                     cleanup_author_duplicates_batch(ws_books, ws_authors)
+                     st.success("Erledigt.")
+                     time.sleep(1)
+                     st.rerun()
+
+    else: st.info("Liste leer.")
+
+@measured_fragment
+def search_panel(ws_books):
+    """Suchfeld – jede Eingabe sucht im geteilten Index und zeichnet nur Suche + Tabelle neu."""
+    search = st.text_input("🔍 Suchen:", placeholder="Titel...", key="search_box_fixed")
+    if st.session_state.get("list_search") != search:
+        # Neue Suche -> zurück auf Seite 1
+        st.session_state.list_search = search
+        st.session_state.list_page = 1
+    book_grid(ws_books, search)
+
+def delete_books(ws_books, marks):
+    """ "🗑️ Löschen": marks {zeile: (titel, autor)} sofort lokal weg; die Sync-Engine löscht bei Google."""
+    with track_operation("Löschen"): queue_delete(ws_books, marks)
+
+@measured_fragment
+def book_grid(ws_books, search):
+    """
+    Trefferseite mit Löschmarken – Blättern und Ankreuzen zeichnen nur die Tabelle neu.
+    Bekommt nur den Suchtext und sucht bei jedem Lauf selbst: ein Fragment-Rerun nutzt die
+    Argumente des letzten vollen Laufs, fertige Positionen wären nach einem Patch veraltet.
+    """
+    if "delete_marks" not in st.session_state: st.session_state.delete_marks = {}
+    if "list_editor_gen" not in st.session_state: st.session_state.list_editor_gen = 0
+    marks = st.session_state.delete_marks # {_Zeile: (Titel, Autor)} – bleibt beim Blättern erhalten
+    searched = st.session_state.get("list_grid_search") != search
+    st.session_state.list_grid_search = search
+    with track_operation("Suche" if searched else "Blättern"):
+        library = sheet_derived(ws_books, "library_index", LibraryIndex, revalidate=False)
+        positions = library.search(search)
+
+    c_size, c_page = st.columns(2)
+    with c_size: page_size = st.selectbox("Bücher pro Seite:", PAGE_SIZES, key="list_page_size")
+    pages = max(1, -(-len(positions) // page_size))
+    st.session_state.list_page = min(st.session_state.get("list_page", 1), pages)
+    with c_page: page = st.number_input(f"Seite (von {pages}):", min_value=1, max_value=pages, key="list_page")
+
+    # Nur die sichtbare Seite (samt Cover-URLs) geht an den Browser
+    # (als eigene kleine Kopie – der geteilte Frame bleibt unangetastet)
+    df_view = library.df.iloc[positions[(page - 1) * page_size : page * page_size]][
+        ["_Zeile", "Titel", "Autor", "Bewertung", "Cover"]].astype({"Autor": object, "Cover": object})
+    df_view["Löschen"] = df_view["_Zeile"].isin(list(marks))
+    df_view["Cover"] = df_view["Cover"].replace(NO_COVER_MARKER, None).map(get_thumbnail_store().data_uri)
+
+    edited_df = st.data_editor(
+        df_view,
+        key=f"list_editor_{st.session_state.list_editor_gen}_{search}_{page_size}_{page}",
+        column_order=["Titel", "Autor", "Bewertung", "Cover", "Löschen"],
+        column_config={
+            "Löschen": st.column_config.CheckboxColumn("Weg?", width="small", default=False),
+            "Cover": st.column_config.ImageColumn("Img", width="small"),
+            "Titel": st.column_config.TextColumn("Titel", disabled=True),
+            "Autor": st.column_config.TextColumn("Autor", disabled=True),
+            "Bewertung": st.column_config.NumberColumn("⭐", disabled=True)
+        },
+        hide_index=True,
+        use_container_width=True
+    )
+    for zeile, titel, autor, checked in zip(edited_df["_Zeile"], edited_df["Titel"], edited_df["Autor"], edited_df["Löschen"]):
+        if checked: marks[int(zeile)] = (titel, autor)
+        else: marks.pop(int(zeile), None)
+
+    if st.button(f"🗑️ Löschen ({len(marks)} markiert)", disabled=not marks):
+        # Sofort lokal weg; die Sync-Engine löscht alles in EINEM Request bei Google
+        delete_books(ws_books, marks)
+        marks.clear()
+        st.session_state.list_editor_gen += 1
+        st.success("Gelöscht!")
+        time.sleep(1)
+        st.rerun()
+
+@measured_fragment(run_every=SHEET_CACHE_TTL)
+def watch_sheets(ws_books, ws_authors):
+    """Revisionswächter: prüft im Hintergrund, ob sich die Blätter bei Google geändert haben."""
+    with track_operation("Laden"):
+        load_sheet(ws_books)
+        load_sheet(ws_authors)
+
+def main():
+    st.title("📚 Mamas Bücherwelt")
+    with rerun_scope(RUN_STARTED):
+        if "input_key" not in st.session_state: st.session_state.input_key = 0
+        if "background_check_done" not in st.session_state: st.session_state.background_check_done = False
+
+        status_area = st.container() # Statuszeilen landen hier, werden aber erst am Ende ermittelt
+        navigation() # zeichnet die Navigation zuerst – sie braucht weder Google noch pandas
+
+        try:
+            sheets = get_sheets()
+            if sheets is None: st.stop()
+            ws_books, ws_authors = sheets
+            get_sync_engine() # überträgt lokale Änderungen im Hintergrund
+            # Erst nach dem sichtbaren Tab: Revisions-Check, Autoren-Sync und Cover-Check
+            watch_sheets(ws_books, ws_authors)
+            run_deferred_checks(ws_books, ws_authors)
+            with status_area: render_job_status()
+        except Exception as e:
+            show_app_error(e, "main")
+
+        render_diagnostics()
 
 if __name__ == "__main__":
     main()
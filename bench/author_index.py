@@ -0,0 +1,41 @@
+"""get_smart_author_name mit AuthorIndex gegen die alte Sortier-Schleife über alle Autoren."""
+import random
+import string
+import time
+
+import common
+
+import app
+
+
+def baseline_smart_author_name(short_name, all_authors):
+    short_clean = short_name.strip().lower()
+    if not short_clean: return short_name
+    for full_name in sorted(all_authors, key=len, reverse=True):
+        if short_clean in str(full_name).lower(): return full_name
+    return short_name
+
+
+def main():
+    args = common.parser(__doc__, authors=20000, queries=400, seed=1).parse_args()
+    rnd = random.Random(args.seed)
+    first = ["Anna", "Karl", "Maria", "Jo", "Ernst", "Ulla", "Christine", "Petra", "Hans", "Lea"]
+    def word(): return rnd.choice(string.ascii_uppercase) + "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 9)))
+    authors = list(dict.fromkeys(f"{rnd.choice(first)} {word()}" for _ in range(args.authors)))
+    queries = [a.split()[-1] for a in rnd.sample(authors, args.queries * 3 // 4)]
+    queries += [a.split()[-1][:4].lower() for a in rnd.sample(authors, args.queries // 4)]
+
+    start = time.perf_counter()
+    index = app.AuthorIndex(authors)
+    t_build = time.perf_counter() - start
+    for q in queries: assert app.get_smart_author_name(q, authors, index) == baseline_smart_author_name(q, authors), q
+    t_old, _ = common.best_of(lambda: [baseline_smart_author_name(q, authors) for q in queries], 1)
+    t_new, _ = common.best_of(lambda: [app.get_smart_author_name(q, authors, index) for q in queries], 3)
+    print(f"{len(authors)} Autoren, {len(queries)} Anfragen")
+    print(f"  Index aufbauen           {common.ms(t_build)}")
+    print(f"  alt je Anfrage           {common.ms(t_old / len(queries))}")
+    print(f"  AuthorIndex je Anfrage   {common.ms(t_new / len(queries))}   ({t_old / t_new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
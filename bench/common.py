@@ -0,0 +1,49 @@
+"""
+Gemeinsames für die Benchmarks: Pfade (app.py, tests/fakes.py), leises Streamlit,
+Zeitmessung. Aufruf immer als Skript, z.B. `python bench/rows_to_frame.py --rows 50000`.
+"""
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+logging.disable(logging.WARNING) # "missing ScriptRunContext": app.py läuft hier ohne Streamlit-Server
+
+
+def best_of(fn, repeat=5):
+    """Schnellste von repeat Laufzeiten in Sekunden (und das Ergebnis des letzten Laufs)."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def parser(description, **defaults):
+    p = argparse.ArgumentParser(description=description)
+    for name, value in defaults.items():
+        p.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    return p
+
+
+def ms(seconds):
+    return f"{seconds * 1000:10.3f} ms"
+
+
+def app_folder(folder, rev=""):
+    """Legt app.py (Arbeitskopie oder aus git-Revision rev) samt Attrappen-Zugangsdaten in folder an."""
+    if rev:
+        source = subprocess.run(["git", "show", f"{rev}:app.py"], capture_output=True, check=True, cwd=ROOT).stdout
+        with open(os.path.join(folder, "app.py"), "wb") as f: f.write(source)
+    else:
+        shutil.copy(os.path.join(ROOT, "app.py"), folder)
+    with open(os.path.join(folder, "credentials.json"), "w") as f: f.write("{}")
+    os.makedirs(os.path.join(folder, ".streamlit"), exist_ok=True)
+    with open(os.path.join(folder, ".streamlit", "secrets.toml"), "w") as f: f.write('[bench]\nbackend = "fake"\n')
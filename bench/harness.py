@@ -0,0 +1,162 @@
+"""
+Lastprofil der wichtigsten Abläufe gegen eine nachgebaute Google-Tabelle (tests/fakes.py)
+und lokale Stub-Server für Google Books / Open Library – ohne Netz, reproduzierbar.
+Je Bibliotheksgröße und Ablauf: Wandzeit, Sheets-Aufrufe (nach Methode) und HTTP-Anfragen.
+Abläufe mit einer Aktion aus app.OPERATION_BUDGETS laufen in app.track_operation; überzieht
+eine ihr Budget (Google-Aufrufe oder Sekunden), endet das Skript mit Exit-Code 1.
+
+    python bench/harness.py --sizes 100,1000,10000 --latency 0.05 --json profil.json
+
+--latency simuliert die Dauer eines Sheets-Round-Trips. "Laden" über load_sheet/read_sheet_frame
+ist der Nachfolger des früheren fetch_data_from_sheet. Speichern und Löschen rufen dieselben
+Funktionen wie die Oberfläche (app.save_book, app.delete_books).
+"""
+import collections
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import common
+import gspread
+import streamlit as st
+from google.oauth2 import service_account
+
+import app
+import fakes
+
+WORKER_TIMEOUT = 600 # Sekunden, bis die Hintergrund-Suche leer sein muss
+
+
+class Library:
+    """Eine Bibliothek der Größe n samt Stub-Servern, frischen Prozess-Caches und eigener SQLite-Datei."""
+    def __init__(self, n, latency, folder):
+        st.cache_resource.clear()
+        app.CACHE_DB = os.path.join(folder, "cache.sqlite")
+        app.THUMB_DIR = os.path.join(folder, "cover_cache")
+        self.spreadsheet = fakes.make_library(n, latency=latency, without_cover=20)
+        books, authors = self.spreadsheet.sheet1.rows, self.spreadsheet.sheets["Autoren"].rows
+        # Arbeit für Autoren-Sync und Aufräumen: jeder zehnte Autor fehlt in der Liste,
+        # jedes 25. Buch trägt nur den Nachnamen
+        del authors[1::10]
+        for row in books[1::25]: row[1] = row[1].split()[-1]
+        self.google = fakes.StubServer(fakes.google_books_handler)
+        self.open_library = fakes.StubServer(fakes.open_library_handler)
+        app.GOOGLE_BOOKS_API = self.google.url + "/volumes"
+        app.OPEN_LIBRARY = self.open_library.url
+        for stub in (self.google, self.open_library): app.HOST_MIN_INTERVAL[stub.host] = 0
+        self.results = []
+
+    def close(self):
+        self.google.close()
+        self.open_library.close()
+
+    def http_requests(self):
+        return len(self.google.requests) + len(self.open_library.requests)
+
+    def run(self, name, fn, operation=None):
+        """operation: Aktion aus app.OPERATION_BUDGETS, unter der fn gemessen wird (falls fn das nicht selbst tut)."""
+        with self.spreadsheet.lock: before = collections.Counter(c[1] for c in self.spreadsheet.calls)
+        http_before = self.http_requests()
+        start = time.perf_counter()
+        if operation:
+            with app.track_operation(operation): result = fn()
+        else:
+            result = fn()
+        seconds = time.perf_counter() - start
+        with self.spreadsheet.lock: calls = collections.Counter(c[1] for c in self.spreadsheet.calls) - before
+        self.results.append({"Ablauf": name, "Bücher": len(self.spreadsheet.sheet1.rows) - 1, "ms": round(seconds * 1000, 1),
+                             "Sheets": sum(calls.values()), "HTTP": self.http_requests() - http_before,
+                             "Aufrufe": dict(sorted(calls.items()))})
+        return result
+
+    def over_budget(self):
+        """[(Aktion, Warnung)] für jede Aktion, die in diesem Lauf ihr Budget überzogen hat."""
+        telemetry = app.get_telemetry()
+        with telemetry.lock:
+            return [(name, op["last_warning"]) for name, op in sorted(telemetry.operations.items()) if op["over_budget"]]
+
+
+def wait_for_worker():
+    queue = app.get_enrichment_worker().queue
+    deadline = time.monotonic() + WORKER_TIMEOUT
+    while queue.counts().get("pending", 0) + queue.counts().get("running", 0):
+        if time.monotonic() > deadline: raise TimeoutError("Hintergrund-Suche wird nicht fertig")
+        time.sleep(0.05)
+
+
+def profile(lib):
+    ws_books, ws_authors = lib.run("Verbinden (get_sheets)", app.get_sheets)
+    lib.run("Laden kalt (load_sheet)", lambda: (app.load_sheet(ws_books), app.load_sheet(ws_authors)), "Laden")
+    lib.run("Laden warm (load_sheet)", lambda: (app.load_sheet(ws_books), app.load_sheet(ws_authors)), "Navigation")
+    lib.run("Rohdownload (read_sheet_frame)", lambda: app.read_sheet_frame(ws_books))
+    library = lib.run("Suchindex bauen", lambda: app.sheet_derived(ws_books, "library_index", app.LibraryIndex))
+    lib.run("Suche", lambda: library.search("Buch 1"), "Suche")
+
+    st.session_state.pop("sync_done", None)
+    lib.run("sync_authors", lambda: app.sync_authors(ws_books, ws_authors), "Autoren-Sync")
+
+    index = lib.run("Autorenindex bauen", lambda: app.sheet_derived(ws_authors, "author_index", app.build_author_index))
+    names = app.load_sheet(ws_authors)["Name"].astype(str).tolist()
+    queries = [name.split()[-1] for name in names[::max(1, len(names) // 100)]][:100]
+    lib.run(f"get_smart_author_name ×{len(queries)}",
+            lambda: [app.get_smart_author_name(q, names, index) for q in queries])
+
+    lib.run("silent_background_check", lambda: app.silent_background_check(ws_books, app.load_sheet(ws_books)),
+            "Hintergrund-Check")
+    lib.run("Hintergrund-Suche (bis leer)", wait_for_worker)
+    lib.run("Sync (flush_outbox)", lambda: app.flush_outbox(ws_books))
+
+    lib.run("cleanup_author_duplicates_batch", lambda: app.cleanup_author_duplicates_batch(ws_books, ws_authors),
+            "Aufräumen")
+    lib.run("Sync (flush_outbox)", lambda: app.flush_outbox(ws_books))
+
+    # Speichern und Löschen messen sich selbst (track_operation in app.save_book/app.delete_books)
+    lib.run("Speichern", lambda: app.save_book(ws_books, ws_authors, "Ein neues Buch", "Nachname3", 5, names))
+    lib.run("Hintergrund-Suche (bis leer)", wait_for_worker)
+    lib.run("Sync (flush_outbox)", lambda: app.flush_outbox(ws_books))
+
+    df = app.load_sheet(ws_books) # zehn markierte Bücher, wie in der Sammlung angekreuzt
+    marks = {int(z): (t, a) for z, t, a in zip(df["_Zeile"][:10], df["Titel"][:10], df["Autor"][:10].astype(object))}
+    lib.run("Löschen (10 Bücher)", lambda: app.delete_books(ws_books, marks))
+    lib.run("Sync (flush_outbox)", lambda: app.flush_outbox(ws_books))
+
+
+def main():
+    args = common.parser(__doc__, sizes="100,1000,10000", latency=0.0, json="").parse_args()
+    output = os.path.abspath(args.json) if args.json else None # vor dem chdir auflösen
+    results, over = [], []
+    with tempfile.TemporaryDirectory() as folder, \
+            mock.patch.object(service_account.Credentials, "from_service_account_file", lambda *a, **k: object()):
+        os.chdir(folder)
+        with open("credentials.json", "w") as f: f.write("{}")
+        os.makedirs(".streamlit")
+        with open(os.path.join(".streamlit", "secrets.toml"), "w") as f: f.write('[bench]\nbackend = "fake"\n')
+        for n in [int(s) for s in args.sizes.split(",")]:
+            os.makedirs(os.path.join(folder, str(n)))
+            lib = Library(n, args.latency, os.path.join(folder, str(n)))
+            try:
+                with mock.patch.object(gspread, "authorize", lambda creds: fakes.FakeClient(lib.spreadsheet)):
+                    profile(lib)
+                over += [(n, name, warning) for name, warning in lib.over_budget()]
+            finally:
+                lib.close()
+            results += lib.results
+            print(f"\n{n} Bücher (Latenz {args.latency * 1000:.0f} ms je Sheets-Aufruf)")
+            print(f"  {'Ablauf':<34} {'ms':>10} {'Sheets':>7} {'HTTP':>6}  Aufrufe")
+            for r in lib.results:
+                calls = ", ".join(f"{k} {v}" for k, v in r["Aufrufe"].items())
+                print(f"  {r['Ablauf']:<34} {r['ms']:>10.1f} {r['Sheets']:>7} {r['HTTP']:>6}  {calls}")
+    if output:
+        with open(output, "w") as f: json.dump(results, f, indent=2, ensure_ascii=False)
+    if over:
+        print("\nBudget überschritten:")
+        for n, name, warning in over: print(f"  {n} Bücher, {name}: {warning}")
+        sys.exit(1)
+    print("\nAlle Aktionen im Budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""LibraryIndex.search gegen das alte Kopieren, Sortieren und Filtern je Rerun."""
+import random
+import string
+import time
+
+import common
+
+import app
+
+
+def baseline_view(df, search):
+    def get_lastname(full_name):
+        if not isinstance(full_name, str) or not full_name.strip(): return ""
+        return full_name.strip().split(" ")[-1].lower()
+    view = df.copy()
+    view["_Nachname"] = view["Autor"].apply(get_lastname)
+    view = view.sort_values(by="_Nachname", kind="stable")
+    if search:
+        view = view[view["Titel"].astype(str).str.contains(search, case=False) | view["Autor"].astype(str).str.contains(search, case=False)]
+    return view
+
+
+def main():
+    args = common.parser(__doc__, books=100000, seed=3).parse_args()
+    rnd = random.Random(args.seed)
+    def word(k): return "".join(rnd.choices(string.ascii_lowercase, k=k)).capitalize()
+    authors = [f"{word(5)} {word(8)}" for _ in range(args.books // 5)]
+    values = [["Titel", "Autor"]] + [[f"{word(6)} {word(5)} {word(7)}", rnd.choice(authors)] for _ in range(args.books)]
+    plain = app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2) # so hat die alte Ansicht gearbeitet
+    df = app.compact_frame(plain)
+
+    start = time.perf_counter()
+    index = app.LibraryIndex(df)
+    print(f"{args.books} Bücher – Index aufbauen {common.ms(time.perf_counter() - start)}")
+    print(f"  {'Suche':<12} {'Treffer':>7}  {'alt':>13}  {'LibraryIndex':>13}")
+    for q in ["", "ab", "abc", df["Titel"].iloc[500].split()[1][:4], authors[7].split()[-1], "zzzzq"]:
+        t_old, old = common.best_of(lambda: baseline_view(plain, q), 1)
+        t_new, hits = common.best_of(lambda: index.search(q), 3)
+        assert list(old["_Zeile"]) == list(df["_Zeile"].iloc[hits]), q
+        print(f"  {q!r:<12} {len(hits):>7}  {common.ms(t_old)}  {common.ms(t_new)}")
+
+
+if __name__ == "__main__":
+    main()
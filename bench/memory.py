@@ -0,0 +1,114 @@
+"""
+Speicher bei vielen gleichzeitigen Sitzungen: N AppTest-Sitzungen (gegen tests/fakes.py)
+öffnen nacheinander die Liste und bleiben offen; gemessen wird die RSS des Prozesses.
+--compare misst dasselbe für app.py aus einer anderen git-Revision (z.B. vor dem
+kompakten Frame). Dazu Speicher des Frames selbst (kompakt gegen reine Texte) und
+Kosten eines Patches, wenn der ganze Frame neu gepackt wird gegenüber nur den
+berührten Spalten.
+
+    python bench/memory.py --sessions 50 --books 10000 --compare <revision>
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+import common
+
+import app
+import fakes
+
+
+SESSIONS = r'''
+import gc, logging, os, resource, sys
+from unittest import mock
+logging.disable(logging.WARNING)
+sys.path.insert(0, sys.argv[1])
+import gspread
+import requests
+from google.oauth2 import service_account
+from streamlit.testing.v1 import AppTest
+import fakes
+
+def rss_mb():
+    gc.collect()
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+    except OSError: # kein Linux: Spitzenwert statt aktuellem Stand
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def offline(self, method, url, **kwargs):
+    raise requests.exceptions.ConnectionError(f"offline: {url}")
+
+spreadsheet = fakes.make_library(int(sys.argv[2]), without_cover=0) # ohne Hintergrund-Suchen
+mock.patch.object(gspread, "authorize", lambda creds: fakes.FakeClient(spreadsheet)).start()
+mock.patch.object(service_account.Credentials, "from_service_account_file", lambda *a, **k: object()).start()
+mock.patch.object(requests.Session, "request", offline).start()
+sessions, marks = [], [rss_mb()]
+for _ in range(int(sys.argv[3])):
+    at = AppTest.from_file("app.py", default_timeout=120)
+    at.run()
+    at.radio[0].set_value("🔍 Liste").run()
+    assert not at.exception, at.exception
+    sessions.append(at) # Sitzung bleibt offen, samt session_state
+    marks.append(rss_mb())
+print(*marks, flush=True)
+os._exit(0) # nicht auf die Hintergrund-Threads der Sitzungen warten
+'''
+
+
+def sessions_rss(rev, books, sessions):
+    """RSS in MB: vor der ersten Sitzung und nach jeder weiteren (frischer Prozess)."""
+    with tempfile.TemporaryDirectory() as folder:
+        common.app_folder(folder, rev)
+        result = subprocess.run([sys.executable, "-c", SESSIONS, os.path.join(common.ROOT, "tests"),
+                                 str(books), str(sessions)], capture_output=True, text=True, cwd=folder)
+    if result.returncode: raise RuntimeError(result.stderr[-2000:])
+    return [float(x) for x in result.stdout.split()[-(sessions + 1):]]
+
+
+def report_sessions(args):
+    print(f"{args.sessions} offene Sitzungen, {args.books} Bücher (RSS des Prozesses)")
+    print(f"  {'app.py':<24} {'leer':>9} {'1 Sitzung':>10} {f'{args.sessions} Sitzungen':>14} {'je weitere':>11}")
+    for rev in ([""] + ([args.compare] if args.compare else [])):
+        marks = sessions_rss(rev, args.books, args.sessions)
+        per_session = (marks[-1] - marks[1]) / max(1, args.sessions - 1)
+        print(f"  {rev or '(Arbeitskopie)':<24} {marks[0]:7.1f} MB {marks[1]:7.1f} MB {marks[-1]:11.1f} MB {per_session:8.2f} MB")
+
+
+def main():
+    args = common.parser(__doc__, books=10000, repeat=5, sessions=50, compare="").parse_args()
+    if args.sessions: report_sessions(args)
+    values = fakes.make_library(args.books).sheet1.rows
+    plain = app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2)
+    compact = app.compact_frame(plain)
+    assert app.plain_frame(compact)[plain.columns].equals(plain), "kompakte Form verliert Werte"
+
+    plain_mb = plain.memory_usage(deep=True).sum() / 1e6
+    compact_mb = compact.memory_usage(deep=True).sum() / 1e6
+    print(f"{args.books} Bücher, String-Typ {app.string_dtype()} (DataFrame.memory_usage(deep=True))")
+    print(f"  reine Texte   {plain_mb:8.2f} MB")
+    print(f"  kompakt       {compact_mb:8.2f} MB   ({compact_mb / plain_mb:.0%})")
+
+    col_map = app.resolve_schema(fakes.BOOK_HEADER)
+    row = app.rows_to_frame([["Neu", "Ganz Neue Autorin", "Krimi", "4", "", "", ""]], col_map, args.books + 2)
+    patches = {
+        "Zelle (Genre)": (lambda: app.compact_frame(app.assign_cells(compact, [(0, "Genre", "Krimi")]))),
+        "Zelle (Genre), nur Spalte": (lambda: app.compact_frame(app.assign_cells(compact, [(0, "Genre", "Krimi")]), {"Genre"})),
+        "Anhängen": (lambda: app.compact_frame(pd.concat([compact, row], ignore_index=True))),
+        "Anhängen, append_compact": (lambda: app.append_compact(compact, row)),
+        "Löschen": (lambda: app.compact_frame(app.drop_sheet_rows(compact, [5]))),
+        "Löschen, ohne Neupacken": (lambda: app.drop_sheet_rows(compact, [5])),
+    }
+    print(f"  {'Patch':<28} {'beste von ' + str(args.repeat):>14}")
+    for name, patch in patches.items():
+        seconds, out = common.best_of(patch, args.repeat)
+        assert out.memory_usage(deep=True).sum() / 1e6 < plain_mb, name
+        print(f"  {name:<28} {common.ms(seconds)}")
+
+
+if __name__ == "__main__":
+    main()
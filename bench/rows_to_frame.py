@@ -0,0 +1,52 @@
+"""rows_to_frame (spaltenweise) gegen die alte Schleife mit einem dict pro Zeile."""
+import random
+
+import common
+import pandas as pd
+
+import app
+
+
+def baseline_frame(all_values):
+    # Stand vor der Umstellung: Kopfzeile deuten, dann ein dict pro Zeile
+    headers = [str(h).strip().lower() for h in all_values[0]]
+    col_map = {}
+    for idx, h in enumerate(headers):
+        if "titel" in h: col_map["Titel"] = idx
+        elif "autor" in h: col_map["Autor"] = idx
+        elif h in ["cover", "bild", "image", "img"]: col_map["Cover"] = idx
+        elif h in ["sterne", "bewertung", "rating"]: col_map["Bewertung"] = idx
+        elif h in ["genre", "kategorie"]: col_map["Genre"] = idx
+        elif "name" in h: col_map["Name"] = idx
+    rows = []
+    for raw_row in all_values[1:]:
+        entry = {"Titel": "", "Autor": "", "Cover": "", "Bewertung": "", "Genre": "", "Name": ""}
+        for key, idx in col_map.items():
+            if idx < len(raw_row): entry[key] = raw_row[idx]
+        if entry["Titel"] or entry["Name"]: rows.append(entry)
+    return pd.DataFrame(rows)
+
+
+def sheet_values(n, seed=3):
+    # Wie echte Blätter: gekürzte Zeilen (leere Zellen am Ende) und vereinzelt Zeilen ohne Titel
+    rnd = random.Random(seed)
+    values = [["Titel", "Autor", "Genre", "Bewertung", "Cover"]]
+    for i in range(n):
+        row = [f"Titel {i}" if i % 50 else "", f"Autor {i % 900}", "Roman", str(i % 5 + 1), f"http://c/{i}.jpg"]
+        values.append(row[:rnd.choice([3, 4, 5, 5, 5])])
+    return values
+
+
+def main():
+    args = common.parser(__doc__, rows=50000, repeat=5).parse_args()
+    values = sheet_values(args.rows)
+    t_old, old = common.best_of(lambda: baseline_frame(values), args.repeat)
+    t_new, new = common.best_of(lambda: app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2), args.repeat)
+    assert (old.values == new[old.columns].values).all(), "Ergebnis weicht ab"
+    print(f"{args.rows} Zeilen, beste von {args.repeat}")
+    print(f"  dict pro Zeile  {common.ms(t_old)}")
+    print(f"  rows_to_frame   {common.ms(t_new)}   ({t_old / t_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""find_short_form_targets (Trigramm-Index) gegen den alten Vergleich jeder mit jedem."""
+import random
+import string
+
+import common
+
+import app
+
+
+def baseline_short_forms(keys):
+    unique_keys = sorted(keys, key=len, reverse=True)
+    replacements = {}
+    for i, long_key in enumerate(unique_keys):
+        for short_key in unique_keys[i + 1:]:
+            if short_key.lower() in long_key.lower() and short_key.lower() != long_key.lower():
+                replacements[short_key] = long_key
+    return replacements
+
+
+def main():
+    args = common.parser(__doc__, authors=10000, short_forms=1000, seed=2).parse_args()
+    rnd = random.Random(args.seed)
+    first = ["Anna", "Karl", "Maria", "Jo", "Ernst", "Ulla", "Christine", "Petra", "Hans", "Lea"]
+    def word(): return rnd.choice(string.ascii_uppercase) + "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 9)))
+    full = list(dict.fromkeys(f"{rnd.choice(first)} {word()}" for _ in range(args.authors - args.short_forms)))
+    keys = full + [name.split()[-1] for name in rnd.sample(full, args.short_forms)]
+    rnd.shuffle(keys)
+
+    t_old, old = common.best_of(lambda: baseline_short_forms(keys), 1)
+    t_new, new = common.best_of(lambda: app.find_short_form_targets(keys), 3)
+    assert set(old) == set(new), "andere Kurzformen gefunden"
+    print(f"{len(keys)} Namen, {len(new)} Kurzformen")
+    print(f"  jeder mit jedem           {common.ms(t_old)}")
+    print(f"  find_short_form_targets   {common.ms(t_new)}   ({t_old / t_new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
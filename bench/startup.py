@@ -0,0 +1,84 @@
+"""
+Kaltstart in frischen Prozessen: Importzeit von app.py und Zeit bis zur Navigation,
+bis zum Formular "Buch eintragen" und bis zum Skriptende (AppTest gegen tests/fakes.py
+mit simulierter Sheets-Latenz). --rev misst app.py aus einer anderen git-Revision.
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import common
+
+IMPORT = r'''
+import logging, sys, time
+logging.disable(logging.WARNING)
+import streamlit
+sys.path.insert(0, ".")
+start = time.perf_counter()
+import app
+print(time.perf_counter() - start)
+'''
+
+RENDER = r'''
+import logging, sys, time
+from unittest import mock
+logging.disable(logging.WARNING)
+sys.path.insert(0, sys.argv[1])
+start = time.perf_counter()
+import gspread
+import streamlit as st
+from google.oauth2 import service_account
+from streamlit.testing.v1 import AppTest
+import fakes
+
+marks = {}
+def mark(name, widget):
+    def wrapped(*args, **kwargs):
+        marks.setdefault(name, time.perf_counter())
+        return widget(*args, **kwargs)
+    return wrapped
+st.radio = mark("nav", st.radio) # Navigation
+st.slider = mark("form", st.slider) # Sterne-Regler im Formular "Buch eintragen"
+spreadsheet = fakes.make_library(int(sys.argv[2]), latency=float(sys.argv[3]))
+mock.patch.object(gspread, "authorize", lambda creds: fakes.FakeClient(spreadsheet)).start()
+mock.patch.object(service_account.Credentials, "from_service_account_file", lambda *a, **k: object()).start()
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+assert not at.exception, at.exception
+print(marks["nav"] - start, marks["form"] - start, time.perf_counter() - start)
+'''
+
+
+def run(code, folder, *args):
+    # Jeder Lauf kalt: neuer Prozess, keine SQLite-Replik vom letzten Mal
+    for leftover in ("buecher_cache.sqlite", "cover_cache"):
+        path = os.path.join(folder, leftover)
+        if os.path.isdir(path): shutil.rmtree(path)
+        elif os.path.exists(path): os.remove(path)
+    result = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True, cwd=folder)
+    if result.returncode: raise RuntimeError(result.stderr[-2000:])
+    return [float(x) for x in result.stdout.split()[-3:]]
+
+
+def main():
+    args = common.parser(__doc__, books=2000, latency=0.08, runs=5, rev="").parse_args()
+    with tempfile.TemporaryDirectory() as folder:
+        common.app_folder(folder, args.rev)
+        tests = os.path.join(common.ROOT, "tests")
+        imports = [run(IMPORT, folder)[0] for _ in range(args.runs)]
+        renders = [run(RENDER, folder, tests, str(args.books), str(args.latency)) for _ in range(args.runs)]
+
+    def median(values): return common.ms(statistics.median(values))
+    print(f"app.py {args.rev or '(Arbeitskopie)'}, {args.books} Bücher, {args.latency * 1000:.0f} ms je Sheets-Aufruf, "
+          f"Median aus {args.runs} Prozessen")
+    print(f"  import app           {median(imports)}")
+    print(f"  Navigation sichtbar  {median(r[0] for r in renders)}")
+    print(f"  Formular 'Neu'       {median(r[1] for r in renders)}")
+    print(f"  Skript fertig        {median(r[2] for r in renders)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import gspread  # noqa: E402
+import requests  # noqa: E402
+import streamlit as st  # noqa: E402
+from google.oauth2 import service_account  # noqa: E402
+
+import fakes  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """app.py als Modul – mit eigener SQLite-Datei und Bildordner, frischen Prozess-Caches."""
+    import app as module
+    st.cache_resource.clear()
+    monkeypatch.setattr(module, "CACHE_DB", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(module, "THUMB_DIR", str(tmp_path / "cover_cache"))
+    yield module
+    st.cache_resource.clear()
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    """
+    Ersetzt Google Sheets: gspread.authorize liefert einen FakeClient auf einer kleinen
+    Bibliothek. Liefert (spreadsheet, authorize-Aufrufe).
+    """
+    spreadsheet = fakes.make_library(20)
+    authorized = []
+
+    def authorize(creds):
+        authorized.append(creds)
+        return fakes.FakeClient(spreadsheet)
+    monkeypatch.setattr(gspread, "authorize", authorize)
+    monkeypatch.setattr(service_account.Credentials, "from_service_account_file", lambda *a, **k: object())
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "credentials.json").write_text("{}")
+    (tmp_path / ".streamlit").mkdir()
+    (tmp_path / ".streamlit" / "secrets.toml").write_text('[test]\nbackend = "fake"\n')
+    st.cache_resource.clear()
+    yield spreadsheet, authorized
+    st.cache_resource.clear()
+
+
+@pytest.fixture
+def stub_apis(app, monkeypatch):
+    """Google Books und Open Library als lokale Stub-Server. Liefert (google, open_library)."""
+    google = fakes.StubServer(fakes.google_books_handler)
+    open_library = fakes.StubServer(fakes.open_library_handler)
+    monkeypatch.setattr(app, "GOOGLE_BOOKS_API", google.url + "/volumes")
+    monkeypatch.setattr(app, "OPEN_LIBRARY", open_library.url)
+    for stub in (google, open_library): monkeypatch.setitem(app.HOST_MIN_INTERVAL, stub.host, 0)
+    yield google, open_library
+    google.close()
+    open_library.close()
+
+
+@pytest.fixture
+def app_test(tmp_path, backend, monkeypatch):
+    """
+    AppTest auf einer Kopie von app.py in tmp_path – Cache-Datei und Cover landen dort.
+    Buch-Suchen im Netz schlagen sofort fehl.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    def offline(self, url, **kwargs):
+        raise requests.exceptions.ConnectionError(f"offline: {url}")
+
+    monkeypatch.setattr(requests.Session, "get", offline)
+    script = tmp_path / "app.py"
+    shutil.copy(os.path.join(ROOT, "app.py"), script)
+    return AppTest.from_file(str(script), default_timeout=60)
@@ -0,0 +1,256 @@
+"""
+Attrappen für die Google-Dienste der App – ohne Netz, im Speicher.
+
+FakeSpreadsheet/FakeWorksheet bilden genau den Teil der gspread-API nach, den app.py
+benutzt, und protokollieren jeden Aufruf (zum Zählen der Round-Trips). StubServer ist
+ein lokaler Keep-Alive-HTTP-Server für Google Books und Open Library.
+"""
+import io
+import itertools
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import gspread
+from gspread.utils import a1_to_rowcol
+from PIL import Image
+
+_revisions = itertools.count(1)
+
+# Endpunkte, die beim http_client des Clients ankommen – instrument_client() zählt sie wie echte gspread-Aufrufe
+_ENDPOINTS = {
+    "get_all_values": ("get", "https://sheets.googleapis.com/v4/spreadsheets/fake/values/%27Sheet%27"),
+    "row_values": ("get", "https://sheets.googleapis.com/v4/spreadsheets/fake/values/A1:1"),
+    "append_rows": ("post", "https://sheets.googleapis.com/v4/spreadsheets/fake/values/%27Sheet%27!A1:append"),
+    "update": ("put", "https://sheets.googleapis.com/v4/spreadsheets/fake/values/A1"),
+    "batch_update": ("post", "https://sheets.googleapis.com/v4/spreadsheets/fake/values:batchUpdate"),
+    "spreadsheet_batch_update": ("post", "https://sheets.googleapis.com/v4/spreadsheets/fake:batchUpdate"),
+    "get_lastUpdateTime": ("get", "https://www.googleapis.com/drive/v3/files/fake"),
+}
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, rows, sheet_id):
+        self.spreadsheet, self.title, self.rows, self.id = spreadsheet, title, rows, sheet_id
+        self.spreadsheet_id = spreadsheet.id
+
+    def _call(self, name, **details):
+        self.spreadsheet._call(self.title, name, **details)
+
+    def _set(self, r, c, value):
+        while len(self.rows) < r: self.rows.append([])
+        row = self.rows[r - 1]
+        while len(row) < c: row.append("")
+        row[c - 1] = value if isinstance(value, str) else str(value)
+
+    def get_all_values(self, *args, **kwargs):
+        self._call("get_all_values")
+        return [list(r) for r in self.rows]
+
+    def row_values(self, n):
+        self._call("row_values")
+        return list(self.rows[n - 1]) if n <= len(self.rows) else []
+
+    def append_row(self, row, **kwargs):
+        return self.append_rows([row], **kwargs)
+
+    def append_rows(self, rows, value_input_option=None, **kwargs):
+        self._call("append_rows", value_input_option=str(value_input_option), rows=len(rows))
+        start = len(self.rows) + 1
+        self.rows.extend([[v if isinstance(v, str) else str(v) for v in r] for r in rows])
+        self.spreadsheet.touch()
+        return {"updates": {"updatedRange": f"'{self.title}'!A{start}:Z{len(self.rows)}"}}
+
+    def update(self, values=None, range_name=None, value_input_option=None, **kwargs):
+        self._call("update", value_input_option=str(value_input_option))
+        if isinstance(values, str): values, range_name = range_name, values
+        r0, c0 = a1_to_rowcol(range_name.split(":")[0]) if range_name else (1, 1)
+        for i, row in enumerate(values):
+            for j, v in enumerate(row): self._set(r0 + i, c0 + j, v)
+        self.spreadsheet.touch()
+
+    def update_cell(self, r, c, value):
+        self._call("update_cell")
+        self._set(r, c, value)
+        self.spreadsheet.touch()
+
+    def batch_update(self, data, value_input_option=None, **kwargs):
+        self._call("batch_update", value_input_option=str(value_input_option), ranges=len(data))
+        for d in data:
+            r0, c0 = a1_to_rowcol(d["range"].split("!")[-1].split(":")[0])
+            for i, row in enumerate(d["values"]):
+                for j, v in enumerate(row): self._set(r0 + i, c0 + j, v)
+        self.spreadsheet.touch()
+
+    def delete_rows(self, start, end=None):
+        self._call("delete_rows")
+        del self.rows[start - 1:(end or start)]
+        self.spreadsheet.touch()
+
+    def clear(self):
+        self._call("clear")
+        self.rows = []
+        self.spreadsheet.touch()
+
+
+class FakeSpreadsheet:
+    def __init__(self, books, authors, latency=0.0):
+        self.id = "fake-spreadsheet"
+        self.latency = latency # simulierte Latenz pro Aufruf (Sekunden)
+        self.revision = next(_revisions)
+        self.calls = [] # (sheet, method, details)
+        self.http = None # setzt FakeClient; bekommt jeden Aufruf wie gspreads http_client
+        self.lock = threading.Lock()
+        self.sheet1 = FakeWorksheet(self, "Bücher", books, 0)
+        self.sheets = {"Autoren": FakeWorksheet(self, "Autoren", authors, 1)}
+
+    def _call(self, target, name, **details):
+        with self.lock: self.calls.append((target, name, details))
+        if self.latency: time.sleep(self.latency)
+        if self.http is not None and name in _ENDPOINTS: self.http.request(*_ENDPOINTS[name])
+
+    def touch(self):
+        self.revision = next(_revisions)
+
+    def count(self, *names):
+        """Anzahl protokollierter Aufrufe (optional nur der genannten Methoden)."""
+        with self.lock: return sum(1 for c in self.calls if not names or c[1] in names)
+
+    def worksheet(self, title):
+        self._call("spreadsheet", "worksheet")
+        if title in self.sheets: return self.sheets[title]
+        raise gspread.exceptions.WorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows, cols):
+        self._call("spreadsheet", "add_worksheet")
+        ws = self.sheets[title] = FakeWorksheet(self, title, [], len(self.sheets) + 1)
+        return ws
+
+    def get_lastUpdateTime(self):
+        self._call("spreadsheet", "get_lastUpdateTime")
+        return str(self.revision)
+
+    def batch_update(self, body):
+        self._call("spreadsheet", "spreadsheet_batch_update")
+        for request in body["requests"]:
+            r = request["deleteDimension"]["range"]
+            ws = next(w for w in [self.sheet1, *self.sheets.values()] if w.id == r["sheetId"])
+            del ws.rows[r["startIndex"]:r["endIndex"]]
+        self.touch()
+
+
+class FakeCredentials:
+    valid = True
+
+
+class FakeHTTPClient:
+    def __init__(self):
+        self.auth = FakeCredentials()
+
+    def request(self, method, endpoint, *args, **kwargs):
+        return None
+
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.http_client = FakeHTTPClient()
+        spreadsheet.http = self.http_client
+        self.opened = 0
+
+    def open(self, name):
+        self.opened += 1
+        self.spreadsheet._call("client", "open")
+        return self.spreadsheet
+
+
+BOOK_HEADER = ["Titel", "Autor", "Genre", "Bewertung", "Cover", "ISBN", "BuchID"]
+
+
+def make_library(n_books, n_authors=None, latency=0.0, without_cover=2):
+    """
+    Tabelle mit n_books Büchern von n_authors Autoren ("Vorname<i> Nachname<i>").
+    Jedes without_cover-te Buch hat kein Cover (0: alle haben eins).
+    """
+    n_authors = n_authors or max(1, n_books // 5)
+    authors = [f"Vorname{i} Nachname{i}" for i in range(n_authors)]
+    books = [list(BOOK_HEADER)]
+    for i in range(n_books):
+        cover = "" if without_cover and i % without_cover == 0 else f"http://books.example/cover/{i}.jpg"
+        books.append([f"Buch {i}", authors[i % n_authors], "Roman", str(i % 5 + 1), cover, "", ""])
+    return FakeSpreadsheet(books, [["Name"]] + [[a] for a in authors], latency=latency)
+
+
+class StubServer:
+    """
+    Lokaler HTTP/1.1-Server mit Keep-Alive. handler(pfad, query, headers) liefert
+    (status, headers, body); body als dict/list (wird JSON) oder bytes.
+    Zählt angenommene TCP-Verbindungen und protokolliert jede Anfrage.
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.connections = 0
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                with stub.lock: stub.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                query = dict(urllib.parse.parse_qsl(url.query))
+                with stub.lock: stub.requests.append((time.monotonic(), url.path, query, dict(self.headers)))
+                status, headers, body = stub.handler(url.path, query, self.headers)
+                if isinstance(body, (dict, list)): body = json.dumps(body).encode()
+                self.send_response(status)
+                for k, v in (headers or {}).items(): self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body or b"")))
+                self.end_headers()
+                if body: self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.host = f"127.0.0.1:{self.server.server_port}"
+        self.url = f"http://{self.host}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def tiny_jpeg():
+    out = io.BytesIO()
+    Image.new("RGB", (4, 6), "teal").save(out, format="JPEG")
+    return out.getvalue()
+
+
+def google_books_handler(path, query, headers):
+    """
+    Google Books: /volumes?q=... liefert einen passenden Band, /volumes/<id> den Band selbst,
+    /covers/<id>.jpg ein kleines Bild.
+    """
+    if path.startswith("/covers/"): return 200, {"Content-Type": "image/jpeg"}, tiny_jpeg()
+    volume_id = path.rsplit("/", 1)[-1] if path.startswith("/volumes/") else f"V{zlib.crc32(query.get('q', '').encode())}"
+    item = {"id": volume_id, "volumeInfo": {
+        "title": query.get("q", volume_id), "authors": [], "categories": ["Fiction"],
+        "imageLinks": {"thumbnail": f"http://{headers.get('Host')}/covers/{volume_id}.jpg"},
+        "industryIdentifiers": [{"type": "ISBN_13", "identifier": "9780000000000"}]}}
+    return 200, {}, item if path.startswith("/volumes/") else {"items": [item]}
+
+
+def open_library_handler(path, query, headers):
+    """Open Library: /search.json ohne Treffer – Google Books entscheidet."""
+    return 200, {}, {"numFound": 0, "docs": []}
@@ -0,0 +1,30 @@
+def test_diff_ranges_merges_adjacent_cells(app):
+    old = [["Titel", "Autor", "Genre"], ["A", "B", "C"], ["D", "E", "F"]]
+    new = [["Titel", "Autor", "Genre"], ["A", "x", "y"], ["z", "E", "w"]]
+    assert app.diff_ranges(old, new) == [{"range": "B2:C2", "values": [["x", "y"]]},
+                                         {"range": "A3:A3", "values": [["z"]]},
+                                         {"range": "C3:C3", "values": [["w"]]}]
+
+
+def test_diff_ranges_compares_as_text_and_pads_rows(app):
+    old = [["Name", "Bewertung"], ["A", 5], ["B", "3"]]
+    new = [["Name", "Bewertung"], ["A", "5"], ["B"], ["Neu", "4"]]
+    # 5 und "5" sind gleich; fehlende Zellen werden geleert, neue Zeilen ganz geschrieben
+    assert app.diff_ranges(old, new) == [{"range": "B3:B3", "values": [[""]]},
+                                         {"range": "A4:B4", "values": [["Neu", "4"]]}]
+    assert app.diff_ranges(old, old) == []
+
+
+def test_sync_author_sheet_adds_and_deletes_only_the_difference(app, backend):
+    spreadsheet, _ = backend
+    _, ws_authors = app.get_sheets()
+    ws_authors.rows[:] = [["Name"], ["Anna Enquist"], ["Max Frisch "], ["Anna Enquist"], ["Veraltet"], ["Max Frisch"]]
+    spreadsheet.touch()
+    added, removed = app.sync_author_sheet(ws_authors, [" Max Frisch", "Anna Enquist", "Nora Krug", "", "Anna Enquist", "Juli Zeh"])
+    # Doppelte (auch mit Leerzeichen) und Überzählige weg, Neue in der gewünschten Reihenfolge hinten dran
+    assert (added, removed) == (2, 3)
+    assert [r[0] for r in ws_authors.rows] == ["Name", "Anna Enquist", "Max Frisch ", "Nora Krug", "Juli Zeh"]
+    assert list(app.load_sheet(ws_authors)["Name"]) == ["Anna Enquist", "Max Frisch ", "Nora Krug", "Juli Zeh"]
+    writes = [name for _, name, _ in spreadsheet.calls if name in ("append_rows", "spreadsheet_batch_update", "clear")]
+    assert writes == ["spreadsheet_batch_update", "append_rows"]
+    assert app.sync_author_sheet(ws_authors, ["Anna Enquist", "Max Frisch", "Nora Krug", "Juli Zeh"]) == (0, 0)
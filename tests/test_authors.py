@@ -0,0 +1,76 @@
+import random
+import string
+
+
+def baseline_smart_author_name(short_name, all_authors):
+    # Stand vor dem AuthorIndex: alle Namen nach Länge sortieren, erster Teilstring-Treffer
+    short_clean = short_name.strip().lower()
+    if not short_clean: return short_name
+    for full_name in sorted(all_authors, key=len, reverse=True):
+        if short_clean in str(full_name).lower(): return full_name
+    return short_name
+
+
+def random_authors(n, seed):
+    rnd = random.Random(seed)
+    first = ["Anna", "Karl", "Maria", "Jo", "Ernst", "Ulla", "Christine", "Petra", "Hans", "Lea"]
+    def word(): return rnd.choice(string.ascii_uppercase) + "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 9)))
+    return list(dict.fromkeys(f"{rnd.choice(first)} {word()}" for _ in range(n))), rnd
+
+
+def test_matches_old_function(app):
+    authors, rnd = random_authors(2000, seed=8)
+    index = app.AuthorIndex(authors)
+    queries = [a.split()[-1] for a in rnd.sample(authors, 200)]
+    queries += [a.split()[-1][:4].lower() for a in rnd.sample(authors, 100)]
+    queries += ["An", "anna", "zzqx", "a", "  ", "Jo "]
+    for q in queries:
+        assert app.get_smart_author_name(q, authors, index) == baseline_smart_author_name(q, authors), q
+
+
+def test_longest_match_wins_ties_in_list_order(app):
+    authors = ["Anna Enquist", "Enquist Anna", "Enquist", "Marta Enquistova"]
+    for order in (authors, authors[::-1]):
+        expected = baseline_smart_author_name("enquist", order)
+        assert app.get_smart_author_name("enquist", order) == expected
+        assert app.AuthorIndex(order).candidates("enquist") == sorted(
+            [a for a in order if "enquist" in a.lower()], key=len, reverse=True)
+
+
+def test_index_picks_up_added_authors(app):
+    index = app.AuthorIndex(["Brand"])
+    assert app.get_smart_author_name("brand", [], index) == "Brand"
+    index.add("Christine Brand")
+    assert app.get_smart_author_name("brand", [], index) == "Christine Brand"
+
+
+def test_lastname_policy_prefers_surname_hits(app):
+    index = app.AuthorIndex(["Enquistova Marta", "Anna Enquist", "Karl Enquistberg"])
+    assert index.candidates("enquist", policy="lastname") == ["Anna Enquist", "Karl Enquistberg", "Enquistova Marta"]
+
+
+def baseline_short_forms(keys):
+    # Stand vor find_short_form_targets: jeder gegen jeden, längste zuerst
+    unique_keys = sorted(keys, key=len, reverse=True)
+    replacements = {}
+    for i, long_key in enumerate(unique_keys):
+        for short_key in unique_keys[i + 1:]:
+            if short_key.lower() in long_key.lower() and short_key.lower() != long_key.lower():
+                replacements[short_key] = long_key
+    return replacements
+
+
+def test_short_forms_find_the_same_names_as_before(app):
+    full, rnd = random_authors(600, seed=9)
+    keys = full + [name.split()[-1] for name in rnd.sample(full, 80)]
+    rnd.shuffle(keys)
+    new, old = app.find_short_form_targets(keys), baseline_short_forms(keys)
+    assert set(new) == set(old)
+    # Ziel ist immer eine kürzeste Langform – wie vorher, nur der Gleichstand ist jetzt festgelegt
+    assert all(len(new[k]) == len(old[k]) for k in old)
+
+
+def test_short_form_tie_break_is_alphabetical_and_order_independent(app):
+    names = ["Enquist", "Rita Enquist", "Anna Enquist", "Marianne Enquist"]
+    for order in (names, names[::-1], names[1:] + names[:1]):
+        assert app.find_short_form_targets(order) == {"Enquist": "Anna Enquist"}
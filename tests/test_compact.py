@@ -0,0 +1,60 @@
+import pandas as pd
+
+import fakes
+
+
+def library(app, n):
+    spreadsheet = fakes.make_library(n)
+    values = spreadsheet.sheet1.rows
+    return app.compact_frame(app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2))
+
+
+def kinds(df):
+    return {column: str(dtype) for column, dtype in df.dtypes.items()} # "category", "Int8", "str", ...
+
+
+def new_rows(app, first_row, rows):
+    return app.rows_to_frame(rows, app.resolve_schema(fakes.BOOK_HEADER), first_row)
+
+
+def test_append_keeps_compact_types_and_old_codes(app):
+    df = library(app, 200)
+    rows = new_rows(app, 202, [["Neu 1", "Vorname1 Nachname1", "Krimi", "4", "", "", ""],
+                               ["Neu 2", "Ganz Neue Autorin", "Roman", "", "", "", ""]])
+    grown = app.append_compact(df, rows)
+    assert kinds(grown) == kinds(df)
+    assert list(grown["Autor"].cat.categories[:len(df["Autor"].cat.categories)]) == list(df["Autor"].cat.categories)
+    assert (grown["Autor"].cat.codes[:len(df)].to_numpy() == df["Autor"].cat.codes.to_numpy()).all()
+    expected = pd.concat([app.plain_frame(df), app.plain_frame(rows)], ignore_index=True)
+    assert app.plain_frame(grown).equals(expected)
+
+
+def test_append_with_free_text_rating_falls_back_to_text(app):
+    df = library(app, 50)
+    grown = app.append_compact(df, new_rows(app, 52, [["Neu", "X", "", "super", "", "", ""]]))
+    assert list(app.plain_frame(grown)["Bewertung"].tail(2)) == [df["Bewertung"].astype(str).iloc[-1], "super"]
+
+
+def test_cell_patch_recompacts_only_touched_columns(app, monkeypatch):
+    df = library(app, 200)
+    patched = app.assign_cells(df, [(0, "Genre", "Krimi")])
+    compacted = []
+    compact_column = app._compact_column
+    monkeypatch.setattr(app, "_compact_column", lambda column, col: compacted.append(column) or compact_column(column, col))
+    out = app.compact_frame(patched, {"Genre"})
+    assert compacted == ["Genre"]
+    assert out.at[0, "Genre"] == "Krimi"
+    assert kinds(out) == kinds(df)
+
+
+def test_queued_changes_keep_the_shared_frame_compact(app, backend):
+    ws_books, _ = app.get_sheets()
+    before = app.load_sheet(ws_books)
+    dtypes = kinds(before)
+    app.queue_cells(ws_books, {(2, "Genre"): "Krimi"})
+    app.queue_append(ws_books, [["Neu", "Vorname1 Nachname1", "", "5", "", "", ""]])
+    app.queue_delete(ws_books, {3: ("Buch 1", "Vorname1 Nachname1")})
+    after = app.load_sheet(ws_books)
+    assert kinds(after) == dtypes
+    assert len(after) == len(before)
+    assert list(after["Titel"].tail(1)) == ["Neu"] and after.at[0, "Genre"] == "Krimi"
@@ -0,0 +1,17 @@
+def test_reruns_share_one_connection(app_test, backend):
+    spreadsheet, authorized = backend
+    for _ in range(5):
+        app_test.run()
+        assert not app_test.exception
+    assert len(authorized) == 1
+    assert spreadsheet.count("open") == 1
+
+
+def test_reset_connection_rebuilds_once(app, backend):
+    spreadsheet, authorized = backend
+    assert app.get_sheets() == app.get_sheets()
+    assert len(authorized) == 1
+    app.reset_connection()
+    app.get_sheets()
+    assert len(authorized) == 2
+    assert spreadsheet.count("open") == 2
@@ -0,0 +1,114 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import fakes
+
+
+def flaky(*answers):
+    """Handler, der erst die vorgegebenen (status, headers) liefert, danach 200."""
+    pending = list(answers)
+
+    def handler(path, query, headers):
+        status, extra = pending.pop(0) if pending else (200, {})
+        return status, extra, {"status": status}
+    return handler
+
+
+def test_rate_limiter_spaces_requests_per_host(app, stub_apis, monkeypatch):
+    google, _ = stub_apis
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, google.host, 0.1)
+    with ThreadPoolExecutor(3) as pool:
+        list(pool.map(lambda i: app.http_get(google.url + "/volumes", params={"q": str(i)}), range(6)))
+    times = sorted(t for t, *_ in google.requests)
+    assert len(times) == 6
+    # Gemessen wird die Ankunft beim Server – etwas Luft für Thread-Wechsel unter Last
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.07
+
+
+def test_rate_limiter_does_not_block_other_hosts(app, stub_apis, monkeypatch):
+    google, open_library = stub_apis
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, google.host, 0.5)
+    app.http_get(google.url + "/volumes", params={"q": "a"})
+    waiting = threading.Thread(target=app.http_get, args=(google.url + "/volumes",), kwargs={"params": {"q": "b"}})
+    waiting.start()
+    start = time.monotonic()
+    assert app.http_get(open_library.url + "/search.json").status_code == 200
+    assert time.monotonic() - start < 0.3
+    waiting.join()
+    assert len(google.requests) == 2
+
+
+def test_retry_after_is_honoured(app, monkeypatch):
+    stub = fakes.StubServer(flaky((429, {"Retry-After": "1"})))
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, stub.host, 0)
+    try:
+        response = app.http_get(stub.url + "/volumes")
+    finally:
+        stub.close()
+    assert response.status_code == 200
+    (first, *_), (second, *_) = stub.requests
+    assert second - first >= 0.95
+
+
+def test_server_errors_are_retried_with_backoff(app, monkeypatch):
+    stub = fakes.StubServer(flaky((503, {}), (502, {})))
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, stub.host, 0)
+    monkeypatch.setattr(app, "HTTP_BACKOFF", 0.01)
+    try:
+        response = app.http_get(stub.url + "/volumes")
+    finally:
+        stub.close()
+    assert response.status_code == 200
+    assert len(stub.requests) == 3
+
+
+def test_gives_up_after_last_retry(app, monkeypatch):
+    stub = fakes.StubServer(flaky(*[(503, {})] * 10))
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, stub.host, 0)
+    monkeypatch.setattr(app, "HTTP_BACKOFF", 0.01)
+    try:
+        response = app.http_get(stub.url + "/volumes")
+    finally:
+        stub.close()
+    assert response.status_code == 503
+    assert len(stub.requests) == app.HTTP_RETRIES
+
+
+def test_client_errors_are_not_retried(app, monkeypatch):
+    stub = fakes.StubServer(flaky((404, {})))
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, stub.host, 0)
+    try:
+        assert app.http_get(stub.url + "/volumes").status_code == 404
+    finally:
+        stub.close()
+    assert len(stub.requests) == 1
+
+
+def test_enrich_books_reports_progress_in_calling_thread(app, stub_apis):
+    google, open_library = stub_apis
+    books = [(i, f"Buch {i}", f"Autor {i}") for i in range(12)]
+    caller = threading.get_ident()
+    seen = []
+    results = app.enrich_books(books, lambda done, total, key, result: seen.append((done, total, key, result, threading.get_ident())))
+    assert [done for done, *_ in seen] == list(range(1, 13))
+    assert {total for _, total, *_ in seen} == {12}
+    assert {thread for *_, thread in seen} == {caller}
+    assert sorted(key for _, _, key, *_ in seen) == list(range(12))
+    assert all(results[key] == result for _, _, key, result, _ in seen)
+    assert all(cover.startswith(google.url + "/covers/") for cover, *_ in results.values())
+    assert len([r for r in open_library.requests if r[1] == "/search.json"]) == 12
+
+
+def test_enrich_books_reports_failed_lookups(app, stub_apis, monkeypatch):
+    enrich_one = app._enrich_one
+
+    def broken(titel, autor, *args, **kwargs):
+        if titel == "Buch 3": raise RuntimeError("kaputt")
+        return enrich_one(titel, autor, *args, **kwargs)
+    monkeypatch.setattr(app, "_enrich_one", broken)
+    seen = []
+    results = app.enrich_books([(i, f"Buch {i}", f"Autor {i}") for i in range(6)], lambda *a: seen.append(a))
+    assert len(seen) == 6
+    assert results[3] == ("", app.GENRE_FALLBACK, "", "")
+    assert all(results[i][0] for i in range(6) if i != 3)
@@ -0,0 +1,72 @@
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import fakes
+
+
+def etag_handler(hits):
+    def handler(path, query, headers):
+        etag = f'"{query.get("q", "")}-v1"'
+        if headers.get("If-None-Match") == etag:
+            hits["304"] += 1
+            return 304, {"ETag": etag}, b""
+        hits["200"] += 1
+        body = gzip.compress(json.dumps({"items": [{"q": query.get("q", "")}] * 20}).encode())
+        return 200, {"ETag": etag, "Content-Encoding": "gzip", "Content-Type": "application/json"}, body
+    return handler
+
+
+def stub(app, monkeypatch, handler):
+    server = fakes.StubServer(handler)
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, server.host, 0)
+    return server
+
+
+def test_repeated_requests_share_one_connection(app, monkeypatch):
+    server = stub(app, monkeypatch, fakes.open_library_handler)
+    try:
+        for i in range(10): assert app.http_get(server.url + "/search.json", params={"q": f"t{i}"}).status_code == 200
+    finally:
+        server.close()
+    assert len(server.requests) == 10
+    assert server.connections == 1
+
+
+def test_parallel_requests_stay_within_the_pool(app, monkeypatch):
+    server = stub(app, monkeypatch, fakes.open_library_handler)
+    try:
+        with ThreadPoolExecutor(app.ENRICH_WORKERS) as pool:
+            list(pool.map(lambda i: app.http_get(server.url + "/search.json", params={"q": str(i)}), range(40)))
+    finally:
+        server.close()
+    assert len(server.requests) == 40
+    assert server.connections <= app.HTTP_POOL_SIZE
+
+
+def test_unchanged_answers_are_revalidated_with_304(app, monkeypatch):
+    hits = {"200": 0, "304": 0}
+    server = stub(app, monkeypatch, etag_handler(hits))
+    try:
+        first = [app.http_get(server.url + "/volumes", params={"q": f"t{i}"}).json() for i in range(3)]
+        again = [app.http_get(server.url + "/volumes", params={"q": f"t{i}"}) for i in range(3)]
+    finally:
+        server.close()
+    assert hits == {"200": 3, "304": 3}
+    assert [r.status_code for r in again] == [200, 200, 200]
+    assert [r.json() for r in again] == first
+    assert all("gzip" in h.get("Accept-Encoding", "") for *_, h in server.requests)
+    assert [h.get("If-None-Match") for *_, h in server.requests[3:]] == ['"t0-v1"', '"t1-v1"', '"t2-v1"']
+    assert app.get_http_client().not_modified[server.host] == 3
+    assert server.connections == 1
+
+
+def test_images_are_not_kept_for_revalidation(app, monkeypatch):
+    server = stub(app, monkeypatch, lambda path, query, headers: (200, {"ETag": '"cover-v1"', "Content-Type": "image/jpeg"},
+                                                                  fakes.tiny_jpeg()))
+    try:
+        for _ in range(2): assert app.http_get(server.url + "/covers/1.jpg").status_code == 200
+    finally:
+        server.close()
+    assert [h.get("If-None-Match") for *_, h in server.requests] == [None, None]
+    assert not any(key.startswith(server.url) for key in app.get_http_client().validated)
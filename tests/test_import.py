@@ -0,0 +1,44 @@
+import types
+
+
+def test_parse_lines_skips_blank_and_malformed(app):
+    text = "Der Trafikant, Seethaler\n\n   \nOhne Komma\n, Nur Autor\nNur Titel,  \n Krieg und Frieden , Leo Tolstoi, Band 1\n"
+    entries, skipped = app.parse_import_lines(text)
+    assert entries == [("Der Trafikant", "Seethaler", None), ("Krieg und Frieden", "Leo Tolstoi, Band 1", None)]
+    assert skipped == ["Ohne Komma", ", Nur Autor", "Nur Titel,"]
+
+
+def test_parse_csv_reads_header_in_any_order(app):
+    raw = "﻿Autor;Titel;Sterne\nJuli Zeh;Unterleuten;4\n\nNora Krug;Heimat;7\n;Ohne Autor;3\nAnna Enquist;Kontrapunkt;\n".encode("utf-8")
+    entries, skipped = app.parse_import_csv(raw)
+    # Bewertung nur 1–5, sonst Vorgabe beim Import
+    assert entries == [("Unterleuten", "Juli Zeh", 4), ("Heimat", "Nora Krug", None), ("Kontrapunkt", "Anna Enquist", None)]
+    assert skipped == [", Ohne Autor, 3"]
+
+
+def test_parse_csv_without_header_uses_first_two_columns(app):
+    entries, skipped = app.parse_import_csv(b"Unterleuten,Juli Zeh,5\nHeimat,Nora Krug\nKaputt\n")
+    assert entries == [("Unterleuten", "Juli Zeh", None), ("Heimat", "Nora Krug", None)]
+    assert skipped == ["Kaputt"]
+    assert app.parse_import_csv(b"\n \n") == ([], [])
+
+
+def test_bulk_import_appends_new_books_once(app, backend, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(app, "get_enrichment_worker", lambda: types.SimpleNamespace(submit=lambda *a, **k: submitted.append(a)))
+    monkeypatch.setattr(app, "get_sync_engine", lambda: types.SimpleNamespace(wake=lambda: None))
+    ws_books, ws_authors = app.get_sheets()
+    before = len(ws_books.rows)
+    entries = [("Buch 0", "Vorname0 Nachname0", None), # steht schon im Regal
+               ("Neues Buch", "Nachname1", 3), # Kurzform wird vervollständigt
+               ("neues buch ", "Vorname1 Nachname1", None), # Dublette innerhalb des Imports
+               ("Zweites Buch", "Ganz Neue Autorin", None)]
+    assert app.bulk_import(ws_books, ws_authors, entries, default_rating=4) == (2, 2, 1)
+
+    appended = [[op, payload["rows"]] for _, op, payload in app.get_replica().pending(app._replica_key(ws_books))]
+    assert appended == [["append", [["Neues Buch", "Vorname1 Nachname1", "", 3, ""],
+                                    ["Zweites Buch", "Ganz Neue Autorin", "", 4, ""]]]]
+    assert submitted == [("Neues Buch", "Vorname1 Nachname1", before + 1), ("Zweites Buch", "Ganz Neue Autorin", before + 2)]
+    app.flush_outbox(ws_books)
+    assert [r[:4] for r in ws_books.rows[before:]] == [["Neues Buch", "Vorname1 Nachname1", "", "3"],
+                                                       ["Zweites Buch", "Ganz Neue Autorin", "", "4"]]
@@ -0,0 +1,79 @@
+import random
+import string
+
+import pandas as pd
+
+import fakes
+
+
+def baseline_view(df, search):
+    # Stand vor dem LibraryIndex: je Rerun Nachname berechnen, sortieren, dann filtern
+    def get_lastname(full_name):
+        if not isinstance(full_name, str) or not full_name.strip(): return ""
+        return full_name.strip().split(" ")[-1].lower()
+    view = df.copy()
+    view["_Nachname"] = view["Autor"].apply(get_lastname)
+    view = view.sort_values(by="_Nachname", kind="stable")
+    if search:
+        view = view[view["Titel"].astype(str).str.contains(search, case=False) | view["Autor"].astype(str).str.contains(search, case=False)]
+    return view
+
+
+def library(app, n, seed):
+    rnd = random.Random(seed)
+    def word(k): return "".join(rnd.choices(string.ascii_lowercase, k=k)).capitalize()
+    authors = [f"{word(5)} {word(7)}" for _ in range(n // 4)] + ["", "Madonna", "Anna  Enquist "]
+    rows = [[f"{word(6)} {word(5)}", rnd.choice(authors)] for _ in range(n)]
+    values = [fakes.BOOK_HEADER] + rows
+    return app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2)
+
+
+def test_search_matches_old_sort_and_filter(app):
+    df = library(app, 3000, seed=12)
+    queries = ["", "  ", "a", "ab", "ENQ", "enquist", "madonna", df["Titel"][100].split()[1][:4], "zzzzq"]
+    for frame in (df, app.compact_frame(df)): # so teilen sich die Sitzungen den Frame
+        index = app.LibraryIndex(frame)
+        for q in queries:
+            expected = list(baseline_view(df, q.strip())["_Zeile"])
+            assert list(frame["_Zeile"].iloc[index.search(q)]) == expected, q
+
+
+def test_search_sees_appended_rows(app):
+    df = library(app, 50, seed=1)
+    index = app.LibraryIndex(df)
+    extra = pd.DataFrame({**{c: [""] for c in df.columns}, "Titel": ["Die Mittagsfrau"], "Autor": ["Julia Franck"],
+                          "_Zeile": [df["_Zeile"].max() + 1]})
+    grown = pd.concat([df, extra], ignore_index=True)
+    index.apply_append(extra, grown)
+    assert list(grown["Titel"].iloc[index.search("mittags")]) == ["Die Mittagsfrau"]
+
+
+def test_index_survives_syncs_that_only_change_cells(app, backend):
+    spreadsheet, _ = backend
+    ws_books, _ = app.get_sheets()
+    def index(): return app.sheet_derived(ws_books, "library_index", app.LibraryIndex)
+    built = index()
+
+    app.queue_cells(ws_books, {(2, "Genre"): "Krimi", (3, "Cover"): "http://books.example/neu.jpg"})
+    assert app.flush_outbox(ws_books) == 1
+    assert index() is built
+    assert built.df is app.load_sheet(ws_books)
+    assert list(built.df["Genre"][:2]) == ["Krimi", "Roman"]
+    assert "Buch 1" in set(built.df.iloc[built.search("Buch 1")]["Titel"])
+
+    # Fremde Zelländerung: neu geladen, aber nur geflickt
+    ws_books.rows[4][2] = "Lyrik"
+    spreadsheet.touch()
+    assert app.load_sheet(ws_books, force=True)["Genre"].iat[3] == "Lyrik"
+    assert index() is built
+
+    # Zeilen weg oder Titel geändert: neu bauen
+    app.queue_delete(ws_books, {2: ("Buch 0", "Vorname0 Nachname0")})
+    app.flush_outbox(ws_books)
+    rebuilt = index()
+    assert rebuilt is not built
+    assert "Buch 0" not in set(rebuilt.df["Titel"])
+    app.queue_cells(ws_books, {(2, "Titel"): "Umbenannt"})
+    app.flush_outbox(ws_books)
+    assert index() is not rebuilt
+    assert list(index().df.iloc[index().search("umbenannt")]["Titel"]) == ["Umbenannt"]
@@ -0,0 +1,158 @@
+import threading
+import time
+import types
+
+import fakes
+
+
+def nothing_found(path, query, headers):
+    return 200, {}, {"totalItems": 0}
+
+
+def test_negative_result_is_cached_until_refresh(app, stub_apis):
+    google, _ = stub_apis
+    google.handler = nothing_found
+    assert app.fetch_book_data_background("Unbekannt", "Niemand")[0] == ""
+    assert app.fetch_book_data_background("Unbekannt", "Niemand")[0] == ""
+    assert len(google.requests) == 1
+    assert app.fetch_book_data_background("Unbekannt", "Niemand", refresh=True)[0] == ""
+    assert len(google.requests) == 2
+
+
+def test_refresh_finds_cover_after_negative_result(app, stub_apis):
+    google, _ = stub_apis
+    google.handler = nothing_found
+    app.enrich_books([(1, "Später", "Autorin")])
+    google.handler = fakes.google_books_handler
+    assert app.enrich_books([(1, "Später", "Autorin")])[1][0] == ""
+    assert app.enrich_books([(1, "Später", "Autorin")], refresh=True)[1][0].startswith(google.url)
+
+
+class GatedTranslator:
+    """Übersetzt erst, wenn der Test es erlaubt – so bleibt die Übersetzung eine Weile offen."""
+    release = None
+
+    def __init__(self, source, target):
+        pass
+
+    def translate(self, text):
+        assert GatedTranslator.release.wait(10)
+        return "Kriminalroman"
+
+
+def with_category(category):
+    def handler(path, query, headers):
+        status, extra, body = fakes.google_books_handler(path, query, headers)
+        if isinstance(body, dict) and body.get("items"): body["items"][0]["volumeInfo"]["categories"] = [category]
+        return status, extra, body
+    return handler
+
+
+def gated_translation(app, monkeypatch):
+    GatedTranslator.release = threading.Event()
+    monkeypatch.setattr(app, "deep_translator", types.SimpleNamespace(GoogleTranslator=GatedTranslator))
+    return GatedTranslator.release
+
+
+def translations_done(app):
+    app.get_translation_queue()["pool"].submit(lambda: None).result(timeout=10)
+
+
+def wait_for_jobs(app):
+    queue = app.get_enrichment_worker().queue
+    deadline = time.monotonic() + 10
+    while queue.counts().get("pending", 0) + queue.counts().get("running", 0):
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def test_provisional_genre_is_not_cached(app, stub_apis, monkeypatch):
+    google, _ = stub_apis
+    google.handler = with_category("Xyzzy Plugh")
+    release = gated_translation(app, monkeypatch)
+    assert app.fetch_book_data_background("Buch", "Autorin")[1] == app.GENRE_FALLBACK
+    release.set()
+    translations_done(app)
+    assert app.fetch_book_data_background("Buch", "Autorin")[1] == "Krimi"
+    assert len(google.requests) == 1
+
+
+def test_worker_fills_in_genre_after_translation(app, backend, stub_apis, monkeypatch):
+    spreadsheet, _ = backend
+    google, _ = stub_apis
+    google.handler = with_category("Xyzzy Plugh")
+    release = gated_translation(app, monkeypatch)
+    spreadsheet.sheet1.rows[1][2] = ""
+    ws_books, _ = app.get_sheets()
+    def genre(): return app.load_sheet(ws_books).set_index("_Zeile").at[2, "Genre"]
+
+    app.get_enrichment_worker().submit("Buch 0", "Vorname0 Nachname0", 2, with_genre=True)
+    wait_for_jobs(app)
+    assert genre() == app.GENRE_FALLBACK
+    release.set()
+    translations_done(app)
+    wait_for_jobs(app)
+    assert genre() == "Krimi"
+    assert len([r for r in google.requests if r[1] == "/volumes"]) == 1
+
+
+def test_failed_translation_does_not_loop(app, backend, stub_apis, monkeypatch):
+    google, _ = stub_apis
+    google.handler = with_category("Xyzzy Plugh")
+    release = gated_translation(app, monkeypatch)
+    monkeypatch.setattr(GatedTranslator, "translate", lambda self, text: release.wait(10) and 1 / 0)
+    ws_books, _ = app.get_sheets()
+    app.get_enrichment_worker().submit("Buch 0", "Vorname0 Nachname0", 2, with_genre=True)
+    wait_for_jobs(app)
+    release.set()
+    translations_done(app)
+    wait_for_jobs(app)
+    translations_done(app)
+    assert not app.get_translation_queue()["pending"]
+    assert app.get_enrichment_worker().queue.counts().get("done") == 2
+
+
+def volume(volume_id, title, authors, cover=True):
+    return {"id": volume_id, "volumeInfo": {"title": title, "authors": authors, "categories": ["Fiction"],
+                                            "imageLinks": {"thumbnail": f"http://covers.example/{volume_id}.jpg"} if cover else {}}}
+
+
+def test_wrong_first_hit_loses_to_better_candidate(app, stub_apis):
+    google, _ = stub_apis
+    google.handler = lambda path, query, headers: (200, {}, {"items": [
+        volume("falsch", "Heimat", ["Siegfried Lenz"]), volume("richtig", "Heimat: Ein deutsches Familienalbum", ["Nora Krug"])]})
+    result = app.lookup_book("Heimat", "Nora Krug")
+    assert result["id"] == "gb:richtig"
+    assert result["cover"] == "http://covers.example/richtig.jpg"
+    assert app.score_candidate(app._google_candidate(volume("x", "Heimat", ["Siegfried Lenz"])), "Heimat", "Nora Krug") \
+        < app.score_candidate(app._google_candidate(volume("y", "Heimat: Roman", ["Krug"])), "Heimat", "Nora Krug")
+
+
+def test_nothing_above_min_score_saves_nothing(app, stub_apis):
+    google, _ = stub_apis
+    google.handler = lambda path, query, headers: (200, {}, {"items": [volume("anders", "Kochen für Anfänger", ["Tim Mälzer"])]})
+    assert app.lookup_book("Heimat", "Nora Krug") == app.pick_metadata([])
+
+
+def test_providers_are_asked_concurrently(app, stub_apis):
+    google, open_library = stub_apis
+    both_waiting = threading.Barrier(2, timeout=5) # bricht, wenn die zweite Anfrage erst nach der ersten kommt
+
+    def waiting(handler):
+        def wrapped(path, query, headers):
+            both_waiting.wait()
+            return handler(path, query, headers)
+        return wrapped
+    google.handler, open_library.handler = waiting(fakes.google_books_handler), waiting(fakes.open_library_handler)
+    assert app.lookup_book("Buch", "Autorin") is not None
+    assert not both_waiting.broken
+    assert len(google.requests) == len(open_library.requests) == 1
+
+
+def test_lookup_by_id_is_one_request(app, stub_apis):
+    google, open_library = stub_apis
+    result = app.lookup_by_id("gb:ABC123")
+    assert result["id"] == "gb:ABC123" and result["isbn"] == "9780000000000"
+    assert [r[1] for r in google.requests] == ["/volumes/ABC123"]
+    assert app.lookup_by_id("ol:/works/OL1W", isbn="9781234567897")["isbn"] == "9781234567897"
+    assert [r[1] for r in open_library.requests] == ["/works/OL1W.json"]
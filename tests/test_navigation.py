@@ -0,0 +1,18 @@
+def test_tabs_and_search_make_no_sheets_calls(app_test, backend):
+    spreadsheet, _ = backend
+    # Alle Bücher mit Cover: keine Hintergrund-Suche, die nebenher ins Blatt schreibt
+    for row in spreadsheet.sheet1.rows[1:]: row[4] = row[4] or "http://books.example/cover.jpg"
+    app_test.run()
+    assert not app_test.exception
+    calls = spreadsheet.count()
+    assert calls
+
+    for tab in ["🔍 Liste", "👥 Autoren", "✍️ Neu", "🔍 Liste"]:
+        app_test.radio[0].set_value(tab).run()
+        assert not app_test.exception
+        assert spreadsheet.count() == calls, tab
+    app_test.text_input(key="search_box_fixed").set_value("Buch 1").run()
+    assert not app_test.exception
+    assert spreadsheet.count() == calls
+    titles = app_test.dataframe[0].value["Titel"].tolist()
+    assert titles and all(t.startswith("Buch 1") for t in titles)
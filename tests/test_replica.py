@@ -0,0 +1,98 @@
+import gspread
+
+import fakes
+
+
+def frame(app, rows):
+    values = [fakes.BOOK_HEADER] + rows
+    return app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2)
+
+
+def books(df):
+    return list(zip(df["Titel"], df["Autor"]))
+
+
+def test_delete_replay_follows_title_and_author(app):
+    df = frame(app, [["Heimat", "Nora Krug"], ["Heimat", "Siegfried Lenz"]])
+    col_map = app.resolve_schema(fakes.BOOK_HEADER)
+    op = {"targets": [{"zeile": 3, "titel": "Heimat", "autor": "Siegfried Lenz"}]}
+    assert books(app.apply_op(df, col_map, "delete", op)) == [("Heimat", "Nora Krug")]
+    # Jemand hat oben eine Zeile eingefügt: Zeile 3 ist jetzt das andere "Heimat"
+    shifted = frame(app, [["Neu", "X"], ["Heimat", "Nora Krug"], ["Heimat", "Siegfried Lenz"]])
+    assert books(app.apply_op(shifted, col_map, "delete", op)) == [("Neu", "X"), ("Heimat", "Nora Krug")]
+
+
+def test_ops_for_vanished_books_are_dropped(app):
+    df = frame(app, [["Heimat", "Nora Krug"], ["Anderes", "Y"]])
+    col_map = app.resolve_schema(fakes.BOOK_HEADER)
+    delete = {"targets": [{"zeile": 3, "titel": "Heimat", "autor": "Siegfried Lenz"}]}
+    assert books(app.apply_op(df, col_map, "delete", delete)) == books(df)
+    cells = {"cells": [{"zeile": 3, "titel": "Heimat", "autor": "Siegfried Lenz", "column": "Genre", "value": "Krimi"}]}
+    assert list(app.apply_op(df, col_map, "cells", cells)["Genre"]) == list(df["Genre"])
+
+
+def test_old_outbox_entries_only_hit_their_exact_row(app):
+    df = frame(app, [["Heimat", "Nora Krug"], ["Heimat", "Siegfried Lenz"]])
+    col_map = app.resolve_schema(fakes.BOOK_HEADER)
+    assert books(app.apply_op(df, col_map, "delete", {"targets": [{"zeile": 3, "titel": "Heimat"}]})) == [("Heimat", "Nora Krug")]
+    assert books(app.apply_op(df, col_map, "delete", {"targets": [{"zeile": 9, "titel": "Heimat"}]})) == books(df)
+
+
+def test_flush_writes_raw_values(app, backend):
+    spreadsheet, _ = backend
+    ws_books, _ = app.get_sheets()
+    app.queue_cells(ws_books, {(2, "Genre"): "=Krimi"})
+    app.queue_append(ws_books, [["1984", "George Orwell", "", "5", "", "", ""]])
+    assert app.flush_outbox(ws_books) == 2
+    writes = [details for _, name, details in spreadsheet.calls if name in ("batch_update", "append_rows")]
+    assert len(writes) == 2
+    assert {w["value_input_option"] for w in writes} == {gspread.utils.ValueInputOption.raw}
+    assert ws_books.rows[1][2] == "=Krimi"
+    assert ws_books.rows[-1][:2] == ["1984", "George Orwell"]
+
+
+def test_flush_deletes_the_marked_book_after_foreign_insert(app, backend):
+    spreadsheet, _ = backend
+    ws_books, _ = app.get_sheets()
+    ws_books.rows.insert(1, ["Buch 0", "Jemand Anders", "Roman", "3", "", "", ""])
+    app.queue_delete(ws_books, {3: ("Buch 0", "Vorname0 Nachname0")})
+    # Fremde Einfügung ganz oben: in Zeile 3 steht jetzt das gleichnamige Buch von jemand anderem
+    ws_books.rows.insert(1, ["Fremd eingefügt", "Z", "", "", "", "", ""])
+    spreadsheet.touch()
+    app.flush_outbox(ws_books)
+    assert [r[:2] for r in ws_books.rows[1:4]] == [["Fremd eingefügt", "Z"], ["Buch 0", "Jemand Anders"], ["Buch 1", "Vorname1 Nachname1"]]
+
+
+def test_flush_rebases_even_when_the_cached_revision_looks_current(app, backend):
+    spreadsheet, _ = backend
+    ws_books, _ = app.get_sheets()
+    app.queue_cells(ws_books, {(4, "Genre"): "Krimi"}) # Buch 2
+    app.queue_delete(ws_books, {3: ("Buch 1", "Vorname1 Nachname1")})
+    # Fremde Einfügung zwischen Vormerken und Sync; der Cache hält trotzdem die neue Revision
+    ws_books.rows.insert(1, ["Fremd eingefügt", "Z", "", "", "", "", ""])
+    spreadsheet.touch()
+    app.get_sheet_cache()["entries"][app._cache_key(ws_books)]["revision"] = str(spreadsheet.revision)
+    assert app.flush_outbox(ws_books) == 2
+    assert [r[0] for r in ws_books.rows[1:4]] == ["Fremd eingefügt", "Buch 0", "Buch 2"]
+    assert ws_books.rows[3][2] == "Krimi"
+    assert list(app.load_sheet(ws_books)["Titel"][:3]) == ["Fremd eingefügt", "Buch 0", "Buch 2"]
+
+
+def test_flush_starts_over_when_the_sheet_changes_meanwhile(app, backend, monkeypatch):
+    spreadsheet, _ = backend
+    ws_books, _ = app.get_sheets()
+    app.queue_delete(ws_books, {3: ("Buch 1", "Vorname1 Nachname1")})
+    read = app.read_sheet_frame
+    reads = []
+
+    def read_then_insert(worksheet):
+        result = read(worksheet)
+        if not reads: # Fremde Einfügung direkt nach dem ersten Holen
+            ws_books.rows.insert(1, ["Fremd eingefügt", "Z", "", "", "", "", ""])
+            spreadsheet.touch()
+        reads.append(worksheet)
+        return result
+    monkeypatch.setattr(app, "read_sheet_frame", read_then_insert)
+    assert app.flush_outbox(ws_books) == 1
+    assert len(reads) == 2
+    assert [r[0] for r in ws_books.rows[1:4]] == ["Fremd eingefügt", "Buch 0", "Buch 2"]
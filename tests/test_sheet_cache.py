@@ -0,0 +1,88 @@
+
+def test_foreign_edit_before_own_write_is_not_hidden(app, backend):
+    spreadsheet, _ = backend
+    ws_books, ws_authors = app.get_sheets()
+    app.load_sheet(ws_books)
+    names = list(app.load_sheet(ws_authors)["Name"])
+    # Fremde Einfügung über den Büchern, danach schreiben wir ins Autoren-Blatt
+    ws_books.rows.insert(1, ["Fremd eingefügt", "Z", "", "", "", "", ""])
+    spreadsheet.touch()
+    assert app.sync_author_sheet(ws_authors, names + ["Neue Autorin"]) == (1, 0)
+
+    df = app.load_sheet(ws_books, force=True)
+    assert df["Titel"].iloc[0] == "Fremd eingefügt"
+    zeile = int(df.loc[df["Titel"] == "Buch 1", "_Zeile"].iloc[0])
+    assert zeile == 4
+    app.queue_delete(ws_books, {zeile: ("Buch 1", "Vorname1 Nachname1")})
+    app.flush_outbox(ws_books)
+    titles = [r[0] for r in ws_books.rows[1:]]
+    assert "Buch 1" not in titles and "Buch 0" in titles and "Fremd eingefügt" in titles
+
+
+def test_own_write_after_foreign_edit_drops_the_entry(app, backend):
+    spreadsheet, _ = backend
+    _, ws_authors = app.get_sheets()
+    app.load_sheet(ws_authors)
+    ws_authors.rows.append(["Fremder Autor"])
+    spreadsheet.touch()
+    # Wie "Hinzufügen" im Tab Autoren: direkt schreiben, dann den Cache nachziehen
+    before = app.sheet_revision(ws_authors)
+    response = ws_authors.append_row(["Neue Autorin"])
+    app.patch_cached_append(ws_authors, [["Neue Autorin"]], response, before)
+    assert list(app.load_sheet(ws_authors, force=True)["Name"])[-2:] == ["Fremder Autor", "Neue Autorin"]
+
+
+def test_author_sync_reloads_when_rows_shift_before_deleting(app, backend, monkeypatch):
+    spreadsheet, _ = backend
+    _, ws_authors = app.get_sheets()
+    names = [r[0] for r in ws_authors.rows[1:]]
+    load = app.load_sheet
+    loads = []
+
+    def load_then_insert(worksheet, **kwargs):
+        df = load(worksheet, **kwargs)
+        if not loads: # Fremde Einfügung ganz oben, nachdem wir die Zeilennummern haben
+            ws_authors.rows.insert(1, ["Fremder Autor"])
+            spreadsheet.touch()
+        loads.append(worksheet)
+        return df
+    monkeypatch.setattr(app, "load_sheet", load_then_insert)
+    assert app.sync_author_sheet(ws_authors, ["Fremder Autor"] + names[1:]) == (0, 1)
+    assert len(loads) == 2
+    assert [r[0] for r in ws_authors.rows[1:]] == ["Fremder Autor"] + names[1:]
+
+
+def test_unchanged_revision_skips_the_download(app, backend, monkeypatch):
+    spreadsheet, _ = backend
+    ws_books, _ = app.get_sheets()
+    first = app.load_sheet(ws_books)
+    assert spreadsheet.count("get_all_values") == 1
+    # Innerhalb der TTL gar keine Nachfrage, danach bzw. mit force nur die Revision
+    assert app.load_sheet(ws_books) is first
+    assert spreadsheet.count("get_lastUpdateTime") == 1
+    monkeypatch.setattr(app, "SHEET_CACHE_TTL", 0)
+    assert app.load_sheet(ws_books) is first
+    assert app.load_sheet(ws_books, force=True) is first
+    assert spreadsheet.count("get_all_values") == 1
+    assert spreadsheet.count("get_lastUpdateTime") == 3
+
+    ws_books.rows[1][0] = "Fremd geändert"
+    spreadsheet.touch()
+    assert app.load_sheet(ws_books)["Titel"].iloc[0] == "Fremd geändert"
+    assert spreadsheet.count("get_all_values") == 2
+
+
+def test_own_writes_patch_the_cache_in_place(app, backend):
+    spreadsheet, _ = backend
+    _, ws_authors = app.get_sheets()
+    names = list(app.load_sheet(ws_authors)["Name"])
+    downloads = spreadsheet.count("get_all_values")
+
+    assert app.sync_author_sheet(ws_authors, names[1:] + ["Neue Autorin"]) == (1, 1)
+    df = app.load_sheet(ws_authors, force=True)
+    assert list(df["Name"]) == names[1:] + ["Neue Autorin"]
+    assert list(df["_Zeile"]) == list(range(2, len(names) + 2))
+    assert [r[0] for r in ws_authors.rows[1:]] == list(df["Name"])
+    # Eigene Änderungen sind schon eingepflegt – kein neuer Download, Revision übernommen
+    assert spreadsheet.count("get_all_values") == downloads
+    assert app.get_sheet_cache()["entries"][app._cache_key(ws_authors)]["revision"] == str(spreadsheet.revision)
@@ -0,0 +1,54 @@
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+import fakes
+
+
+def jpeg(color):
+    out = io.BytesIO()
+    Image.new("RGB", (160, 240), color).save(out, format="JPEG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def covers(app, monkeypatch):
+    """Bildserver: /<farbe>/<irgendwas>.jpg liefert ein einfarbiges Cover."""
+    server = fakes.StubServer(lambda path, query, headers: (200, {"Content-Type": "image/jpeg"}, jpeg(path.split("/")[1])))
+    monkeypatch.setitem(app.HOST_MIN_INTERVAL, server.host, 0)
+    yield server
+    server.close()
+
+
+def stored(store):
+    with store.lock: return dict(store.conn.execute("SELECT url, sha FROM thumb_urls").fetchall())
+
+
+def test_same_image_under_two_urls_is_stored_once(app, covers, tmp_path):
+    store = app.ThumbnailStore(app.CACHE_DB, str(tmp_path / "thumbs"))
+    first = store.fetch(f"{covers.url}/red/google.jpg")
+    assert first == store.fetch(f"{covers.url}/red/openlibrary.jpg")
+    assert os.listdir(tmp_path / "thumbs") == [f"{first}.jpg"]
+    assert set(stored(store).values()) == {first} and len(stored(store)) == 2
+    with Image.open(tmp_path / "thumbs" / f"{first}.jpg") as image: assert image.size == app.THUMB_SIZE
+    # Schon da: kein zweiter Download
+    assert store.fetch(f"{covers.url}/red/google.jpg") == first
+    assert len(covers.requests) == 2
+
+
+def test_least_recently_shown_thumbnail_is_evicted(app, covers, tmp_path):
+    store = app.ThumbnailStore(app.CACHE_DB, str(tmp_path / "thumbs"))
+    red, blue = f"{covers.url}/red/1.jpg", f"{covers.url}/blue/2.jpg"
+    shas = {url: store.fetch(url) for url in (red, blue)}
+    with store.lock: store.max_bytes = store.conn.execute("SELECT SUM(size) FROM thumbs").fetchone()[0] + 10
+    time.sleep(0.01)
+    assert store.data_uri(red).startswith("data:image/jpeg;base64,") # rot zuletzt gezeigt
+    time.sleep(0.01)
+    green = f"{covers.url}/green/3.jpg"
+    shas[green] = store.fetch(green)
+    assert set(stored(store)) == {red, green}
+    assert sorted(os.listdir(tmp_path / "thumbs")) == sorted(f"{shas[u]}.jpg" for u in (red, green))
+    with store.lock: assert store.conn.execute("SELECT SUM(size) FROM thumbs").fetchone()[0] <= store.max_bytes
@@ -0,0 +1,64 @@
+import pytest
+
+import fakes
+
+
+def frame(app, rows):
+    values = [fakes.BOOK_HEADER] + rows
+    return app.rows_to_frame(values[1:], app.resolve_schema(values[0]), 2)
+
+
+def test_locate_row_needs_title_and_author(app):
+    df = frame(app, [["Die Mittagsfrau", "Julia Franck"], ["Heimat", "Nora Krug"], ["Heimat", "Siegfried Lenz"]])
+    payload = {"titel": "Heimat", "autor": "Siegfried Lenz", "zeile": 4}
+    assert app._locate_row(df, payload) == 4
+    # Zeile verschoben: gleicher Titel von jemand anderem davor darf nicht getroffen werden
+    moved = frame(app, [["Heimat", "Nora Krug"], ["Heimat", "Siegfried Lenz"]])
+    assert app._locate_row(moved, payload) == 3
+    gone = frame(app, [["Die Mittagsfrau", "Julia Franck"], ["Heimat", "Nora Krug"]])
+    assert app._locate_row(gone, payload) is None
+
+
+def test_batch_without_connection_keeps_attempts(app, monkeypatch):
+    queue = app.JobQueue(app.CACHE_DB)
+    worker = app.EnrichmentWorker(queue)
+    for i in range(3): queue.enqueue(f"buch{i}", {"titel": f"Buch {i}", "autor": "A", "zeile": i + 2})
+    monkeypatch.setattr(app, "get_sheets", lambda: None)
+    try:
+        for _ in range(app.JOB_MAX_ATTEMPTS + 1): assert worker._process_batch() is False
+        assert queue.counts() == {"pending": 3}
+        assert {attempts for (attempts,) in queue.conn.execute("SELECT attempts FROM jobs")} == {0}
+    finally:
+        # Der Worker-Thread lebt weiter – ohne Aufträge schreibt er nicht in spätere Tests
+        with queue.lock, queue.conn: queue.conn.execute("DELETE FROM jobs")
+
+
+def test_batch_errors_never_leave_jobs_running(app, monkeypatch):
+    queue = app.JobQueue(app.CACHE_DB)
+    worker = app.EnrichmentWorker(queue)
+    for i in range(3): queue.enqueue(f"b{i}", {"titel": f"Buch {i}", "autor": "A", "zeile": i + 2})
+
+    def offline():
+        raise app.requests.exceptions.ConnectionError("offline")
+
+    def broken(books, **kwargs):
+        raise ValueError("kaputt")
+    try:
+        monkeypatch.setattr(app, "get_sheets", offline)
+        with pytest.raises(app.requests.exceptions.ConnectionError): worker._process_batch()
+        # Ohne Netz: zurück in die Schlange, ohne Fehlversuch (der Auftrag steht weiter offen)
+        assert queue.counts() == {"pending": 3}
+        assert queue.enqueue("b0", {}) is False
+        assert {attempts for (attempts,) in queue.conn.execute("SELECT attempts FROM jobs")} == {0}
+
+        monkeypatch.setattr(app, "get_sheets", lambda: (object(), object()))
+        monkeypatch.setattr(app, "enrich_books", broken)
+        with pytest.raises(ValueError): worker._process_batch()
+        assert queue.counts() == {"pending": 3}
+        assert {attempts for (attempts,) in queue.conn.execute("SELECT attempts FROM jobs")} == {1}
+        for _ in range(app.JOB_MAX_ATTEMPTS - 1):
+            with pytest.raises(ValueError): worker._process_batch()
+        assert queue.counts() == {"failed": 3}
+        assert queue.enqueue("b0", {"titel": "Buch 0", "autor": "A", "zeile": 2}) is True
+    finally:
+        with queue.lock, queue.conn: queue.conn.execute("DELETE FROM jobs")
@@ -0,0 +1,35 @@
+def outbox(app, worksheet):
+    return [op for _, op, _ in app.get_replica().pending(app._replica_key(worksheet))]
+
+
+def test_buffer_flushes_automatically_at_flush_at(app, backend):
+    ws_books, _ = app.get_sheets()
+    col_map = app.sheet_schema(ws_books)
+    with app.SheetWriteBuffer(ws_books, col_map, flush_at=3) as buffer:
+        for zeile in (2, 3): buffer.set(zeile, "Genre", "Krimi")
+        assert outbox(app, ws_books) == []
+        buffer.set(4, "Genre", "Krimi")
+        assert outbox(app, ws_books) == ["cells"] and buffer.written == 3
+        buffer.set(5, "Genre", "Krimi")
+    # Der Rest beim Verlassen – zwei Outbox-Einträge, ein Sync
+    assert outbox(app, ws_books) == ["cells", "cells"] and buffer.written == 4
+    assert list(app.load_sheet(ws_books)["Genre"][:5]) == ["Krimi"] * 4 + ["Roman"]
+    app.flush_outbox(ws_books)
+    assert [r[2] for r in ws_books.rows[1:6]] == ["Krimi"] * 4 + ["Roman"]
+
+
+def test_buffer_reports_missing_columns_and_errors(app, backend, monkeypatch):
+    ws_books, _ = app.get_sheets()
+    col_map = {k: v for k, v in app.sheet_schema(ws_books).items() if k != "ISBN"}
+    buffer = app.SheetWriteBuffer(ws_books, col_map)
+    buffer.set(2, "ISBN", "9780000000000")
+    buffer.set(2, "Cover", "http://books.example/neu.jpg")
+    assert buffer.failed == [(2, "ISBN")] and buffer.errors == []
+
+    def offline(worksheet, updates):
+        raise ConnectionError("offline")
+    monkeypatch.setattr(app, "queue_cells", offline)
+    buffer.flush()
+    assert buffer.failed == [(2, "ISBN"), (2, "Cover")]
+    assert [str(e) for e in buffer.errors] == ["offline"]
+    assert buffer.written == 0 and not buffer.pending